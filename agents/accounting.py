@@ -0,0 +1,525 @@
+"""Per-session token, image and latency accounting.
+
+``UsageAccountingPlugin`` is an ADK runner plugin. AgentTool hands the plugins
+of the calling runner to the sub-agent's runner, so every model call, tool
+call, image and turn of a story is seen, and attributed to
+(story session id, agent name, tool):
+
+- model calls: prompt, completion and cached tokens, the estimated cost from
+  LiteLLM's price list, and wall time;
+- tool calls: wall time (an AgentTool's time includes its sub-agent's calls);
+- images: rendered vs served from the image cache, and render time, recorded
+  by ``agenerate_image`` through ``record_image``;
+- runs: wall time of every runner invocation (a turn, or a sub-agent call).
+
+A model call made by a sub-agent is attributed to that agent and to the tool
+that invoked it; the root agent's own model calls have no tool. Every record
+is queued for a background writer thread that appends it, in batches over
+one long-lived connection, to a SQLite file (USAGE_DB_PATH, by default
+usage.sqlite3 in OUTPUT_DIR) for aggregation, and the story's running totals are kept in
+session state under ``usage`` (a turn's own run time reaches session state
+with the next turn, since it is only known after the turn's last event).
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from agents.sub_agents.cover_agent.image_store import SESSION_STATE_KEY
+from config.settings import get_config
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+    from google.adk.agents.callback_context import CallbackContext
+    from google.adk.agents.invocation_context import InvocationContext
+    from google.adk.models.llm_request import LlmRequest
+    from google.adk.models.llm_response import LlmResponse
+    from google.adk.tools.base_tool import BaseTool
+    from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+# Session state key holding the story's running totals
+STATE_KEY = "usage"
+
+USAGE_DB_FILENAME = "usage.sqlite3"
+
+# Per-session totals kept in memory, least recently used dropped first
+MAX_SESSIONS = 10000
+
+# Most records the writer thread inserts in one transaction
+WRITE_BATCH_SIZE = 500
+
+# Calls in progress tracked at once; a call that was cancelled never reaches
+# its after/error callback, so the oldest entries are dropped past this
+MAX_STARTED_CALLS = 10000
+
+MODEL, TOOL, IMAGE, RUN = "model", "tool", "image", "run"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT,
+    agent TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    model TEXT,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    images INTEGER NOT NULL,
+    cached_images INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    seconds REAL NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS usage_by_session ON usage (session_id, agent, tool);
+"""
+
+_TOTAL_FIELDS = (
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "images",
+    "cached_images",
+    "cost_usd",
+)
+
+# (agent, tool) of the tool call in progress; model calls, images and runs
+# started inside a tool call are attributed to it
+_CURRENT_TOOL: contextvars.ContextVar[Optional[Tuple[str, str]]] = contextvars.ContextVar(
+    "usage_current_tool", default=None
+)
+
+
+@dataclass
+class UsageRecord:
+    """One model call, tool call, image or run and what it used."""
+
+    session_id: Optional[str]
+    agent: str
+    tool: str
+    kind: str
+    model: Optional[str] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    images: int = 0
+    cached_images: int = 0
+    cost_usd: float = 0.0
+    seconds: float = 0.0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+
+
+def model_call_cost(model: Optional[str], prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """Estimate the price of one model call from LiteLLM's price list (0 when unpriced)."""
+    if not model:
+        return 0.0
+    from agents.routing import model_prices
+
+    try:
+        prices = model_prices(model)
+    except Exception:
+        return 0.0
+    if prices is None:
+        return 0.0
+    input_cost = prices.get("input_cost_per_token") or 0.0
+    cached_cost = prices.get("cache_read_input_token_cost")
+    cached_cost = input_cost if cached_cost is None else cached_cost
+    output_cost = prices.get("output_cost_per_token") or 0.0
+    return (
+        (prompt_tokens - cached_tokens) * input_cost
+        + cached_tokens * cached_cost
+        + completion_tokens * output_cost
+    )
+
+
+def story_session(state: Any, session_id: Optional[str]) -> Optional[str]:
+    """Return the story's session id: the StoryCoach session in state, else ``session_id``."""
+    return state.get(SESSION_STATE_KEY) or session_id
+
+
+class UsageSink:
+    """Appends usage records to a SQLite file and aggregates them.
+
+    ``write`` only queues the record; a daemon thread inserts queued records
+    in batches over one connection, so plugin callbacks never wait on disk.
+    """
+
+    def __init__(self, db_path: str | Path):
+        self.db_path = Path(db_path).resolve()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[UsageRecord]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = self._connect()
+        self._db.executescript(_SCHEMA)
+
+    def write(self, record: UsageRecord) -> None:
+        """Queue one record for the writer thread."""
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_batches, name="usage-sink", daemon=True)
+                self._writer.start()
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Wait until every queued record is written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued records, stop the writer thread and close the connection."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join()
+        with self._lock:
+            self._db.close()
+
+    def breakdown(self, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return totals per (session, agent, tool, kind), for one session or all of them."""
+        query = (
+            "SELECT session_id, agent, tool, kind, COUNT(*) AS calls,"
+            " SUM(prompt_tokens) AS prompt_tokens, SUM(completion_tokens) AS completion_tokens,"
+            " SUM(cached_tokens) AS cached_tokens, SUM(images) AS images,"
+            " SUM(cached_images) AS cached_images, SUM(cost_usd) AS cost_usd,"
+            " SUM(seconds) AS seconds, SUM(error IS NOT NULL) AS errors FROM usage"
+        )
+        params: Tuple[Any, ...] = ()
+        if session_id is not None:
+            query += " WHERE session_id = ?"
+            params = (session_id,)
+        query += " GROUP BY session_id, agent, tool, kind ORDER BY session_id, agent, tool, kind"
+        self.flush()
+        with self._lock:
+            return [dict(row) for row in self._db.execute(query, params).fetchall()]
+
+    def _write_batches(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [record for record in batch if record is not None]
+            try:
+                if records:
+                    self._insert(records)
+            except sqlite3.Error as e:
+                logger.warning("Could not write %d usage records to %s: %s", len(records), self.db_path, e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(records) < len(batch):
+                return
+
+    def _insert(self, records: List[UsageRecord]) -> None:
+        rows = [asdict(record) for record in records]
+        columns = ", ".join(rows[0])
+        placeholders = ", ".join("?" for _ in rows[0])
+        with self._lock, self._db:
+            self._db.executemany(
+                f"INSERT INTO usage ({columns}) VALUES ({placeholders})", [tuple(row.values()) for row in rows]
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # Shared by the writer thread and breakdown(), serialised by _lock
+        db = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+
+def empty_totals() -> Dict[str, Any]:
+    """Return the per-story totals before anything was used."""
+    totals: Dict[str, Any] = {field_name: 0 for field_name in _TOTAL_FIELDS}
+    totals["cost_usd"] = 0.0
+    for kind in (MODEL, TOOL, IMAGE, RUN):
+        totals[f"{kind}_calls"] = 0
+        totals[f"{kind}_seconds"] = 0.0
+    return totals
+
+
+class UsageLedger:
+    """Keeps per-story totals and forwards every record to the sink."""
+
+    def __init__(self, sink: Optional[UsageSink] = None):
+        self.sink = sink
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[Optional[str], Dict[str, Any]]" = OrderedDict()
+
+    def record(self, record: UsageRecord) -> Dict[str, Any]:
+        """Add ``record`` to its story's totals and return a copy of those totals."""
+        with self._lock:
+            totals = self._sessions.pop(record.session_id, None) or empty_totals()
+            for field_name in _TOTAL_FIELDS:
+                totals[field_name] += getattr(record, field_name)
+            totals[f"{record.kind}_calls"] += 1
+            totals[f"{record.kind}_seconds"] += record.seconds
+            self._sessions[record.session_id] = totals
+            while len(self._sessions) > MAX_SESSIONS:
+                self._sessions.popitem(last=False)
+            snapshot = dict(totals)
+        if self.sink is not None:
+            self.sink.write(record)
+        return snapshot
+
+    def session_totals(self, session_id: Optional[str]) -> Dict[str, Any]:
+        """Return the totals of one story."""
+        with self._lock:
+            return dict(self._sessions.get(session_id) or empty_totals())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of stories tracked and their combined totals."""
+        combined = empty_totals()
+        with self._lock:
+            sessions = list(self._sessions.values())
+        for totals in sessions:
+            for key, value in totals.items():
+                combined[key] += value
+        return {"sessions": len(sessions), **combined}
+
+
+def record_image(
+    session_id: Optional[str], kind: str, cached: bool, seconds: float, error: Optional[str] = None
+) -> None:
+    """Record one image for ``session_id``, attributed to the tool call in progress."""
+    if not get_config().usage_accounting:
+        return
+    agent, tool = _CURRENT_TOOL.get() or ("", kind)
+    get_usage_ledger().record(
+        UsageRecord(
+            session_id=session_id,
+            agent=agent,
+            tool=tool,
+            kind=IMAGE,
+            images=1,
+            cached_images=int(cached),
+            seconds=seconds,
+            error=error,
+        )
+    )
+
+
+class UsageAccountingPlugin(BasePlugin):
+    """Runner plugin that records tokens, images and wall time per (session, agent, tool)."""
+
+    def __init__(
+        self,
+        ledger: Optional[UsageLedger] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        super().__init__(name="usage_accounting")
+        self._ledger = ledger
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._started: "OrderedDict[Tuple[Any, ...], Tuple[float, Any]]" = OrderedDict()
+
+    @property
+    def ledger(self) -> UsageLedger:
+        """The ledger records go to (the process-wide one unless given)."""
+        return self._ledger or get_usage_ledger()
+
+    async def before_run_callback(self, *, invocation_context: "InvocationContext") -> None:
+        self._start((RUN, invocation_context.invocation_id), _CURRENT_TOOL.get())
+        return None
+
+    async def after_run_callback(self, *, invocation_context: "InvocationContext") -> None:
+        seconds, current = self._finish((RUN, invocation_context.invocation_id))
+        self._forget(invocation_context.invocation_id)
+        session = invocation_context.session
+        self.ledger.record(
+            UsageRecord(
+                session_id=story_session(session.state, session.id),
+                agent=invocation_context.agent.name,
+                tool=current[1] if current else "",
+                kind=RUN,
+                seconds=seconds,
+            )
+        )
+
+    async def before_agent_callback(
+        self, *, agent: "BaseAgent", callback_context: "CallbackContext"
+    ) -> None:
+        # Sub-agent sessions copy this from the caller's state, so their usage
+        # counts for the story that started them
+        if not callback_context.state.get(SESSION_STATE_KEY):
+            callback_context.state[SESSION_STATE_KEY] = callback_context.session.id
+        return None
+
+    async def before_model_callback(
+        self, *, callback_context: "CallbackContext", llm_request: "LlmRequest"
+    ) -> Optional["LlmResponse"]:
+        self._start(_model_key(callback_context), llm_request.model)
+        return None
+
+    async def after_model_callback(
+        self, *, callback_context: "CallbackContext", llm_response: "LlmResponse"
+    ) -> Optional["LlmResponse"]:
+        if llm_response.partial:
+            return None
+        seconds, model = self._finish(_model_key(callback_context))
+        usage = llm_response.usage_metadata
+        prompt = (usage.prompt_token_count or 0) if usage else 0
+        cached = (usage.cached_content_token_count or 0) if usage else 0
+        completion = (usage.candidates_token_count or 0) if usage else 0
+        self._record(
+            callback_context,
+            UsageRecord(
+                session_id=story_session(callback_context.state, callback_context.session.id),
+                agent=callback_context.agent_name,
+                tool=_enclosing_tool(),
+                kind=MODEL,
+                model=model,
+                prompt_tokens=prompt,
+                completion_tokens=completion,
+                cached_tokens=cached,
+                cost_usd=model_call_cost(model, prompt, cached, completion),
+                seconds=seconds,
+                error=llm_response.error_message,
+            ),
+        )
+        return None
+
+    async def on_model_error_callback(
+        self, *, callback_context: "CallbackContext", llm_request: "LlmRequest", error: Exception
+    ) -> Optional["LlmResponse"]:
+        seconds, model = self._finish(_model_key(callback_context))
+        self._record(
+            callback_context,
+            UsageRecord(
+                session_id=story_session(callback_context.state, callback_context.session.id),
+                agent=callback_context.agent_name,
+                tool=_enclosing_tool(),
+                kind=MODEL,
+                model=model,
+                seconds=seconds,
+                error=str(error) or type(error).__name__,
+            ),
+        )
+        return None
+
+    async def before_tool_callback(
+        self, *, tool: "BaseTool", tool_args: Dict[str, Any], tool_context: "ToolContext"
+    ) -> Optional[Dict[str, Any]]:
+        self._start(_tool_key(tool_context, tool_args), _CURRENT_TOOL.get())
+        _CURRENT_TOOL.set((tool_context.agent_name, tool.name))
+        return None
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: "BaseTool",
+        tool_args: Dict[str, Any],
+        tool_context: "ToolContext",
+        result: Any,
+    ) -> Optional[Dict[str, Any]]:
+        self._finish_tool(tool, tool_args, tool_context, None)
+        return None
+
+    async def on_tool_error_callback(
+        self,
+        *,
+        tool: "BaseTool",
+        tool_args: Dict[str, Any],
+        tool_context: "ToolContext",
+        error: Exception,
+    ) -> Optional[Dict[str, Any]]:
+        self._finish_tool(tool, tool_args, tool_context, str(error) or type(error).__name__)
+        return None
+
+    def _finish_tool(
+        self, tool: "BaseTool", tool_args: Dict[str, Any], tool_context: "ToolContext", error: Optional[str]
+    ) -> None:
+        seconds, previous = self._finish(_tool_key(tool_context, tool_args))
+        _CURRENT_TOOL.set(previous)
+        self._record(
+            tool_context,
+            UsageRecord(
+                session_id=story_session(tool_context.state, tool_context.session.id),
+                agent=tool_context.agent_name,
+                tool=tool.name,
+                kind=TOOL,
+                seconds=seconds,
+                error=error,
+            ),
+        )
+
+    def _record(self, context: "CallbackContext", record: UsageRecord) -> None:
+        """Record ``record`` and expose the story's totals in session state."""
+        context.state[STATE_KEY] = self.ledger.record(record)
+
+    def _start(self, key: Tuple[Any, ...], value: Any) -> None:
+        with self._lock:
+            self._started[key] = (self._clock(), value)
+            while len(self._started) > MAX_STARTED_CALLS:
+                self._started.popitem(last=False)
+
+    def _forget(self, invocation_id: str) -> None:
+        """Drop the calls of a finished invocation that never finished themselves (e.g. cancelled)."""
+        with self._lock:
+            for key in [key for key in self._started if key[1] == invocation_id]:
+                del self._started[key]
+
+    def _finish(self, key: Tuple[Any, ...]) -> Tuple[float, Any]:
+        """Return the seconds since ``key`` started and the value stored with it."""
+        with self._lock:
+            started = self._started.pop(key, None)
+        if started is None:
+            return 0.0, None
+        return self._clock() - started[0], started[1]
+
+
+def _model_key(callback_context: "CallbackContext") -> Tuple[Any, ...]:
+    return (MODEL, callback_context.invocation_id, callback_context.agent_name)
+
+
+def _tool_key(tool_context: "ToolContext", tool_args: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (TOOL, tool_context.invocation_id, tool_context.function_call_id or id(tool_args))
+
+
+def _enclosing_tool() -> str:
+    current = _CURRENT_TOOL.get()
+    return current[1] if current else ""
+
+
+_LEDGER: UsageLedger | None = None
+_LEDGER_LOCK = threading.Lock()
+
+
+def usage_db_path() -> Path:
+    """Return the configured usage database path."""
+    config = get_config()
+    return Path(config.usage_db_path or Path(config.output_dir) / USAGE_DB_FILENAME)
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide usage ledger, writing to the configured SQLite file."""
+    global _LEDGER
+    with _LEDGER_LOCK:
+        if _LEDGER is None:
+            sink = UsageSink(usage_db_path())
+            atexit.register(sink.close)
+            _LEDGER = UsageLedger(sink)
+        return _LEDGER
+
+
+def story_coach_plugins() -> List[BasePlugin]:
+    """Return the runner plugins of the StoryCoach app."""
+    return [UsageAccountingPlugin()] if get_config().usage_accounting else []
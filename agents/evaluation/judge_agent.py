@@ -9,14 +9,13 @@ of output is being evaluated (titles, covers, pages, etc.).
 """
 
 from google.adk.agents import Agent
-from google.genai import types
 from .prompts import instruction_title_judge
 
-from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from agents.models import get_model
+from agents.routing import get_model_route
 
-config = get_config()
-model = LiteLlm(model=config.text_model_name)
+route = get_model_route("judge", temperature=0.0)
+model = get_model(route.model_name)
 
 # Create the judge agent
 # Note: We use temperature=0.0 for consistent, deterministic evaluations
@@ -25,7 +24,7 @@ judge_agent = Agent(
     model=model,
     name="evaluation_judge",
     instruction=instruction_title_judge(),  # Default instruction (can be swapped)
-    generate_content_config=types.GenerateContentConfig(temperature=0.0),
+    generate_content_config=route.content_config(),
     description="Evaluates agent outputs against quality criteria and returns structured scores with reasoning.",
 )
 
@@ -1,9 +1,53 @@
-"""StoryCoach Runner and Session Service for programmatic usage."""
+"""StoryCoach Runner and Session Service for programmatic usage.
 
-from google.adk.sessions import InMemorySessionService
-from google.adk.runners import Runner
-from agents.story_coach.agent import root_agent
+The runner is created on first use (``get_story_coach_runner()`` or the
+``story_coach_runner`` attribute), so importing this module, e.g. in a freshly
+spawned worker process, does not build the agents. ``start_story_coach()``
+also opens the model connections before the first request.
+"""
 
-session_service = InMemorySessionService()
-story_coach_runner = Runner(app_name="story_coach", agent=root_agent, session_service=session_service)
+from __future__ import annotations
 
+import threading
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+
+_RUNNER: "Runner | None" = None
+_SESSION_SERVICE: "InMemorySessionService | None" = None
+_LOCK = threading.Lock()
+
+
+def get_story_coach_runner() -> "Runner":
+    """Return the shared StoryCoach runner, building the agents on first use."""
+    global _RUNNER, _SESSION_SERVICE
+    with _LOCK:
+        if _RUNNER is None:
+            from google.adk.runners import Runner
+            from google.adk.sessions import InMemorySessionService
+
+            from agents.story_coach import app
+
+            _SESSION_SERVICE = InMemorySessionService()
+            _RUNNER = Runner(app=app, session_service=_SESSION_SERVICE)
+        return _RUNNER
+
+
+async def start_story_coach() -> "Runner":
+    """Return the shared StoryCoach runner with model connections already open."""
+    from agents.models import warm_up_models
+
+    runner = get_story_coach_runner()
+    await warm_up_models()
+    return runner
+
+
+def __getattr__(name: str) -> Any:
+    if name == "story_coach_runner":
+        return get_story_coach_runner()
+    if name == "session_service":
+        get_story_coach_runner()
+        return _SESSION_SERVICE
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
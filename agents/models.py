@@ -0,0 +1,263 @@
+"""Shared LiteLlm models and pooled model clients for every agent.
+
+Each agent module used to build its own ``LiteLlm``, so every agent had its
+own OpenAI client with its own connection pool, TLS sessions and retry state.
+``get_model`` hands out one LiteLlm per model name and settings, and all of
+them send OpenAI-routed requests through one pooled ``AsyncOpenAI`` client per
+endpoint and event loop, limited to MODEL_HTTP_MAX_CONNECTIONS connections.
+``warm_up_models`` opens connections to every endpoint in use before the first
+story request (see ``agents.main_agent.start_story_coach``).
+
+Connection reuse is counted from httpcore's trace events: a request either
+opens a new connection or reuses a pooled one. Providers that LiteLLM does not
+reach through the OpenAI SDK keep LiteLLM's own client cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import httpx
+from google.adk.models.lite_llm import LiteLlm, LiteLLMClient
+
+from config.settings import get_config
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+MODEL_TIMEOUT_SECONDS = 600.0
+
+
+@dataclass(frozen=True)
+class ModelEndpoint:
+    """Where OpenAI-routed requests go; models sharing an endpoint share connections."""
+
+    base_url: Optional[str]
+    api_key: Optional[str]
+
+
+def endpoint_for(settings: Dict[str, Any]) -> ModelEndpoint:
+    """Return the endpoint a LiteLlm built with ``settings`` talks to."""
+    base_url = (
+        settings.get("api_base")
+        or settings.get("base_url")
+        or os.getenv("OPENAI_API_BASE")
+        or os.getenv("OPENAI_BASE_URL")
+    )
+    return ModelEndpoint(base_url=base_url, api_key=settings.get("api_key") or get_config().openai_api_key)
+
+
+@functools.lru_cache(maxsize=None)
+def uses_openai_client(model: str, custom_llm_provider: Optional[str] = None) -> bool:
+    """Whether LiteLLM sends requests for ``model`` through the OpenAI SDK."""
+    import litellm
+
+    try:
+        _, provider, _, _ = litellm.get_llm_provider(model, custom_llm_provider=custom_llm_provider)
+    except Exception:
+        return False
+    return provider == "openai"
+
+
+@dataclass
+class ModelClients:
+    """Long-lived clients shared by every model call to one endpoint on one event loop."""
+
+    openai: "AsyncOpenAI"
+    http: httpx.AsyncClient
+
+
+class ModelClientPool:
+    """Pooled OpenAI clients, one per endpoint and event loop, with reuse counters."""
+
+    def __init__(self, max_connections: int):
+        self.max_connections = max(1, max_connections)
+        self._lock = threading.Lock()
+        # httpx connection pools are bound to the event loop that created them,
+        # so clients are kept per running loop and dropped together with the loop
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ModelEndpoint, ModelClients]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._counters = {"clients": 0, "requests": 0, "connections_opened": 0, "warmed_connections": 0}
+
+    def clients(self, endpoint: ModelEndpoint) -> ModelClients:
+        """Return the pooled clients for ``endpoint`` on the running event loop."""
+        from openai import AsyncOpenAI
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            by_endpoint = self._clients.setdefault(loop, {})
+            clients = by_endpoint.get(endpoint)
+            if clients is None:
+                http = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections,
+                    ),
+                    timeout=MODEL_TIMEOUT_SECONDS,
+                    follow_redirects=True,
+                    event_hooks={"request": [self._on_request]},
+                )
+                clients = ModelClients(
+                    openai=AsyncOpenAI(
+                        api_key=endpoint.api_key, base_url=endpoint.base_url, http_client=http
+                    ),
+                    http=http,
+                )
+                by_endpoint[endpoint] = clients
+                self._counters["clients"] += 1
+        return clients
+
+    async def warm_up(self, endpoint: ModelEndpoint, connections: int) -> int:
+        """
+        Open up to ``connections`` connections to ``endpoint`` ahead of the first call.
+
+        Returns:
+            The number of warm-up requests that reached the server (any status)
+        """
+        clients = self.clients(endpoint)
+        url = str(clients.openai.base_url)
+
+        async def _open() -> bool:
+            try:
+                await clients.http.head(url, extensions={"warm_up": True})
+            except httpx.HTTPError:
+                return False
+            return True
+
+        # Concurrent requests each need their own connection
+        opened = await asyncio.gather(*(_open() for _ in range(min(connections, self.max_connections))))
+        return sum(opened)
+
+    async def aclose(self) -> None:
+        """Close the pooled clients of the running event loop, if any."""
+        with self._lock:
+            by_endpoint = self._clients.pop(asyncio.get_running_loop(), {})
+        for clients in by_endpoint.values():
+            await clients.openai.close()
+            await clients.http.aclose()
+
+    def stats(self) -> Dict[str, float]:
+        """Return client, request and connection counts and the share of requests reusing a connection."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._counters)
+        stats["max_connections"] = self.max_connections
+        stats["connections_reused"] = max(0, stats["requests"] - stats["connections_opened"])
+        stats["reuse_ratio"] = stats["connections_reused"] / stats["requests"] if stats["requests"] else 0.0
+        return stats
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        warm_up = bool(request.extensions.pop("warm_up", False))
+        counter = "warmed_connections" if warm_up else "connections_opened"
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name.startswith("connection.connect_") and event_name.endswith(".complete"):
+                self._count(counter)
+
+        request.extensions["trace"] = _trace
+        if not warm_up:
+            self._count("requests")
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+class PooledLiteLLMClient(LiteLLMClient):
+    """LiteLLMClient that sends OpenAI-routed calls through the shared client pool."""
+
+    def __init__(self, pool: ModelClientPool, endpoint: ModelEndpoint):
+        self.pool = pool
+        self.endpoint = endpoint
+
+    async def acompletion(self, model: Any, messages: Any, tools: Any, **kwargs: Any) -> Any:
+        if kwargs.get("client") is None and uses_openai_client(model, kwargs.get("custom_llm_provider")):
+            kwargs["client"] = self.pool.clients(self.endpoint).openai
+        return await super().acompletion(model=model, messages=messages, tools=tools, **kwargs)
+
+
+class ModelFactory:
+    """Hands out one shared LiteLlm per model name and settings."""
+
+    def __init__(self, pool: ModelClientPool):
+        self.pool = pool
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple[str, str], LiteLlm] = {}
+        self._counters = {"requests": 0, "reused": 0}
+
+    def get(self, model_name: str, **settings: Any) -> LiteLlm:
+        """Return the LiteLlm for ``model_name`` built with ``settings`` (LiteLlm arguments)."""
+        key = (model_name, json.dumps(settings, sort_keys=True, default=str))
+        with self._lock:
+            self._counters["requests"] += 1
+            model = self._models.get(key)
+            if model is None:
+                model = LiteLlm(
+                    model=model_name,
+                    llm_client=PooledLiteLLMClient(self.pool, endpoint_for(settings)),
+                    **settings,
+                )
+                self._models[key] = model
+            else:
+                self._counters["reused"] += 1
+            return model
+
+    def endpoints(self) -> List[ModelEndpoint]:
+        """Return the endpoints of the OpenAI-routed models handed out so far."""
+        with self._lock:
+            models = list(self._models.values())
+        endpoints: List[ModelEndpoint] = []
+        for model in models:
+            endpoint = model.llm_client.endpoint
+            custom_provider = model._additional_args.get("custom_llm_provider")
+            if endpoint not in endpoints and uses_openai_client(model.model, custom_provider):
+                endpoints.append(endpoint)
+        return endpoints
+
+    async def warm_up(self, connections: int) -> int:
+        """Open ``connections`` connections to every endpoint in use; returns the number opened."""
+        if connections <= 0:
+            return 0
+        opened = await asyncio.gather(
+            *(self.pool.warm_up(endpoint, connections) for endpoint in self.endpoints())
+        )
+        return sum(opened)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the model counts and the connection pool stats."""
+        with self._lock:
+            stats: Dict[str, Any] = {"models": len(self._models), **self._counters}
+        stats["connections"] = self.pool.stats()
+        return stats
+
+
+_FACTORY: ModelFactory | None = None
+_FACTORY_LOCK = threading.Lock()
+
+
+def get_model_factory() -> ModelFactory:
+    """Return the process-wide model factory."""
+    global _FACTORY
+    with _FACTORY_LOCK:
+        if _FACTORY is None:
+            _FACTORY = ModelFactory(ModelClientPool(get_config().model_http_max_connections))
+        return _FACTORY
+
+
+def get_model(model_name: Optional[str] = None, **settings: Any) -> LiteLlm:
+    """Return the shared LiteLlm for ``model_name`` (default: TEXT_MODEL_NAME) and ``settings``."""
+    return get_model_factory().get(model_name or get_config().text_model_name, **settings)
+
+
+async def warm_up_models(connections: Optional[int] = None) -> int:
+    """Open connections (default: MODEL_WARMUP_CONNECTIONS per endpoint) for the models in use."""
+    if connections is None:
+        connections = get_config().model_warmup_connections
+    return await get_model_factory().warm_up(connections)
@@ -0,0 +1,90 @@
+"""Provider prompt caching for the agents' system prompts.
+
+Every agent sends its prompt as ``static_instruction``: ADK places it first in
+the system instruction, byte for byte the same on every call and never
+templated, so the provider sees one stable prefix it can cache. Providers that
+cache a marked prefix (Anthropic, Bedrock) get a cache_control breakpoint on
+the system message through LiteLLM; providers that cache automatically
+(OpenAI, for prompts of 1024+ tokens) need no marker and LiteLLM drops it.
+
+``record_prompt_cache_usage`` is attached to every agent as an
+after_model_callback and reports cached vs uncached prompt tokens per agent.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_response import LlmResponse
+
+from config.settings import get_config
+
+# Cache breakpoint on the system message, i.e. right after the static prefix
+CACHE_CONTROL_INJECTION_POINTS = [{"location": "message", "role": "system"}]
+
+
+def prompt_cache_args() -> Dict[str, Any]:
+    """Return the extra LiteLlm arguments that turn on provider prompt caching."""
+    if not get_config().prompt_caching:
+        return {}
+    return {"cache_control_injection_points": CACHE_CONTROL_INJECTION_POINTS}
+
+
+class PromptCacheMetrics:
+    """Counts prompt tokens per agent, split into cached and uncached."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._agents: Dict[str, Dict[str, int]] = {}
+
+    def record(self, agent_name: str, prompt_tokens: int, cached_tokens: int) -> None:
+        """Add one model call's prompt token counts to ``agent_name``."""
+        with self._lock:
+            counts = self._agents.setdefault(
+                agent_name, {"calls": 0, "cache_hits": 0, "prompt_tokens": 0, "cached_tokens": 0}
+            )
+            counts["calls"] += 1
+            counts["cache_hits"] += int(cached_tokens > 0)
+            counts["prompt_tokens"] += prompt_tokens
+            counts["cached_tokens"] += cached_tokens
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return per-agent calls, cache hits, cached/uncached tokens and the cached share."""
+        with self._lock:
+            agents = {name: dict(counts) for name, counts in self._agents.items()}
+        for counts in agents.values():
+            counts["uncached_tokens"] = counts["prompt_tokens"] - counts["cached_tokens"]
+            counts["cached_ratio"] = (
+                counts["cached_tokens"] / counts["prompt_tokens"] if counts["prompt_tokens"] else 0.0
+            )
+        return agents
+
+
+def record_prompt_cache_usage(
+    callback_context: CallbackContext, llm_response: LlmResponse
+) -> Optional[LlmResponse]:
+    """after_model_callback recording the response's prompt and cached token counts."""
+    usage = llm_response.usage_metadata
+    if llm_response.partial or usage is None or usage.prompt_token_count is None:
+        return None
+    get_prompt_cache_metrics().record(
+        callback_context.agent_name,
+        usage.prompt_token_count,
+        usage.cached_content_token_count or 0,
+    )
+    return None
+
+
+_METRICS: PromptCacheMetrics | None = None
+_METRICS_LOCK = threading.Lock()
+
+
+def get_prompt_cache_metrics() -> PromptCacheMetrics:
+    """Return the process-wide prompt cache metrics."""
+    global _METRICS
+    with _METRICS_LOCK:
+        if _METRICS is None:
+            _METRICS = PromptCacheMetrics()
+        return _METRICS
@@ -0,0 +1,52 @@
+"""Lazy registry of the app's agents.
+
+Agent modules build their models and read the configuration at import, and
+the root agent pulls in every sub-agent. The registry maps agent names to
+"module:attribute" targets and imports a module only when one of its agents
+is first asked for, so importing a package (``agents.story_coach`` for
+``adk web``, ``agents.main_agent`` in a worker process) stays cheap until an
+agent is actually used.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:
+    from google.adk.agents import BaseAgent
+
+AGENTS: Dict[str, str] = {
+    "story_coach": "agents.story_coach.agent:root_agent",
+    "content_moderation": "agents.sub_agents.content_moderation.agent:content_moderation_agent",
+    "batch_content_moderation": (
+        "agents.sub_agents.content_moderation.agent:batch_content_moderation_agent"
+    ),
+    "title_generator": "agents.sub_agents.title_generator.agent:title_generator_agent",
+    "cover": "agents.sub_agents.cover_agent.agent:cover_agent",
+    "page_writer": "agents.sub_agents.page_writer.agent:page_writer_agent",
+    "story_digest": "agents.sub_agents.page_writer.agent:story_digest_agent",
+    "page_illustration": "agents.sub_agents.page_illustration.agent:page_illustration_agent",
+    "judge": "agents.evaluation.judge_agent:judge_agent",
+}
+
+_LOADED: Dict[str, "BaseAgent"] = {}
+_LOCK = threading.RLock()
+
+
+def get_agent(name: str) -> "BaseAgent":
+    """
+    Return the agent called ``name``, importing its module on first use.
+
+    Raises:
+        KeyError: If no agent is registered under ``name``
+    """
+    with _LOCK:
+        agent = _LOADED.get(name)
+        if agent is None:
+            module_name, _, attribute = AGENTS[name].partition(":")
+            agent = getattr(importlib.import_module(module_name), attribute)
+            _LOADED[name] = agent
+        return agent
+
@@ -0,0 +1,168 @@
+"""Per-agent model routing.
+
+Every agent asks for its route: the model, temperature and max output tokens
+it runs with. An agent's model is, in order of precedence:
+
+1. its own ``{PREFIX}_MODEL_NAME`` (e.g. TITLE_MODEL_NAME, MODERATION_MODEL_NAME),
+2. the model recorded for it in MODEL_ROUTES_FILE,
+3. TEXT_MODEL_NAME.
+
+Temperature and max tokens come from ``{PREFIX}_TEMPERATURE`` and
+``{PREFIX}_MAX_TOKENS``, else from the agent's own default.
+
+The routes file is written by calibration: the candidate models are tried
+cheapest first (by LiteLLM's price list) against the agent's judge eval in
+tests/evaluation, and the first model that passes is recorded. Example:
+
+    python -m agents.routing --agent title --candidates openai/gpt-4o-mini,openai/gpt-4o
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from google.genai import types
+
+from config.settings import AGENT_MODEL_ENV_PREFIXES, get_config
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_ROUTES_FILE = "model_routes.json"
+
+# The judge eval each agent must pass on a cheaper model
+EVALUATIONS = {
+    "title": "tests/evaluation/test_title_generator_evaluation.py",
+    "page_writer": "tests/evaluation/test_page_writer_evaluation.py",
+}
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """The model settings one agent runs with."""
+
+    agent: str
+    model_name: str
+    temperature: float
+    max_tokens: Optional[int] = None
+
+    def content_config(self) -> types.GenerateContentConfig:
+        """Return the agent's generate_content_config."""
+        return types.GenerateContentConfig(
+            temperature=self.temperature, max_output_tokens=self.max_tokens
+        )
+
+
+def load_model_routes(path: str | Path) -> Dict[str, str]:
+    """Return the agent -> model routes recorded in ``path`` (empty if there is no file)."""
+    try:
+        routes = json.loads(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as exc:
+        raise RuntimeError(f"Could not read model routes from {path}: {exc}") from exc
+    return {agent: model for agent, model in routes.items() if isinstance(model, str)}
+
+
+def save_model_route(path: str | Path, agent: str, model_name: str) -> None:
+    """Record ``model_name`` as the route of ``agent`` in ``path``."""
+    routes = load_model_routes(path)
+    routes[agent] = model_name
+    Path(path).write_text(json.dumps(routes, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def get_model_route(agent: str, temperature: float) -> ModelRoute:
+    """
+    Return the route of ``agent``.
+
+    Args:
+        agent: A key of ``AGENT_MODEL_ENV_PREFIXES`` (e.g. "title")
+        temperature: The agent's default temperature
+    """
+    if agent not in AGENT_MODEL_ENV_PREFIXES:
+        raise KeyError(f"Unknown agent for model routing: {agent}")
+    config = get_config()
+    settings = config.agent_model(agent)
+    model_name = settings.model_name
+    if model_name is None and config.model_routes_file:
+        model_name = load_model_routes(config.model_routes_file).get(agent)
+    return ModelRoute(
+        agent=agent,
+        model_name=model_name or config.text_model_name,
+        temperature=temperature if settings.temperature is None else settings.temperature,
+        max_tokens=settings.max_tokens,
+    )
+
+
+def model_prices(model_name: str) -> Optional[Dict[str, Any]]:
+    """Return LiteLLM's price entry for ``model_name`` (with or without provider prefix), if any."""
+    import litellm
+
+    for name in (model_name, model_name.split("/", 1)[-1]):
+        info = litellm.model_cost.get(name)
+        if info:
+            return info
+    return None
+
+
+def model_cost(model_name: str) -> float:
+    """Return the price of one input plus one output token (inf when LiteLLM has no price)."""
+    info = model_prices(model_name)
+    if info is None:
+        return math.inf
+    return (info.get("input_cost_per_token") or 0.0) + (info.get("output_cost_per_token") or 0.0)
+
+
+def rank_by_cost(model_names: List[str]) -> List[str]:
+    """Return ``model_names`` cheapest first; unpriced models keep their order at the end."""
+    return sorted(model_names, key=model_cost)
+
+
+def run_evaluation(agent: str, model_name: str) -> bool:
+    """Run the judge eval of ``agent`` with the agent on ``model_name``; True if it passes."""
+    env = {**os.environ, f"{AGENT_MODEL_ENV_PREFIXES[agent]}_MODEL_NAME": model_name}
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-q", EVALUATIONS[agent]], cwd=PROJECT_ROOT, env=env
+    )
+    return result.returncode == 0
+
+
+def select_model(
+    agent: str,
+    candidates: List[str],
+    evaluate: Callable[[str, str], bool] = run_evaluation,
+) -> Optional[str]:
+    """Return the cheapest of ``candidates`` that passes the eval of ``agent``, or None."""
+    for model_name in rank_by_cost(candidates):
+        if evaluate(agent, model_name):
+            return model_name
+    return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point; records the selected model of each agent in the routes file."""
+    parser = argparse.ArgumentParser(description="Route agents to the cheapest model that passes their eval")
+    parser.add_argument("--agent", action="append", choices=sorted(EVALUATIONS), required=True)
+    parser.add_argument("--candidates", required=True, help="Comma-separated model names")
+    parser.add_argument("--routes-file", default=None, help="Default: MODEL_ROUTES_FILE or model_routes.json")
+    args = parser.parse_args(argv)
+
+    routes_file = args.routes_file or get_config().model_routes_file or DEFAULT_ROUTES_FILE
+    candidates = [name.strip() for name in args.candidates.split(",") if name.strip()]
+    selected = {}
+    for agent in args.agent:
+        model_name = select_model(agent, candidates)
+        selected[agent] = model_name
+        if model_name is not None:
+            save_model_route(routes_file, agent, model_name)
+    print(json.dumps({"routes_file": routes_file, "selected": selected}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
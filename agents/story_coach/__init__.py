@@ -1,9 +1,21 @@
 """StoryCoach agent package.
 
 This package contains the root StoryCoach agent for the Kids Story Creator application.
+``root_agent`` and ``app`` (the agent with its runner plugins) are built on
+first access (see agents/registry.py), so importing the package does not
+import the sub-agents or construct any model.
 """
 
-from .agent import root_agent
+__all__ = ["root_agent", "app"]
 
-__all__ = ["root_agent"]
 
+def __getattr__(name: str):
+    if name == "root_agent":
+        from agents.registry import get_agent
+
+        return get_agent("story_coach")
+    if name == "app":
+        from .agent import app
+
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,36 +3,53 @@
 This is the main conversational agent that interacts with children and orchestrates
 the story creation process by delegating to specialist agents via AgentTools.
 
-This file is required for adk web to discover the root_agent.
+This file is required for adk web to discover the root_agent. ``app`` bundles
+it with the runner plugins (usage accounting) for adk web and the runner.
 """
 
 
 from google.adk.agents import LlmAgent  # noqa: E402
-from google.genai import types  # noqa: E402
-from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.apps import App
+from agents.accounting import story_coach_plugins
+from agents.models import get_model
+from agents.routing import get_model_route
+from agents.prompt_cache import prompt_cache_args, record_prompt_cache_usage
 
 from .prompts import instruction_story_coach  # noqa: E402
+from .tools import (  # noqa: E402
+    check_image_jobs_tool,
+    get_story_tool,
+    moderate_story_tool,
+    start_story_tool,
+    update_story_tool,
+    write_page_tool,
+)
+from .callbacks import compact_history, remember_story_session  # noqa: E402
 from agents.sub_agents.content_moderation.agent import content_moderation_tool  # noqa: E402
-from agents.sub_agents.title_generator.agent import title_generator_tool  # noqa: E402
-from agents.sub_agents.cover_agent.agent import cover_tool  # noqa: E402
-from agents.sub_agents.page_writer.agent import page_writer_tool  # noqa: E402
 from agents.sub_agents.page_illustration.agent import page_illustration_tool  # noqa: E402
 
-config = get_config()
-model = LiteLlm(model=config.text_model_name)
+route = get_model_route("story_coach", temperature=0.8)
+model = get_model(route.model_name, **prompt_cache_args())
 
 root_agent = LlmAgent(
     model=model,
     name="StoryCoach",
-    instruction=instruction_story_coach(),
+    static_instruction=instruction_story_coach(),
     tools=[
         content_moderation_tool,
-        title_generator_tool,
-        cover_tool,
-        page_writer_tool,
+        start_story_tool,
+        write_page_tool,
         page_illustration_tool,
+        check_image_jobs_tool,
+        get_story_tool,
+        update_story_tool,
+        moderate_story_tool,
     ],
-    generate_content_config=types.GenerateContentConfig(temperature=0.8),
+    generate_content_config=route.content_config(),
+    before_agent_callback=remember_story_session,
+    before_model_callback=compact_history,
+    after_model_callback=record_prompt_cache_usage,
 )
 
+app = App(name="story_coach", root_agent=root_agent, plugins=story_coach_plugins())
+
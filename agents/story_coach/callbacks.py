@@ -0,0 +1,37 @@
+"""Callbacks attached to the StoryCoach root agent."""
+
+from typing import Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from agents.sub_agents.content_moderation.batching import estimate_tokens
+from agents.sub_agents.cover_agent.image_store import SESSION_STATE_KEY
+from config.settings import get_config
+from .history import get_history_compactor
+from .state import load_story_state
+
+
+def remember_story_session(callback_context: CallbackContext) -> Optional[types.Content]:
+    """Store the StoryCoach session id in state so sub-agent tools can see it."""
+    if callback_context.state.get(SESSION_STATE_KEY) != callback_context.session.id:
+        callback_context.state[SESSION_STATE_KEY] = callback_context.session.id
+    return None
+
+
+def compact_history(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Compact the conversation history before each StoryCoach model call (see history.py)."""
+    if not get_config().root_history_compaction:
+        return None
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    llm_request.contents = get_history_compactor().compact(
+        llm_request.contents,
+        load_story_state(callback_context.state),
+        fixed_tokens=estimate_tokens(str(instruction or "")),
+        invocation_id=callback_context.invocation_id,
+    )
+    return None
@@ -0,0 +1,132 @@
+"""Offline benchmark of page_writer_agent prompt size as a story grows.
+
+Writes a synthetic story page by page and measures the estimated prompt
+tokens (instruction + request) of every page writer call, once with every
+earlier page verbatim and once with the rolling "story so far" digest plus
+the last few pages. The digest is updated with the offline extractive fold,
+which is bounded by the same word limit the digest agent is given. Example:
+
+    python -m agents.story_coach.context_benchmark --pages 100 --recent-pages 3
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, List, Optional
+
+from agents.sub_agents.content_moderation.batching import estimate_tokens
+from agents.sub_agents.page_writer.prompts import instruction_page_writer_agent
+from .digest import StoryDigester, fold_page_extractive, page_context, pages_to_fold
+from .state import StoryState
+from .tools import page_writer_request
+
+_NAMES = ["Milo", "Ava", "Pip the robot", "Luna", "a shy dragon", "Grandpa Joe"]
+_EVENTS = [
+    "found a glowing map under the old oak tree",
+    "built a raft out of biscuit tins and string",
+    "sang a song so loud that the clouds giggled",
+    "followed a trail of purple footprints into the hills",
+    "shared a picnic with a family of very polite ants",
+    "discovered that the moon had lost its shoes",
+]
+
+
+def synthetic_page(rng: random.Random, page_number: int) -> str:
+    """Return a page of about sixty words."""
+    sentences = [
+        f"On page {page_number}, {rng.choice(_NAMES)} {rng.choice(_EVENTS)}."
+        for _ in range(5)
+    ]
+    return " ".join(sentences)
+
+
+async def run_context_benchmark(
+    pages: int = 100,
+    recent_pages: int = 3,
+    max_words: int = 120,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Build page writer prompts for a ``pages``-page story and count their tokens.
+
+    Args:
+        pages: Story length
+        recent_pages: Pages sent verbatim next to the digest
+        max_words: Digest word limit
+        seed: Story seed
+
+    Returns:
+        Per-page estimated prompt tokens for the "full" and "rolling" modes,
+        and a summary of both at a few page counts
+    """
+    rng = random.Random(seed)
+    instruction_tokens = estimate_tokens(instruction_page_writer_agent())
+    digester = StoryDigester(max_words=max_words)
+
+    async def offline_fold(story_so_far, page):
+        return fold_page_extractive(story_so_far, page, max_words)
+
+    story = StoryState(story_title="The Big Adventure", story_concept="friends on a quest")
+    full: List[int] = []
+    rolling: List[int] = []
+    for page_number in range(1, pages + 1):
+        description = synthetic_page(rng, page_number)
+        full_request = page_writer_request(
+            description, story.story_title, story.story_concept, page_number, None, story.pages
+        )
+        story_so_far, recent = page_context(story, page_number, recent_pages)
+        rolling_request = page_writer_request(
+            description, story.story_title, story.story_concept, page_number, story_so_far, recent
+        )
+        full.append(instruction_tokens + estimate_tokens(full_request))
+        rolling.append(instruction_tokens + estimate_tokens(rolling_request))
+
+        folding = pages_to_fold(story, page_number + 1, recent_pages)
+        story.story_so_far, story.summarized_pages = await digester.fold(
+            story, folding, offline_fold
+        )
+        story.set_page(page_number, description)
+
+    checkpoints = sorted({n for n in (1, 10, 25, 50, 100, pages) if n <= pages})
+    return {
+        "pages": pages,
+        "recent_pages": recent_pages,
+        "digest_max_words": max_words,
+        "full": full,
+        "rolling": rolling,
+        "summary": {
+            str(n): {"full": full[n - 1], "rolling": rolling[n - 1]} for n in checkpoints
+        },
+        "total_tokens": {"full": sum(full), "rolling": sum(rolling)},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point; prints the summary (--per-page for every page)."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument("--recent-pages", type=int, default=3)
+    parser.add_argument("--max-words", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--per-page", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        run_context_benchmark(
+            pages=args.pages,
+            recent_pages=args.recent_pages,
+            max_words=args.max_words,
+            seed=args.seed,
+        )
+    )
+    if not args.per_page:
+        result.pop("full")
+        result.pop("rolling")
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Rolling "story so far" digest for the page writer.
+
+Instead of every earlier page, page_writer_agent gets a short summary of the
+older pages plus the last ``recent_pages`` pages verbatim, so its prompt stops
+growing with the story. The digest is updated incrementally: each time a page
+drops out of the verbatim window it is folded into the summary by
+story_digest_agent (one small call per new page, run alongside the page
+writer), and never recomputed from scratch.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.adk.tools.tool_context import ToolContext
+
+from agents.sub_agents.page_writer.agent import story_digest_tool
+from config.settings import get_config
+from .state import StoryPage, StoryState
+
+# fold(story_so_far, page) -> updated story_so_far
+FoldFn = Callable[[Optional[str], StoryPage], Awaitable[str]]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def limit_words(text: str, max_words: int) -> str:
+    """Keep the last ``max_words`` words of ``text`` (recent events matter most)."""
+    words = text.split()
+    if len(words) <= max_words:
+        return " ".join(words)
+    return "... " + " ".join(words[-max_words:])
+
+
+def fold_page_extractive(story_so_far: Optional[str], page: StoryPage, max_words: int) -> str:
+    """Offline digest update: append the page's first sentence and cap the length."""
+    first_sentence = _SENTENCE_END.split(page.text.strip(), maxsplit=1)[0]
+    return limit_words(f"{story_so_far or ''} {first_sentence}".strip(), max_words)
+
+
+def page_context(
+    story: StoryState, page_number: int, recent_pages: int
+) -> Tuple[Optional[str], List[StoryPage]]:
+    """
+    Return what the page writer sees of the pages before ``page_number``.
+
+    Returns:
+        (story_so_far or None, earlier pages to send verbatim). Pages not yet
+        folded into the digest are always sent verbatim, so the window is
+        ``recent_pages`` pages, or one more while a fold is in flight.
+    """
+    earlier = [page for page in story.pages if page.page_number < page_number]
+    if recent_pages <= 0 or not story.story_so_far or story.summarized_pages >= page_number:
+        # Digest disabled, not started yet, or covering pages after a rewritten one
+        return None, earlier
+    return story.story_so_far, [p for p in earlier if p.page_number > story.summarized_pages]
+
+
+def pages_to_fold(story: StoryState, next_page_number: int, recent_pages: int) -> List[StoryPage]:
+    """Return the pages that leave the verbatim window before ``next_page_number`` is written."""
+    if recent_pages <= 0:
+        return []
+    return [
+        page
+        for page in story.pages
+        if story.summarized_pages < page.page_number < next_page_number - recent_pages
+    ]
+
+
+class StoryDigester:
+    """Folds pages into a story's digest and counts LLM folds and offline fallbacks."""
+
+    def __init__(self, max_words: int):
+        self.max_words = max_words
+        self._lock = threading.Lock()
+        self._counters = {"folds": 0, "fallbacks": 0}
+
+    async def fold(
+        self, story: StoryState, pages: List[StoryPage], fold: FoldFn
+    ) -> Tuple[Optional[str], int]:
+        """
+        Fold ``pages`` (in order) into ``story``'s digest with ``fold``.
+
+        Returns:
+            (new story_so_far, new summarized_pages); ``story`` itself is not
+            changed, so the caller can apply the result after other work
+        """
+        story_so_far, summarized = story.story_so_far, story.summarized_pages
+        for page in pages:
+            try:
+                updated = (await fold(story_so_far, page)).strip()
+            except Exception:
+                updated = ""
+            if not updated:
+                updated = fold_page_extractive(story_so_far, page, self.max_words)
+                self._count("fallbacks")
+            story_so_far = limit_words(updated, self.max_words)
+            summarized = page.page_number
+            self._count("folds")
+        return story_so_far, summarized
+
+    def agent_fold(self, tool_context: ToolContext) -> FoldFn:
+        """Return a fold function that asks story_digest_agent."""
+
+        async def _fold(story_so_far: Optional[str], page: StoryPage) -> str:
+            request = (
+                f"story_so_far: {story_so_far or ''}\n"
+                f"page_number: {page.page_number}\n"
+                f"new_page: {page.text}"
+            )
+            output = await story_digest_tool.run_async(
+                args={"request": request}, tool_context=tool_context
+            )
+            return str(output)
+
+        return _fold
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many pages were folded and how many needed the offline fallback."""
+        with self._lock:
+            return dict(self._counters)
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+_DIGESTER: StoryDigester | None = None
+_DIGESTER_LOCK = threading.Lock()
+
+
+def get_story_digester() -> StoryDigester:
+    """Return the process-wide story digester."""
+    global _DIGESTER
+    with _DIGESTER_LOCK:
+        if _DIGESTER is None:
+            _DIGESTER = StoryDigester(max_words=get_config().story_digest_max_words)
+        return _DIGESTER
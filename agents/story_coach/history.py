@@ -0,0 +1,219 @@
+"""Conversation history compaction for the StoryCoach root agent.
+
+Without compaction StoryCoach resends its whole event history, including
+every tool call and tool response, on every model call, so late-story turns
+cost far more than early ones. Before each model call the compactor:
+
+1. collapses finished tool exchanges from earlier turns into one short
+   "For context" line each (the full results already live in session state),
+2. drops the oldest turns when the history is still over the token budget,
+   replacing them with the story facts from session state, and
+3. records the estimated prompt tokens before and after, per model call.
+
+The last ``keep_turns`` turns are always sent untouched.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from google.genai import types
+
+from agents.sub_agents.content_moderation.batching import estimate_tokens
+from config.settings import get_config
+from .state import StoryState
+
+# Result fields worth keeping in a collapsed tool exchange
+SUMMARY_FIELDS = (
+    "status",
+    "story_title",
+    "page_number",
+    "page_numbers",
+    "job_id",
+    "all_approved",
+    "reason",
+)
+
+# Per-call token records kept for inspection
+MAX_RECORDS = 1000
+
+
+def content_tokens(content: types.Content) -> int:
+    """Estimate the prompt tokens of one content (text, tool calls and tool results)."""
+    tokens = 0
+    for part in content.parts or []:
+        if part.text:
+            tokens += estimate_tokens(part.text)
+        if part.function_call:
+            tokens += estimate_tokens(part.function_call.name or "")
+            tokens += estimate_tokens(json.dumps(part.function_call.args or {}, default=str))
+        if part.function_response:
+            tokens += estimate_tokens(part.function_response.name or "")
+            tokens += estimate_tokens(json.dumps(part.function_response.response or {}, default=str))
+    return tokens
+
+
+def _is_turn_start(content: types.Content) -> bool:
+    """A turn starts with a user message that is not a tool result."""
+    return content.role == "user" and any(
+        part.text and not part.function_response for part in content.parts or []
+    )
+
+
+def split_turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    """Group ``contents`` into turns, each starting with a user message."""
+    turns: List[List[types.Content]] = []
+    for content in contents:
+        if not turns or _is_turn_start(content):
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def summarize_result(response: Any) -> str:
+    """Return the few fields of a tool result that are worth keeping."""
+    result = response.get("result", response) if isinstance(response, dict) else response
+    if isinstance(result, dict):
+        kept = {key: result[key] for key in SUMMARY_FIELDS if key in result}
+        return json.dumps(kept, default=str) if kept else "done"
+    text = " ".join(str(result).split())
+    return text if len(text) <= 80 else text[:77] + "..."
+
+
+def collapse_tool_exchanges(turn: List[types.Content]) -> List[types.Content]:
+    """Replace each tool call/response pair in ``turn`` with one short context line."""
+    collapsed: List[types.Content] = []
+    for content in turn:
+        parts = content.parts or []
+        responses = [part.function_response for part in parts if part.function_response]
+        kept = [part for part in parts if not part.function_call and not part.function_response]
+        if responses:
+            lines = [
+                f"For context: [StoryCoach] called {response.name}, which returned "
+                f"{summarize_result(response.response)}"
+                for response in responses
+            ]
+            collapsed.append(types.Content(role="user", parts=[types.Part(text="\n".join(lines))]))
+        elif kept:
+            collapsed.append(types.Content(role=content.role, parts=kept))
+        # A content holding only tool calls is dropped; its response line names the tool
+    return collapsed
+
+
+def story_facts(story: StoryState) -> str:
+    """Return the story facts from session state as one short line."""
+    facts = {
+        "author_name": story.author_name,
+        "story_concept": story.story_concept,
+        "story_title": story.story_title,
+        "cover_ready": story.cover_image is not None,
+        "pages_written": len(story.pages),
+        "current_page_number": story.current_page_number,
+        "story_complete": story.story_complete,
+    }
+    return json.dumps({key: value for key, value in facts.items() if value is not None})
+
+
+class HistoryCompactor:
+    """Compacts root-agent history to a token budget and records tokens per call."""
+
+    def __init__(self, max_tokens: int, keep_turns: int):
+        self.max_tokens = max_tokens
+        self.keep_turns = max(1, keep_turns)
+        self._lock = threading.Lock()
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=MAX_RECORDS)
+        self._counters = {"calls": 0, "compacted": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def compact(
+        self,
+        contents: List[types.Content],
+        story: StoryState,
+        fixed_tokens: int = 0,
+        invocation_id: Optional[str] = None,
+    ) -> List[types.Content]:
+        """
+        Return the compacted history.
+
+        Args:
+            contents: The request contents, oldest first
+            story: The story from session state, quoted in place of dropped turns
+            fixed_tokens: Tokens sent anyway (e.g. the system instruction),
+                counted in the records but not against the history budget
+            invocation_id: Recorded with the token counts
+
+        Returns:
+            New contents; ``contents`` is not modified
+        """
+        before = sum(content_tokens(content) for content in contents)
+        turns = split_turns(contents)
+        old, recent = turns[: -self.keep_turns], turns[-self.keep_turns :]
+        old = [collapse_tool_exchanges(turn) for turn in old]
+
+        def _size(turns_: List[List[types.Content]]) -> int:
+            return sum(content_tokens(content) for turn in turns_ for content in turn)
+
+        dropped = 0
+        recent_tokens = _size(recent)
+        while old and recent_tokens + _size(old) > self.max_tokens:
+            old.pop(0)
+            dropped += 1
+
+        compacted = [content for turn in old + recent for content in turn]
+        if dropped:
+            note = (
+                f"For context: {dropped} earlier turn(s) were left out to save space. "
+                f"The story saved in session state so far: {story_facts(story)}"
+            )
+            compacted.insert(0, types.Content(role="user", parts=[types.Part(text=note)]))
+
+        after = sum(content_tokens(content) for content in compacted)
+        self._record(invocation_id, fixed_tokens + before, fixed_tokens + after, dropped)
+        return compacted
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Return the recent per-call token records, oldest first."""
+        with self._lock:
+            return list(self._records)
+
+    def stats(self) -> Dict[str, float]:
+        """Return call counts, total tokens before and after, and the share saved."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._counters)
+        before = stats["tokens_before"]
+        stats["saved_ratio"] = 1 - stats["tokens_after"] / before if before else 0.0
+        return stats
+
+    def _record(self, invocation_id: Optional[str], before: int, after: int, dropped: int) -> None:
+        with self._lock:
+            self._records.append(
+                {
+                    "invocation_id": invocation_id,
+                    "tokens_before": before,
+                    "tokens_after": after,
+                    "dropped_turns": dropped,
+                }
+            )
+            self._counters["calls"] += 1
+            self._counters["compacted"] += int(after < before)
+            self._counters["tokens_before"] += before
+            self._counters["tokens_after"] += after
+
+
+_COMPACTOR: HistoryCompactor | None = None
+_COMPACTOR_LOCK = threading.Lock()
+
+
+def get_history_compactor() -> HistoryCompactor:
+    """Return the process-wide root-agent history compactor."""
+    global _COMPACTOR
+    with _COMPACTOR_LOCK:
+        if _COMPACTOR is None:
+            config = get_config()
+            _COMPACTOR = HistoryCompactor(
+                max_tokens=config.root_history_max_tokens,
+                keep_turns=config.root_history_keep_turns,
+            )
+        return _COMPACTOR
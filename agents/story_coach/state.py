@@ -0,0 +1,111 @@
+"""Typed story state kept in ADK session.state.
+
+The story being written (author, concept, title, cover, pages, style notes)
+lives under one session state key as a plain dict, so it survives any
+SessionService. Tools load it into a StoryState through their ToolContext,
+read only the fields they need and save it back, instead of StoryCoach
+re-sending earlier pages in every tool call.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, List, MutableMapping, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+# Session state key holding the story
+STATE_KEY = "story"
+
+
+class StoryPage(BaseModel):
+    """One written page of the story."""
+
+    page_number: int
+    text: str
+    image_url: Optional[str] = None
+
+
+class StyleReferences(BaseModel):
+    """Art direction shared by the cover and every page illustration."""
+
+    color_palette: Optional[List[str]] = None
+    art_style: Optional[str] = None
+    character_notes: Optional[str] = None
+
+
+class StoryState(BaseModel):
+    """The story being created in one StoryCoach session."""
+
+    author_name: Optional[str] = None
+    story_concept: Optional[str] = None
+    story_title: Optional[str] = None
+    cover_image: Optional[str] = None
+    current_page_number: int = 1
+    pages: List[StoryPage] = Field(default_factory=list)
+    style_references: StyleReferences = Field(default_factory=StyleReferences)
+    story_complete: bool = False
+    # Rolling "story so far" digest of pages 1..summarized_pages (see digest.py)
+    story_so_far: Optional[str] = None
+    summarized_pages: int = 0
+
+    def page(self, page_number: int) -> Optional[StoryPage]:
+        """Return page ``page_number``, or None if it has not been written."""
+        return next((page for page in self.pages if page.page_number == page_number), None)
+
+    def set_page(self, page_number: int, text: str) -> StoryPage:
+        """Write (or rewrite) a page and move current_page_number past the last page."""
+        page = self.page(page_number)
+        if page is None:
+            page = StoryPage(page_number=page_number, text=text)
+            self.pages.append(page)
+            self.pages.sort(key=lambda p: p.page_number)
+        else:
+            page.text = text
+        self.current_page_number = max(p.page_number for p in self.pages) + 1
+        return page
+
+    def set_image(self, page_number: Optional[int], image_path: str) -> bool:
+        """Save the cover (``page_number`` None) or a page image; True if it changed."""
+        if page_number is None:
+            changed = self.cover_image != image_path
+            self.cover_image = image_path
+            return changed
+        page = self.page(page_number)
+        if page is None or page.image_url == image_path:
+            return False
+        page.image_url = image_path
+        return True
+
+
+def load_story_state(state: MutableMapping[str, Any]) -> StoryState:
+    """Return the story stored in session ``state`` (an empty story if none yet)."""
+    return StoryState.model_validate(state.get(STATE_KEY) or {})
+
+
+def save_story_state(state: MutableMapping[str, Any], story: StoryState) -> None:
+    """Store ``story`` in session ``state``."""
+    # Assign a fresh dict so the change is captured as a state delta
+    state[STATE_KEY] = story.model_dump()
+
+
+
+def record_story_images(
+    state: MutableMapping[str, Any], images: Iterable[Tuple[Optional[int], dict]]
+) -> bool:
+    """
+    Save finished images into the story stored in ``state``.
+
+    Args:
+        state: Session state holding the story
+        images: (page number, or None for the cover; image manifest) pairs
+
+    Returns:
+        True if any image path changed (the story is only saved then)
+    """
+    story = load_story_state(state)
+    changed = False
+    for page_number, manifest in images:
+        changed |= story.set_image(page_number, manifest["image_path"])
+    if changed:
+        save_story_state(state, story)
+    return changed
@@ -0,0 +1,305 @@
+"""Function tools used directly by the StoryCoach root agent."""
+
+import asyncio
+from typing import Any, List, Optional, Tuple
+
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.tool_context import ToolContext
+
+from agents.sub_agents.content_moderation.agent import (
+    content_moderation_batch_tool,
+    content_moderation_tool,
+)
+from agents.sub_agents.cover_agent.agent import generate_cover_image
+from agents.sub_agents.cover_agent.image_jobs import DONE, STATE_KEY, get_image_job_queue
+from agents.sub_agents.page_writer.agent import page_writer_tool
+from agents.sub_agents.title_generator.agent import title_generator_tool
+from config.settings import get_config
+from utils.speculation import get_speculator
+from .digest import get_story_digester, page_context, pages_to_fold
+from .state import StoryPage, load_story_state, record_story_images, save_story_state
+
+
+def check_image_jobs(tool_context: ToolContext) -> dict:
+    """
+    Check on cover and page illustrations that are being drawn in the background.
+    Use this on later turns to find out which images are ready to show the child.
+    
+    Returns:
+        {"jobs": [...]} with one entry per image job started in this story, each
+        with its status ("queued", "running", "done" or "failed"), kind, page
+        number(s) and, once done, the image manifest(s) in "result" (image_path,
+        plus webp_path and thumbnail_path for previews)
+    """
+    job_ids = list((tool_context.state.get(STATE_KEY) or {}).keys())
+    jobs = get_image_job_queue().statuses(job_ids)
+    record_story_images(tool_context.state, _finished_images(jobs))
+    return {"jobs": jobs}
+
+
+check_image_jobs_tool = FunctionTool(func=check_image_jobs)
+
+
+def _finished_images(jobs: List[dict]) -> List[Tuple[Optional[int], dict]]:
+    """Return (page number or None for the cover, manifest) of every finished image."""
+    found = []
+    for job in jobs:
+        if job["status"] != DONE:
+            continue
+        if job["kind"] == "cover":
+            found.append((None, job["result"]))
+        elif job["kind"] == "page":
+            found.append((job.get("page_number"), job["result"]))
+        elif job["kind"] == "pages":
+            # Blocked prompts have no image; the job's page_numbers list the drawn ones
+            drawn = [image for image in job["result"] if "image_path" in image]
+            found.extend(zip(job.get("page_numbers") or [], drawn))
+    return found
+
+
+def get_story(tool_context: ToolContext) -> dict:
+    """
+    Read the story saved so far: author, concept, title, cover, pages and their images.
+    Use this when you need the story's details, e.g. to show the finished story.
+
+    Returns:
+        The saved story fields (empty fields are left out)
+    """
+    return load_story_state(tool_context.state).model_dump(exclude_none=True)
+
+
+get_story_tool = FunctionTool(func=get_story)
+
+
+def update_story(
+    tool_context: ToolContext,
+    author_name: Optional[str] = None,
+    story_concept: Optional[str] = None,
+    story_title: Optional[str] = None,
+    art_style: Optional[str] = None,
+    story_complete: Optional[bool] = None,
+) -> dict:
+    """
+    Save approved story details that changed, e.g. a new title or that the story is finished.
+    Only pass the fields that changed; check new text with content_moderation_tool first.
+
+    Args:
+        author_name: The child's name
+        story_concept: The story concept
+        story_title: The story title
+        art_style: How the pictures should look, if the child asked for a style
+        story_complete: True once the child has finished the story
+
+    Returns:
+        {"status": "saved"}
+    """
+    story = load_story_state(tool_context.state)
+    updates = {
+        "author_name": author_name,
+        "story_concept": story_concept,
+        "story_title": story_title,
+        "story_complete": story_complete,
+    }
+    for field, value in updates.items():
+        if value is not None:
+            setattr(story, field, value)
+    if art_style is not None:
+        story.style_references.art_style = art_style
+    save_story_state(tool_context.state, story)
+    return {"status": "saved"}
+
+
+update_story_tool = FunctionTool(func=update_story)
+
+
+def _is_approved(verdict: Any) -> bool:
+    return isinstance(verdict, dict) and verdict.get("status") == "APPROVED"
+
+
+def _cover_prompt(story_title: str, story_concept: str) -> str:
+    return (
+        f'A colourful, playful storybook cover illustration for "{story_title}", '
+        f"a children's story about {story_concept}. Bright, friendly and gentle, "
+        "age-appropriate for children aged 5-11, with no text or lettering."
+    )
+
+
+def _clean_title(output: Any) -> str:
+    # The title agent is told to answer with the bare title; tolerate quotes
+    # and trailing chatter anyway.
+    lines = str(output).strip().splitlines()
+    return lines[0].strip().strip('"\'').strip() if lines else ""
+
+
+async def start_story(
+    author_name: str,
+    story_concept: str,
+    tool_context: ToolContext,
+    story_title: Optional[str] = None,
+) -> dict:
+    """
+    Create the story title, safety-check it and start drawing the cover, in one step.
+    Use this once the child's name and story concept are approved, and again
+    whenever the title changes so the cover matches it.
+
+    Args:
+        author_name: The child's name
+        story_concept: The approved story concept
+        story_title: Only when the child picked their own title; by default a
+            new title is generated
+
+    Returns:
+        {"status": "APPROVED", "story_title": ..., "cover": {...}} where "cover"
+        is the generate_cover_image result (a job id while it is drawn in the
+        background), or {"status": "REJECTED", "story_title": ..., "moderation":
+        {...}} with the kid-friendly message if the title failed the safety check
+    """
+    if not story_title:
+        title_output = await title_generator_tool.run_async(
+            args={"request": f"author_name: {author_name}\nstory_concept: {story_concept}"},
+            tool_context=tool_context,
+        )
+        story_title = _clean_title(title_output)
+    verdict = await content_moderation_tool.run_async(
+        args={"content": story_title, "content_type": "title"}, tool_context=tool_context
+    )
+    story = load_story_state(tool_context.state)
+    story.author_name, story.story_concept = author_name, story_concept
+    if not _is_approved(verdict):
+        save_story_state(tool_context.state, story)
+        return {"status": "REJECTED", "story_title": story_title, "moderation": verdict}
+    story.story_title = story_title
+    save_story_state(tool_context.state, story)
+    # The cover prompt is a fixed template over the approved title and concept,
+    # so no cover_agent round trip is needed before the image job starts.
+    # A cover drawn right away is saved to the story by generate_cover_image.
+    cover = await generate_cover_image(_cover_prompt(story_title, story_concept), tool_context)
+    return {"status": "APPROVED", "story_title": story_title, "cover": cover}
+
+
+start_story_tool = FunctionTool(func=start_story)
+
+
+def page_writer_request(
+    child_page_description: str,
+    story_title: str,
+    story_concept: str,
+    current_page_number: int,
+    story_so_far: Optional[str],
+    previous_pages: List[StoryPage],
+) -> str:
+    """Build the page_writer_agent request from the page's context fields."""
+    lines = [
+        f"child_page_description: {child_page_description}",
+        f"story_title: {story_title}",
+        f"story_concept: {story_concept}",
+        f"current_page_number: {current_page_number}",
+    ]
+    if story_so_far:
+        lines.append(f"story_so_far: {story_so_far}")
+    if previous_pages:
+        lines.append("previous_pages:")
+        lines.extend(f"{page.page_number}. {page.text}" for page in previous_pages)
+    return "\n".join(lines)
+
+
+async def write_page(
+    child_page_description: str,
+    tool_context: ToolContext,
+    page_number: Optional[int] = None,
+) -> dict:
+    """
+    Safety-check the child's page description, write the page from it, safety-check the page and save it.
+    The story title, concept and earlier pages are read from the saved story.
+
+    Args:
+        child_page_description: What the child said happens on this page
+        page_number: Only to rewrite an earlier page; by default the next page is written
+
+    Returns:
+        {"status": "APPROVED", "page_number": ..., "page_text": ...} with the
+        lightly corrected page, or {"status": "REJECTED", "moderation": {...}}
+        with the kid-friendly message to guide the child
+    """
+    config = get_config()
+    story = load_story_state(tool_context.state)
+    page_number = page_number or story.current_page_number
+    story_so_far, recent = page_context(story, page_number, config.page_writer_recent_pages)
+    page_request = page_writer_request(
+        child_page_description,
+        story.story_title or "",
+        story.story_concept or "",
+        page_number,
+        story_so_far,
+        recent,
+    )
+    # Writing a new page moves the verbatim window on by one page; the page
+    # leaving it is folded into the digest while this page is being written.
+    # (Rewriting an older page leaves the digest as it is.)
+    folding = (
+        pages_to_fold(story, page_number + 1, config.page_writer_recent_pages)
+        if page_number >= story.current_page_number
+        else []
+    )
+    digester = get_story_digester()
+    # Moderation and page writing start together; the page is discarded if
+    # moderation rejects the description.
+    result, (story.story_so_far, story.summarized_pages) = await asyncio.gather(
+        get_speculator("page_writer").run(
+            gate=lambda: content_moderation_tool.run_async(
+                args={"content": child_page_description, "content_type": "page_description"},
+                tool_context=tool_context,
+            ),
+            work=lambda: page_writer_tool.run_async(
+                args={"request": page_request}, tool_context=tool_context
+            ),
+            accept=_is_approved,
+            speculate=config.speculative_page_writing,
+        ),
+        digester.fold(story, folding, digester.agent_fold(tool_context)),
+    )
+    if not result.accepted:
+        if folding:
+            save_story_state(tool_context.state, story)
+        return {"status": "REJECTED", "moderation": result.gate}
+    page_text = str(result.value).strip()
+    # The written page can add words of its own (e.g. a starter sentence),
+    # so it is checked too before it is saved and shown to the child.
+    verdict = await content_moderation_tool.run_async(
+        args={"content": page_text, "content_type": "page_text"}, tool_context=tool_context
+    )
+    if not _is_approved(verdict):
+        if folding:
+            save_story_state(tool_context.state, story)
+        return {"status": "REJECTED", "moderation": verdict}
+    story.set_page(page_number, page_text)
+    save_story_state(tool_context.state, story)
+    return {"status": "APPROVED", "page_number": page_number, "page_text": page_text}
+
+
+write_page_tool = FunctionTool(func=write_page)
+
+
+async def moderate_story(tool_context: ToolContext) -> dict:
+    """
+    Safety-check the whole saved story (title and every page) in one step.
+    Use this once when the child finishes the story.
+
+    Returns:
+        {"verdicts": [...], "all_approved": ...} with one verdict per item,
+        ids "title" and "page_1", "page_2", ...
+    """
+    story = load_story_state(tool_context.state)
+    items = []
+    if story.story_title:
+        items.append({"id": "title", "content": story.story_title, "content_type": "title"})
+    items.extend(
+        {"id": f"page_{page.page_number}", "content": page.text, "content_type": "page_text"}
+        for page in story.pages
+    )
+    return await content_moderation_batch_tool.run_async(
+        args={"items": items}, tool_context=tool_context
+    )
+
+
+moderate_story_tool = FunctionTool(func=moderate_story)
@@ -0,0 +1,162 @@
+"""Streaming StoryCoach turns with time-to-first-token metrics.
+
+``call_agent_streaming`` runs one turn with ADK's SSE streaming mode, so
+LiteLlm yields partial text events as the model writes. Each piece of text is
+handed to an optional render hook (e.g. the chat UI appending to the message
+on screen) as soon as it arrives, instead of after the whole reply. Every
+turn records its time to first token and time to last token.
+"""
+
+from __future__ import annotations
+
+import inspect
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Union
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.genai import types
+
+# render(delta, text_so_far): called for every new piece of reply text
+RenderHook = Callable[[str, str], Union[None, Awaitable[None]]]
+
+# Per-turn timings kept for inspection
+MAX_TURNS = 1000
+
+
+@dataclass
+class StreamedTurn:
+    """The reply of one streamed turn and its timings."""
+
+    text: str
+    ttft_seconds: Optional[float]
+    ttlt_seconds: Optional[float]
+    total_seconds: float
+    chunks: int
+    session_id: Optional[str] = None
+
+
+def event_text(event: Event) -> str:
+    """Return the visible text of ``event`` (thoughts are skipped)."""
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text and not part.thought)
+
+
+class StreamMetrics:
+    """Collects time-to-first-token and time-to-last-token per streamed turn."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._turns: Deque[StreamedTurn] = deque(maxlen=MAX_TURNS)
+
+    def record(self, turn: StreamedTurn) -> None:
+        """Store the timings of one turn."""
+        with self._lock:
+            self._turns.append(turn)
+
+    def turns(self) -> List[Dict[str, Any]]:
+        """Return the recent turns' timings, oldest first (without the reply text)."""
+        with self._lock:
+            turns = list(self._turns)
+        return [{k: v for k, v in asdict(turn).items() if k != "text"} for turn in turns]
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Return the number of turns and p50/p95 of time to first and last token."""
+        with self._lock:
+            turns = list(self._turns)
+        stats: Dict[str, Optional[float]] = {"turns": len(turns)}
+        for name in ("ttft_seconds", "ttlt_seconds"):
+            ordered = sorted(v for v in (getattr(t, name) for t in turns) if v is not None)
+            key = name.replace("_seconds", "")
+            stats[f"{key}_p50"] = round(statistics.median(ordered), 4) if ordered else None
+            stats[f"{key}_p95"] = round(ordered[int(0.95 * (len(ordered) - 1))], 4) if ordered else None
+        return stats
+
+
+async def call_agent_streaming(
+    query: str,
+    runner: Runner,
+    user_id: str,
+    session_id: str,
+    render: Optional[RenderHook] = None,
+    clock: Callable[[], float] = time.perf_counter,
+) -> StreamedTurn:
+    """
+    Send a message to an agent with SSE streaming and render the reply as it arrives.
+
+    Args:
+        query: The user's message
+        runner: The Runner instance for the agent (e.g. story_coach_runner)
+        user_id: User identifier
+        session_id: Session identifier
+        render: Optional progressive-render hook, called (sync or async) with
+            each new piece of text and the reply so far
+        clock: Time source for the timings
+
+    Returns:
+        The full reply text with time to first token (first text chunk) and
+        time to last token (last text chunk), both measured from the send
+    """
+    content = types.Content(role="user", parts=[types.Part(text=query)])
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
+    started = clock()
+    first: Optional[float] = None
+    last: Optional[float] = None
+    chunks = 0
+    reply = ""
+    streamed = ""  # Text of the model response currently being streamed
+
+    async for event in runner.run_async(
+        user_id=user_id, session_id=session_id, new_message=content, run_config=run_config
+    ):
+        text = event_text(event)
+        if event.partial:
+            delta = text
+            streamed += text
+        else:
+            # The closing event repeats the streamed text in full; only models
+            # that did not stream contribute new text here
+            delta = "" if streamed else text
+            streamed = ""
+        if not delta:
+            continue
+        now = clock()
+        first = now if first is None else first
+        last = now
+        chunks += 1
+        reply += delta
+        if render is not None:
+            result = render(delta, reply)
+            if inspect.isawaitable(result):
+                await result
+
+    turn = StreamedTurn(
+        text=reply,
+        ttft_seconds=None if first is None else first - started,
+        ttlt_seconds=None if last is None else last - started,
+        total_seconds=clock() - started,
+        chunks=chunks,
+        session_id=session_id,
+    )
+    get_stream_metrics().record(turn)
+    return turn
+
+
+_METRICS: StreamMetrics | None = None
+_METRICS_LOCK = threading.Lock()
+
+
+def get_stream_metrics() -> StreamMetrics:
+    """Return the process-wide streaming metrics."""
+    global _METRICS
+    with _METRICS_LOCK:
+        if _METRICS is None:
+            _METRICS = StreamMetrics()
+        return _METRICS
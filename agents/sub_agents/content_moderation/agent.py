@@ -3,26 +3,227 @@
 This agent ensures all inputs and generated content are safe and age-appropriate
 for children aged 5-11. It checks for violence, profanity, adult content,
 dangerous content, hate speech, and harassment.
+
+Text with blocked terms is rejected by a local rule-based fast path (see
+fast_path.py), and LLM verdicts are cached (see verdict_cache.py); only new
+text without blocked terms reaches the LLM. The batch tool checks many texts (e.g. the
+whole story at the end) in one structured LLM call per token budget.
 """
 
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
-from google.genai import types
-from .prompts import instruction_content_moderation_agent
+from google.adk.tools.tool_context import ToolContext
+from pydantic import BaseModel, Field, field_validator
+from .batching import split_by_token_budget
+from .fast_path import get_moderation_fast_path
+from .prompts import instruction_batch_content_moderation_agent, instruction_content_moderation_agent
+from .verdict_cache import get_moderation_verdict_cache, parse_verdict, prompt_version
 
 from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from agents.models import get_model
+from agents.routing import get_model_route
+from agents.prompt_cache import prompt_cache_args, record_prompt_cache_usage
+
+route = get_model_route("moderation", temperature=0.3)
+model = get_model(route.model_name, **prompt_cache_args())
+
+CONTENT_TYPE_DESCRIPTION = (
+    'What the text is: "name", "story_concept", "title", "page_description", '
+    '"page_text", "illustration_prompt" or "story"'
+)
+
+
+class ModerationRequest(BaseModel):
+    """Input of content_moderation_tool."""
+
+    content: str = Field(description="The text to check")
+    content_type: Optional[str] = Field(default=None, description=CONTENT_TYPE_DESCRIPTION)
+
+
+class ModerationItem(BaseModel):
+    """One text in a batch moderation request."""
+
+    id: str = Field(description='Unique id of the item, e.g. "title", "page_2", "prompt_2"')
+    content: str = Field(description="The text to check")
+    content_type: Optional[str] = Field(default=None, description=CONTENT_TYPE_DESCRIPTION)
+
+
+class BatchModerationRequest(BaseModel):
+    """Input of content_moderation_batch_tool."""
+
+    items: List[ModerationItem] = Field(description="Texts to check, each with a unique id")
+
+    @field_validator("items")
+    @classmethod
+    def _unique_ids(cls, items: List[ModerationItem]) -> List[ModerationItem]:
+        # Verdicts are matched back to items by id
+        ids = [item.id for item in items]
+        duplicates = sorted({item_id for item_id in ids if ids.count(item_id) > 1})
+        if duplicates:
+            raise ValueError(f"item ids must be unique, repeated: {', '.join(duplicates)}")
+        return items
+
+
+class ModerationVerdict(BaseModel):
+    """Verdict for one item of a batch."""
+
+    id: str
+    status: str = Field(description='"APPROVED" or "REJECTED"')
+    reason: Optional[str] = None
+    kid_friendly_message: Optional[str] = None
+
+
+class BatchModerationResult(BaseModel):
+    """Output of the batch moderation agent."""
+
+    verdicts: List[ModerationVerdict]
+
+
+def _local_verdict(
+    content: str, content_type: Optional[str]
+) -> Tuple[Optional[Dict[str, Any]], Optional[Tuple[str, str, str]]]:
+    """
+    Answer from the fast path or the verdict cache, without calling the LLM.
+
+    Returns:
+        (verdict or None, cache key to store the LLM verdict under, or None
+        when caching is disabled)
+    """
+    config = get_config()
+    if config.moderation_fast_path:
+        verdict = get_moderation_fast_path().check(content)
+        if verdict is not None:
+            return verdict, None
+    if config.moderation_cache_ttl_seconds <= 0 or config.moderation_cache_max_entries <= 0:
+        return None, None
+    cache = get_moderation_verdict_cache()
+    # Both tools share one cache: the batch prompt embeds the single-item
+    # policy, whose version is what invalidates cached verdicts.
+    key = cache.make_key(content, content_type, prompt_version(content_moderation_agent.static_instruction))
+    return cache.get(key), key
+
+
+class ModerationTool(AgentTool):
+    """AgentTool that answers blocked and repeated text before asking the LLM."""
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        verdict, key = _local_verdict(args.get("content", ""), args.get("content_type"))
+        if verdict is not None:
+            return verdict
+
+        output = await super().run_async(args=args, tool_context=tool_context)
+        verdict = parse_verdict(output)
+        if verdict is None:
+            return output
+        if key is not None:
+            get_moderation_verdict_cache().put(key, verdict)
+        return verdict
+
+
+class BatchModerationTool(AgentTool):
+    """
+    Moderates many texts at once.
+
+    Each item goes through the fast path and the cache first; the rest are
+    split by token budget and each batch is sent to the batch moderation
+    agent as one structured request, batches in parallel. Items the agent
+    leaves out are checked one by one with ``single_tool``. Item ids must be
+    unique; a batch that repeats one raises a pydantic ValidationError.
+    """
+
+    def __init__(self, agent: Agent, single_tool: ModerationTool, **kwargs: Any):
+        super().__init__(agent=agent, **kwargs)
+        self.single_tool = single_tool
+
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        items = BatchModerationRequest.model_validate({"items": args.get("items", [])}).items
+        verdicts: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, Optional[Tuple[str, str, str]]] = {}
+        pending: List[ModerationItem] = []
+        for item in items:
+            verdict, keys[item.id] = _local_verdict(item.content, item.content_type)
+            if verdict is not None:
+                verdicts[item.id] = verdict
+            else:
+                pending.append(item)
+
+        batches = split_by_token_budget(
+            pending, get_config().moderation_batch_max_tokens, lambda item: item.content
+        )
+        results = await asyncio.gather(
+            *(self._moderate_batch(batch, tool_context) for batch in batches)
+        )
+        for batch_verdicts in results:
+            for item_id, verdict in batch_verdicts.items():
+                verdicts[item_id] = verdict
+                if keys.get(item_id) is not None:
+                    get_moderation_verdict_cache().put(keys[item_id], verdict)
+
+        missing = [item for item in pending if item.id not in verdicts]
+        singles = await asyncio.gather(
+            *(
+                self.single_tool.run_async(
+                    args={"content": item.content, "content_type": item.content_type},
+                    tool_context=tool_context,
+                )
+                for item in missing
+            )
+        )
+        for item, output in zip(missing, singles):
+            verdicts[item.id] = parse_verdict(output) or {"status": "ERROR", "message": str(output)}
+
+        ordered = [{"id": item.id, **verdicts[item.id]} for item in items]
+        return {
+            "verdicts": ordered,
+            "all_approved": all(verdict["status"] == "APPROVED" for verdict in ordered),
+        }
+
+    async def _moderate_batch(
+        self, batch: List[ModerationItem], tool_context: ToolContext
+    ) -> Dict[str, Dict[str, Any]]:
+        request = BatchModerationRequest(items=batch).model_dump(exclude_none=True)
+        try:
+            output = await super().run_async(args=request, tool_context=tool_context)
+        except Exception:
+            # Malformed batch answers fall back to single-item checks
+            return {}
+        if not isinstance(output, dict):
+            return {}
+        wanted = {item.id for item in batch}
+        verdicts = {}
+        for entry in output.get("verdicts", []):
+            verdict = parse_verdict({k: v for k, v in entry.items() if k != "id"})
+            if entry.get("id") in wanted and verdict is not None:
+                verdicts[entry["id"]] = verdict
+        return verdicts
 
-config = get_config()
-model = LiteLlm(model=config.text_model_name)
 
 content_moderation_agent = Agent(
     model=model,
     name="content_moderation_agent",
-    instruction=instruction_content_moderation_agent(),
-    generate_content_config=types.GenerateContentConfig(temperature=0.3),
+    static_instruction=instruction_content_moderation_agent(),
+    input_schema=ModerationRequest,
+    generate_content_config=route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
     description="Checks content for safety and age-appropriateness, returning approval/rejection with kid-friendly messages.",
 )
 
-content_moderation_tool = AgentTool(agent=content_moderation_agent)
+batch_content_moderation_agent = Agent(
+    model=model,
+    name="batch_content_moderation_agent",
+    static_instruction=instruction_batch_content_moderation_agent(),
+    input_schema=BatchModerationRequest,
+    output_schema=BatchModerationResult,
+    generate_content_config=route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
+    description="Checks many texts (e.g. the title, every page and every illustration prompt) for safety in one call, returning one verdict per item id.",
+)
 
+content_moderation_tool = ModerationTool(agent=content_moderation_agent)
+
+content_moderation_batch_tool = BatchModerationTool(
+    agent=batch_content_moderation_agent, single_tool=content_moderation_tool
+)
@@ -0,0 +1,46 @@
+"""Token-budget splitting for batched moderation requests."""
+
+from __future__ import annotations
+
+import math
+from typing import Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+# Rough per-item cost of the id, content_type and JSON punctuation
+ITEM_OVERHEAD_TOKENS = 12
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English text)."""
+    return math.ceil(len(text) / 4)
+
+
+def split_by_token_budget(
+    items: Iterable[T], max_tokens: int, content: Callable[[T], str]
+) -> List[List[T]]:
+    """
+    Group ``items`` into consecutive batches whose estimated size fits ``max_tokens``.
+
+    Args:
+        items: Items to moderate, in order
+        max_tokens: Token budget of one batch request
+        content: Returns the text of an item
+
+    Returns:
+        Non-empty batches in the original order; an item larger than the
+        budget gets a batch of its own
+    """
+    batches: List[List[T]] = []
+    current: List[T] = []
+    used = 0
+    for item in items:
+        cost = estimate_tokens(content(item)) + ITEM_OVERHEAD_TOKENS
+        if current and used + cost > max_tokens:
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
@@ -0,0 +1,182 @@
+"""Rule-based fast path in front of the content moderation agent.
+
+StoryCoach moderates the name, the concept, every page description, cleaned
+page, title and illustration prompt, which is several LLM round trips per
+page. Some of that text is plainly unacceptable, so it is checked locally
+first: a compiled Aho-Corasick automaton over the blocklist finds every
+blocked term in one pass, and any hit is REJECTED without an LLM call.
+
+The fast path never approves. Harmless words can still add up to an unsafe
+story ("get in my car"), so everything without a blocked term, names
+included, goes on to the content_moderation_agent LLM. Counters record how
+much traffic the fast path absorbs.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import unicodedata
+from collections import deque
+from typing import Dict, Generic, Iterable, Iterator, List, Mapping, Optional, Tuple, TypeVar
+
+from .vocabulary import BLOCKED_TERMS
+
+T = TypeVar("T")
+
+REJECTED = "REJECTED"
+
+KID_FRIENDLY_MESSAGES = {
+    "profanity": (
+        "Let's keep our story words kind and friendly! Can you tell it another way?"
+    ),
+    "adult content": (
+        "That part isn't right for a kids' story. How about an adventure, "
+        "a funny surprise or a new friend instead?"
+    ),
+    "dangerous content": (
+        "That could be unsafe, so let's leave it out of our story. "
+        "What fun thing could happen instead?"
+    ),
+    "violence": (
+        "That's a bit too scary and hurtful for our story. "
+        "Could the characters solve the problem in a clever, kind way?"
+    ),
+    "hate speech": (
+        "Every story friend deserves kindness! Let's use words that make everyone feel welcome."
+    ),
+}
+
+# Obfuscations undone before looking for blocked terms ("sh1t", "$ex")
+_LOOKALIKES = str.maketrans(
+    {"@": "a", "4": "a", "3": "e", "1": "i", "!": "i", "0": "o", "$": "s", "5": "s", "7": "t"}
+)
+_BLOCK_WORD = re.compile(r"[a-z]+")
+_LETTER = re.compile(r"[a-z]")
+
+
+class AhoCorasick(Generic[T]):
+    """Multi-pattern matcher that finds every pattern occurrence in one pass."""
+
+    def __init__(self, patterns: Iterable[Tuple[str, T]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, T]]] = [[]]
+        for pattern, value in patterns:
+            node = 0
+            for char in pattern:
+                child = self._goto[node].get(char)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][char] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = child
+            self._output[node].append((len(pattern), value))
+        self._link()
+
+    def _link(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def search(self, text: str) -> Iterator[Tuple[int, int, T]]:
+        """Yield (start, end, value) for every pattern occurrence in ``text``."""
+        node = 0
+        for end, char in enumerate(text, start=1):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for length, value in self._output[node]:
+                yield end - length, end, value
+
+
+def _block_pattern(term: str) -> str:
+    # Text is searched as " word word ... ", so spaces act as word boundaries
+    return " " + term + " "
+
+
+class ModerationFastPath:
+    """Rejects text with blocked terms locally; returns None for the rest."""
+
+    def __init__(self, blocked_terms: Mapping[str, Iterable[str]] = BLOCKED_TERMS):
+        self._blocklist: AhoCorasick[str] = AhoCorasick(
+            (_block_pattern(term.lower()), category)
+            for category, terms in blocked_terms.items()
+            for term in terms
+        )
+        self._lock = threading.Lock()
+        self._counters = {"checked": 0, "rejected": 0, "escalated": 0}
+
+    def check(self, content: str) -> Optional[Dict[str, str]]:
+        """
+        Reject ``content`` locally if it contains a blocked term.
+
+        Args:
+            content: The text to check
+
+        Returns:
+            A REJECTED verdict in the moderation agent's format, or None when
+            the text has to be escalated to the moderation agent
+        """
+        text = unicodedata.normalize("NFKC", content).lower()
+        category = self.blocked_category(text)
+        if category is None:
+            self._count("escalated")
+            return None
+        self._count("rejected")
+        return {
+            "status": REJECTED,
+            "reason": f"contains {category}",
+            "kid_friendly_message": KID_FRIENDLY_MESSAGES[category],
+        }
+
+    def blocked_category(self, text: str) -> Optional[str]:
+        """Return the category of the first blocked term in ``text``, if any."""
+        tokens = text.lower().split()
+        # Text as typed ("shit!"), then with lookalikes undone in tokens that
+        # contain letters ("sh!t", "$ex"); "!" and digits elsewhere stay punctuation
+        plain = [word for token in tokens for word in _BLOCK_WORD.findall(token)]
+        unmasked = [
+            word
+            for token in tokens
+            for word in _BLOCK_WORD.findall(token.translate(_LOOKALIKES) if _LETTER.search(token) else token)
+        ]
+        for words in (plain, unmasked):
+            for _, _, category in self._blocklist.search(" " + " ".join(words) + " "):
+                return category
+        return None
+
+    def stats(self) -> Dict[str, float]:
+        """Return fast-path counters and the share of traffic answered locally."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._counters)
+        stats["absorbed"] = stats["rejected"]
+        stats["absorbed_rate"] = stats["rejected"] / stats["checked"] if stats["checked"] else 0.0
+        return stats
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._counters["checked"] += 1
+            self._counters[outcome] += 1
+
+
+_FAST_PATH: ModerationFastPath | None = None
+_FAST_PATH_LOCK = threading.Lock()
+
+
+def get_moderation_fast_path() -> ModerationFastPath:
+    """Return the process-wide moderation fast path."""
+    global _FAST_PATH
+    with _FAST_PATH_LOCK:
+        if _FAST_PATH is None:
+            _FAST_PATH = ModerationFastPath()
+        return _FAST_PATH
@@ -0,0 +1,116 @@
+"""Moderation gate in front of paid image generation.
+
+Image tools check their prompt here before calling the image API, so a
+rejected illustration prompt costs neither image spend nor image latency.
+The check goes through the moderation tools, i.e. the fast path and the
+verdict cache first, and only new prompts without blocked terms reach the
+moderation LLM.
+Counters record how many prompts were checked and blocked per image kind.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+from google.adk.tools.tool_context import ToolContext
+
+from config.settings import get_config
+from .agent import content_moderation_batch_tool, content_moderation_tool
+from .verdict_cache import parse_verdict
+
+BLOCKED = "blocked"
+CONTENT_TYPE = "illustration_prompt"
+
+
+def _blocked(verdict: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return the tool response for a rejected prompt, or None if it may be drawn."""
+    if verdict is not None and verdict.get("status") == "APPROVED":
+        return None
+    verdict = verdict or {}
+    return {
+        "status": BLOCKED,
+        "reason": verdict.get("reason", "the illustration prompt could not be checked"),
+        "kid_friendly_message": verdict.get(
+            "kid_friendly_message", "Let's try describing that picture a little differently!"
+        ),
+    }
+
+
+class ImagePromptGate:
+    """Moderates image prompts and counts the ones blocked at the tool boundary."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    async def check(self, prompt: str, kind: str, tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+        """
+        Moderate one image prompt.
+
+        Args:
+            prompt: The image prompt about to be generated
+            kind: Image kind for the counters ("cover", "page", ...)
+            tool_context: The calling image tool's context
+
+        Returns:
+            None if the image may be generated, otherwise the tool response to
+            return instead ({"status": "blocked", "reason", "kid_friendly_message"})
+        """
+        if not get_config().image_prompt_moderation:
+            return None
+        output = await content_moderation_tool.run_async(
+            args={"content": prompt, "content_type": CONTENT_TYPE}, tool_context=tool_context
+        )
+        blocked = _blocked(parse_verdict(output))
+        self._count(kind, checked=1, blocked=int(blocked is not None))
+        return blocked
+
+    async def check_many(
+        self, prompts: Sequence[str], kind: str, tool_context: ToolContext
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Moderate several prompts with one batched call; one check() result per prompt."""
+        if not get_config().image_prompt_moderation or not prompts:
+            return [None] * len(prompts)
+        result = await content_moderation_batch_tool.run_async(
+            args={
+                "items": [
+                    {"id": str(i), "content": prompt, "content_type": CONTENT_TYPE}
+                    for i, prompt in enumerate(prompts)
+                ]
+            },
+            tool_context=tool_context,
+        )
+        verdicts = {verdict["id"]: verdict for verdict in result["verdicts"]}
+        outcomes = [_blocked(parse_verdict(verdicts.get(str(i)))) for i in range(len(prompts))]
+        self._count(kind, checked=len(prompts), blocked=sum(o is not None for o in outcomes))
+        return outcomes
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return checked/blocked counters per image kind, plus a "total" entry."""
+        with self._lock:
+            stats = {kind: dict(counts) for kind, counts in self._counters.items()}
+        stats["total"] = {
+            "checked": sum(counts["checked"] for counts in stats.values()),
+            "blocked": sum(counts["blocked"] for counts in stats.values()),
+        }
+        return stats
+
+    def _count(self, kind: str, checked: int, blocked: int) -> None:
+        with self._lock:
+            counts = self._counters.setdefault(kind, {"checked": 0, "blocked": 0})
+            counts["checked"] += checked
+            counts["blocked"] += blocked
+
+
+_GATE: ImagePromptGate | None = None
+_GATE_LOCK = threading.Lock()
+
+
+def get_image_prompt_gate() -> ImagePromptGate:
+    """Return the process-wide image prompt gate."""
+    global _GATE
+    with _GATE_LOCK:
+        if _GATE is None:
+            _GATE = ImagePromptGate()
+        return _GATE
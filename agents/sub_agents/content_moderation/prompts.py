@@ -57,3 +57,29 @@ Output:
 - A JSON object with status, reason (if rejected), and kid_friendly_message (if rejected).
 """
 
+
+
+def instruction_batch_content_moderation_agent() -> str:
+    """
+    System prompt for the batch ContentModerationAgent.
+    Applies the same safety rules as the single-item agent to many items in one call.
+    """
+    return instruction_content_moderation_agent() + """
+BATCH MODE (this replaces the single-item input and output format above):
+
+Input:
+{"items": [{"id": "...", "content": "...", "content_type": "..."}, ...]}
+
+Check every item on its own, with the same rules as for a single item. One
+unsafe item does not make the other items unsafe.
+
+Output:
+{
+  "verdicts": [
+    {"id": "<item id>", "status": "APPROVED"},
+    {"id": "<item id>", "status": "REJECTED", "reason": "...", "kid_friendly_message": "..."}
+  ]
+}
+
+Return exactly one verdict for every input id, using the ids unchanged.
+"""
@@ -0,0 +1,133 @@
+"""LRU + TTL cache of moderation verdicts.
+
+Names, titles and page text are moderated again and again (a page is checked
+as the child's description and again after page_writer_agent cleans it up).
+Verdicts from the moderation agent are cached under (normalized content,
+content_type, prompt version), where the prompt version is a hash of the
+moderation instruction, so editing the prompt invalidates every entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import get_config
+
+VERDICT_STATUSES = ("APPROVED", "REJECTED")
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def normalize_content(content: str) -> str:
+    """Fold case, Unicode forms and whitespace so trivially different texts share a key."""
+    return " ".join(unicodedata.normalize("NFKC", content).casefold().split())
+
+
+def prompt_version(instruction: Any) -> str:
+    """Return a short hash identifying the moderation instruction."""
+    text = instruction if isinstance(instruction, str) else repr(instruction)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def parse_verdict(output: Any) -> Optional[Dict[str, Any]]:
+    """
+    Extract a verdict dict from the moderation agent's output.
+
+    Returns:
+        The verdict, or None if ``output`` is not a JSON object with an
+        APPROVED/REJECTED status (such answers are passed through uncached)
+    """
+    if isinstance(output, dict):
+        verdict = output
+    else:
+        try:
+            verdict = json.loads(_FENCE.sub("", str(output).strip()))
+        except ValueError:
+            return None
+    if not isinstance(verdict, dict) or verdict.get("status") not in VERDICT_STATUSES:
+        return None
+    return verdict
+
+
+class ModerationVerdictCache:
+    """Thread-safe LRU cache of moderation verdicts whose entries expire after a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(content: str, content_type: Optional[str], version: str) -> Tuple[str, str, str]:
+        """Return the cache key of one moderation request."""
+        return normalize_content(content), (content_type or "").strip().lower(), version
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached verdict for ``key``, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl_seconds:
+                del self._entries[key]
+                self._counters["expired"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return dict(entry[1])
+
+    def put(self, key: Tuple[str, str, str], verdict: Dict[str, Any]) -> None:
+        """Store ``verdict`` under ``key``, evicting the least recently used entries."""
+        with self._lock:
+            self._entries[key] = (self._clock(), dict(verdict))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters, the hit rate and the number of entries."""
+        with self._lock:
+            stats: Dict[str, float] = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+_CACHE: ModerationVerdictCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_moderation_verdict_cache() -> ModerationVerdictCache:
+    """Return the process-wide moderation verdict cache."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            config = get_config()
+            _CACHE = ModerationVerdictCache(
+                max_entries=config.moderation_cache_max_entries,
+                ttl_seconds=config.moderation_cache_ttl_seconds,
+            )
+        return _CACHE
@@ -0,0 +1,42 @@
+"""Blocked terms for the rule-based moderation fast path.
+
+BLOCKED_TERMS holds terms that are never acceptable in a children's story, by
+category. Every entry matches whole words or phrases only, so inflections are
+listed explicitly ("murder", "murdered") and innocent words that merely start
+with a term ("retardant", "condominium") are not caught.
+
+Words whose meaning depends on context (naked, cut myself, drugs, shoot him,
+make out) and borderline storytelling words (fight, sword, monster, kill,
+fire, ...) are deliberately left out, so text using them is judged by the
+moderation agent.
+"""
+
+BLOCKED_TERMS = {
+    "profanity": (
+        "fuck", "fucks", "fucked", "fucking", "fucker", "fuckers", "motherfucker",
+        "motherfucking", "shit", "shits", "shitty", "bullshit", "bitch", "bitches",
+        "bastard", "bastards", "asshole", "assholes", "dickhead", "dickheads", "cunt",
+        "cunts", "piss", "pissed", "wank", "wanker", "wankers", "bollocks", "damn",
+        "goddamn", "goddamned", "crap", "slut", "sluts", "whore", "whores", "twat", "twats",
+    ),
+    "adult content": (
+        "sex", "sexy", "sexual", "sexually", "porn", "porno", "pornography", "nudes",
+        "boobs", "penis", "vagina", "orgasm", "erotic", "horny", "strip club", "stripper",
+        "strippers", "condom", "condoms", "one night stand",
+    ),
+    "dangerous content": (
+        "cocaine", "heroin", "meth", "marijuana", "overdose", "overdosed", "get drunk",
+        "got drunk", "vape", "vaping", "suicide", "suicidal", "kill myself",
+        "kill yourself", "self harm", "hang myself", "bleach to drink", "drink bleach",
+    ),
+    "violence": (
+        "murder", "murders", "murdered", "murderer", "behead", "beheaded", "decapitate",
+        "decapitated", "massacre", "massacred", "slaughter", "slaughtered", "torture",
+        "tortured", "stab him", "stab her", "stabbed him", "stabbed her", "rape", "raped",
+        "rapist", "bloodbath", "school shooting", "mass shooting", "terrorist", "terrorists",
+    ),
+    "hate speech": (
+        "nazi", "nazis", "hitler", "kkk", "white power", "retard", "retards", "retarded",
+        "faggot", "faggots", "tranny",
+    ),
+}
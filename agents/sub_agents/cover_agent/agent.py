@@ -7,15 +7,20 @@ It first generates a prompt, then creates the actual image.
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.tools.function_tool import FunctionTool
-from google.genai import types
+from google.adk.tools.tool_context import ToolContext
 from .prompts import instruction_cover_agent
-from .image_generator import generate_image
+from agents.sub_agents.content_moderation.image_gate import get_image_prompt_gate
+from .image_jobs import start_image_job
+from .image_store import story_session_id
+from agents.story_coach.state import record_story_images
 
 from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from agents.models import get_model
+from agents.routing import get_model_route
+from agents.prompt_cache import prompt_cache_args, record_prompt_cache_usage
 
 
-def generate_cover_image(prompt: str) -> str:
+async def generate_cover_image(prompt: str, tool_context: ToolContext) -> dict:
     """
     Generate a cover image from a text prompt. Use this after creating the image prompt description.
     
@@ -23,23 +28,44 @@ def generate_cover_image(prompt: str) -> str:
         prompt: Text description of the cover image to generate
     
     Returns:
-        Path to the generated image file
+        {"status": "done", "image_path": ..., "webp_path": ..., "thumbnail_path": ...}
+        when the image is ready (it is saved as the story's cover), {"status": "queued", "job_id": ...} when it is
+        being drawn in the background, or {"status": "blocked", "reason": ...,
+        "kid_friendly_message": ...} when the prompt failed the safety check and
+        nothing was drawn
     """
-    return generate_image(prompt, prefix="cover")
+    # Moderate before paying for the image
+    blocked = await get_image_prompt_gate().check(prompt, "cover", tool_context)
+    if blocked is not None:
+        return blocked
+    # The image stack (openai, numpy, PIL) is imported on first use, not at start-up
+    from .image_generator import agenerate_image_manifest
+
+    session_id = story_session_id(tool_context)
+    if get_config().image_background_jobs:
+        return start_image_job(
+            "cover",
+            lambda: agenerate_image_manifest(prompt, prefix="cover", session_id=session_id),
+            tool_context,
+        )
+    manifest = await agenerate_image_manifest(prompt, prefix="cover", session_id=session_id)
+    record_story_images(tool_context.state, [(None, manifest)])
+    return {"status": "done", **manifest}
 
 
 # Create function tool for image generation
 generate_image_tool = FunctionTool(func=generate_cover_image)
 
-config = get_config()
-model = LiteLlm(model=config.text_model_name)
+route = get_model_route("cover", temperature=0.7)
+model = get_model(route.model_name, **prompt_cache_args())
 
 cover_agent = Agent(
     model=model,
     name="cover_agent",
-    instruction=instruction_cover_agent(),
+    static_instruction=instruction_cover_agent(),
     tools=[generate_image_tool],
-    generate_content_config=types.GenerateContentConfig(temperature=0.7),
+    generate_content_config=route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
     description="Generates child-friendly cover images for storybooks.",
 )
 
@@ -0,0 +1,258 @@
+"""Pluggable backends that turn an image prompt into a PNG file.
+
+agenerate_image handles caching, near-duplicate reuse, sharding and the
+manifest; the backend only renders. ``openai`` calls the images endpoint
+through pooled clients and the shared rate limiter. ``local`` draws a
+deterministic PNG from the prompt after a configurable synthetic latency and
+error rate, so cover and page throughput, caching and concurrency can be
+benchmarked offline without spending money.
+
+The backend comes from IMAGE_BACKEND, or from IMAGE_MODEL_NAME when that is
+``auto`` (model names starting with ``local`` select the local backend).
+Further backends can be added with register_image_backend.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import random
+import weakref
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import httpx
+from openai import AsyncOpenAI
+from PIL import Image
+
+from config.settings import Config, get_config
+from .image_rate_limiter import get_image_rate_limiter
+
+IMAGE_SIZE = "1024x1024"
+IMAGE_TIMEOUT_SECONDS = 120.0
+# Base64 is decoded in slices that are a multiple of 4 characters so each slice
+# decodes on its own; downloads are streamed in chunks of the same order.
+B64_CHUNK_CHARS = 64 * 1024
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# The local backend paints a grid of this many cells per side.
+LOCAL_GRID_CELLS = 8
+
+
+class ImageBackend(ABC):
+    """Renders one prompt into an image file."""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    @property
+    def cache_model(self) -> str:
+        """Model identifier used in image cache keys."""
+        return self.model_name
+
+    @abstractmethod
+    def request_params(self) -> Dict[str, Any]:
+        """Return the render settings; "size" and "quality" are part of the cache key."""
+
+    @abstractmethod
+    async def render(self, prompt: str, target: Path) -> None:
+        """Write the image for ``prompt`` to ``target``."""
+
+
+@dataclass
+class ImageClients:
+    """Long-lived clients shared by every image request on one event loop."""
+
+    openai: AsyncOpenAI
+    http: httpx.AsyncClient
+
+
+# httpx connection pools are bound to the event loop that created them, so one
+# set of clients is kept per running loop and dropped together with the loop.
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ImageClients]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_image_clients() -> ImageClients:
+    """Return the pooled image clients for the running event loop."""
+    loop = asyncio.get_running_loop()
+    clients = _CLIENTS.get(loop)
+    if clients is None:
+        config = get_config()
+        max_connections = config.image_http_max_connections
+        http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=IMAGE_TIMEOUT_SECONDS,
+            follow_redirects=True,
+        )
+        clients = ImageClients(
+            # Retries are handled by the shared image rate limiter, not the SDK
+            openai=AsyncOpenAI(api_key=config.openai_api_key, http_client=http, max_retries=0),
+            http=http,
+        )
+        _CLIENTS[loop] = clients
+    return clients
+
+
+async def aclose_image_clients() -> None:
+    """Close the pooled image clients of the running event loop, if any."""
+    clients = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if clients is not None:
+        await clients.openai.close()
+        await clients.http.aclose()
+
+
+def image_request_params(model_name: str, response_format: str = "b64_json") -> Dict[str, Any]:
+    """
+    Map the configured image model name to images.generate parameters.
+
+    Args:
+        model_name: The configured IMAGE_MODEL_NAME
+        response_format: "b64_json" to receive the image inline, or "url" to
+            download it afterwards. gpt-image models always answer inline.
+
+    Returns:
+        Keyword arguments for images.generate (model and quality are omitted
+        when the endpoint default should be used)
+    """
+    # OpenAI image generation uses the images.generate endpoint
+    # Supported models: dall-e-2, dall-e-3
+    # gpt-image models (and anything unrecognised) use the endpoint default
+    model = model_name.lower()
+    params: Dict[str, Any] = {"size": IMAGE_SIZE}
+    if "dall-e" in model or "dalle" in model:
+        params["model"] = "dall-e-3" if "3" in model else "dall-e-2"
+        if "3" in model:
+            params["quality"] = "standard"
+        params["response_format"] = response_format
+    return params
+
+
+def write_b64_image(b64_data: str, filepath: Path) -> None:
+    """Decode a base64 image into ``filepath`` slice by slice."""
+    with open(filepath, "wb") as f:
+        for start in range(0, len(b64_data), B64_CHUNK_CHARS):
+            f.write(base64.b64decode(b64_data[start:start + B64_CHUNK_CHARS]))
+
+
+async def download_image(http: httpx.AsyncClient, url: str, filepath: Path) -> None:
+    """Stream an image URL into ``filepath`` without buffering the whole body."""
+    async with http.stream("GET", url) as response:
+        response.raise_for_status()
+        with open(filepath, "wb") as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+
+
+class OpenAIImageBackend(ImageBackend):
+    """Generates images with OpenAI's images endpoint."""
+
+    def __init__(self, model_name: str, response_format: str = "b64_json"):
+        super().__init__(model_name)
+        self.response_format = response_format
+
+    def request_params(self) -> Dict[str, Any]:
+        return image_request_params(self.model_name, self.response_format)
+
+    async def render(self, prompt: str, target: Path) -> None:
+        clients = get_image_clients()
+        params = self.request_params()
+
+        # Generate image using OpenAI API, within the shared rate limits and
+        # retrying 429/5xx/connection errors with backoff
+        response = await get_image_rate_limiter().call(
+            lambda: clients.openai.images.generate(prompt=prompt, n=1, **params)
+        )
+        image = response.data[0]
+        if image.b64_json:
+            await asyncio.to_thread(write_b64_image, image.b64_json, target)
+        else:
+            await download_image(clients.http, image.url, target)
+
+
+class LocalImageBackendError(RuntimeError):
+    """Synthetic failure injected by the local backend."""
+
+
+def render_local_png(prompt: str, size: str, target: Path) -> None:
+    """Paint a PNG that depends only on ``prompt`` and ``size``."""
+    width, height = (int(n) for n in size.split("x"))
+    pixels = hashlib.shake_256(prompt.encode("utf-8")).digest(3 * LOCAL_GRID_CELLS ** 2)
+    cells = Image.frombytes("RGB", (LOCAL_GRID_CELLS, LOCAL_GRID_CELLS), pixels)
+    cells.resize((width, height), Image.NEAREST).save(target, format="PNG")
+
+
+class LocalImageBackend(ImageBackend):
+    """Offline stand-in that draws deterministic PNGs after a synthetic delay."""
+
+    def __init__(
+        self,
+        model_name: str,
+        latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        rng: random.Random | None = None,
+    ):
+        super().__init__(model_name)
+        self.latency_seconds = latency_seconds
+        self.error_rate = error_rate
+        self._rng = rng or random.Random()
+
+    @property
+    def cache_model(self) -> str:
+        # Keep local images apart from real ones rendered under the same model name
+        name = self.model_name.lower()
+        return name if name.startswith("local") else f"local:{self.model_name}"
+
+    def request_params(self) -> Dict[str, Any]:
+        return {"size": IMAGE_SIZE}
+
+    async def render(self, prompt: str, target: Path) -> None:
+        if self.latency_seconds > 0:
+            await asyncio.sleep(self.latency_seconds)
+        if self.error_rate > 0 and self._rng.random() < self.error_rate:
+            raise LocalImageBackendError("synthetic image backend failure")
+        await asyncio.to_thread(render_local_png, prompt, IMAGE_SIZE, target)
+
+
+_BACKENDS: Dict[str, Callable[[Config], ImageBackend]] = {
+    "openai": lambda config: OpenAIImageBackend(
+        config.image_model_name, config.image_response_format
+    ),
+    "local": lambda config: LocalImageBackend(
+        config.image_model_name,
+        latency_seconds=config.image_local_latency_ms / 1000.0,
+        error_rate=config.image_local_error_rate,
+    ),
+}
+
+
+def register_image_backend(name: str, factory: Callable[[Config], ImageBackend]) -> None:
+    """Make a backend selectable through IMAGE_BACKEND=``name``."""
+    _BACKENDS[name.lower()] = factory
+
+
+def image_backend_name(config: Config) -> str:
+    """Return the backend configured by IMAGE_BACKEND, resolving ``auto`` from IMAGE_MODEL_NAME."""
+    name = config.image_backend.lower()
+    if name == "auto":
+        name = "local" if config.image_model_name.lower().startswith("local") else "openai"
+    return name
+
+
+def get_image_backend() -> ImageBackend:
+    """Return the image backend for the current configuration."""
+    config = get_config()
+    name = image_backend_name(config)
+    factory = _BACKENDS.get(name)
+    if factory is None:
+        raise RuntimeError(
+            f"Unknown image backend {name!r}; expected one of: {', '.join(sorted(_BACKENDS))}"
+        )
+    return factory(config)
+
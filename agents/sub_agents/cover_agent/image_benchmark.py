@@ -0,0 +1,177 @@
+"""Offline throughput benchmark for cover and page illustrations.
+
+Runs a synthetic workload of stories (one cover each, pages spread over the
+stories, exact repeats and near-duplicate prompts within a story) through
+agenerate_image with the local image backend and reports throughput, latency
+percentiles, failures, and cache and near-duplicate hit rates. Near-duplicate
+reuse is off unless --similarity-threshold (or IMAGE_SIMILARITY_THRESHOLD)
+is set, e.g. to 0.97. Example:
+
+    python -m agents.sub_agents.cover_agent.image_benchmark --pages 200 \
+        --concurrency 20 --latency-ms 800 --error-rate 0.05 --similarity-threshold 0.97
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config.settings import get_config
+from .image_cache import get_image_cache
+from .image_generator import CACHE_DIRNAME, agenerate_image
+from .prompt_index import get_prompt_index
+
+_SUBJECTS = ["a dragon", "a robot", "a fox", "two friends", "a tiny knight", "a whale"]
+_ACTIONS = ["flying over", "reading in", "dancing near", "sleeping under", "exploring"]
+_PLACES = ["a castle", "the sea", "a candy forest", "the moon", "a busy market"]
+
+
+def benchmark_prompts(
+    covers: int, pages: int, repeat_ratio: float = 0.2, seed: int = 0
+) -> List[Tuple[str, str, str]]:
+    """
+    Build a reproducible (session id, prefix, prompt) workload.
+
+    Each cover starts a story and the pages are dealt out over the stories.
+    About ``repeat_ratio`` of the pages repeat an earlier page prompt of the
+    same story, exactly or re-typed with different punctuation, as happens
+    when children redo a page.
+    """
+    rng = random.Random(seed)
+    sessions = [f"benchmark-story-{n}" for n in range(max(1, covers))]
+    work = [
+        (sessions[n], "cover", f"Book cover {n}: {rng.choice(_SUBJECTS)} in {rng.choice(_PLACES)}")
+        for n in range(covers)
+    ]
+    page_prompts: Dict[str, List[str]] = {session_id: [] for session_id in sessions}
+    for n in range(pages):
+        session_id = sessions[n % len(sessions)]
+        earlier_prompts = page_prompts[session_id]
+        if earlier_prompts and rng.random() < repeat_ratio:
+            earlier = rng.choice(earlier_prompts)
+            prompt = earlier if rng.random() < 0.5 else f"{earlier}!"
+        else:
+            prompt = (
+                f"Page {n}: {rng.choice(_SUBJECTS)} {rng.choice(_ACTIONS)} "
+                f"{rng.choice(_PLACES)}, watercolor style"
+            )
+        earlier_prompts.append(prompt)
+        work.append((session_id, "page", prompt))
+    return work
+
+
+async def run_image_benchmark(
+    covers: int = 5,
+    pages: int = 50,
+    concurrency: Optional[int] = None,
+    repeat_ratio: float = 0.2,
+    output_dir: Optional[str] = None,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Generate the benchmark workload and return timing and cache statistics.
+
+    Args:
+        covers: Number of cover images
+        pages: Number of page images
+        concurrency: Maximum generations in flight (default IMAGE_BATCH_CONCURRENCY)
+        repeat_ratio: Share of page prompts that repeat or nearly repeat an earlier one
+        output_dir: Where images go (default: a fresh temporary directory, so
+            caches start cold)
+        seed: Workload seed
+
+    Returns:
+        Throughput, latency percentiles, failure count and cache/near-duplicate
+        statistics for the run
+    """
+    if output_dir is None:
+        with tempfile.TemporaryDirectory(prefix="image-benchmark-") as tmp:
+            return await run_image_benchmark(covers, pages, concurrency, repeat_ratio, tmp, seed)
+
+    config = get_config()
+    semaphore = asyncio.Semaphore(max(1, concurrency or config.image_batch_concurrency))
+    latencies: List[float] = []
+    failures = 0
+
+    async def _one(session_id: str, prefix: str, prompt: str) -> None:
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await agenerate_image(prompt, output_dir=output_dir, prefix=prefix, session_id=session_id)
+            except RuntimeError:
+                failures += 1
+                return
+            latencies.append(time.perf_counter() - start)
+
+    work = benchmark_prompts(covers, pages, repeat_ratio, seed)
+    started = time.perf_counter()
+    await asyncio.gather(*(_one(*item) for item in work))
+    elapsed = time.perf_counter() - started
+
+    cache_dir = Path(output_dir) / CACHE_DIRNAME
+    ordered = sorted(latencies)
+    return {
+        "images": len(work),
+        "failures": failures,
+        "seconds": round(elapsed, 3),
+        "images_per_second": round(len(work) / elapsed, 2) if elapsed else 0.0,
+        "latency_p50": round(statistics.median(ordered), 4) if ordered else None,
+        "latency_p95": round(ordered[int(0.95 * (len(ordered) - 1))], 4) if ordered else None,
+        "cache": get_image_cache(cache_dir, config.image_cache_max_mb * 1024 * 1024).stats(),
+        "similarity_threshold": config.image_similarity_threshold,
+        "near_duplicates": get_prompt_index(cache_dir).stats(),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point; always uses the local image backend."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--covers", type=int, default=5)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--repeat-ratio", type=float, default=0.2)
+    parser.add_argument("--latency-ms", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=None)
+    parser.add_argument(
+        "--similarity-threshold",
+        type=float,
+        default=None,
+        help="Reuse near-duplicate images above this cosine similarity (0.97 or more; default: off)",
+    )
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # Configure before the first get_config() call
+    os.environ["IMAGE_BACKEND"] = "local"
+    if args.latency_ms is not None:
+        os.environ["IMAGE_LOCAL_LATENCY_MS"] = str(args.latency_ms)
+    if args.error_rate is not None:
+        os.environ["IMAGE_LOCAL_ERROR_RATE"] = str(args.error_rate)
+    if args.similarity_threshold is not None:
+        os.environ["IMAGE_SIMILARITY_THRESHOLD"] = str(args.similarity_threshold)
+
+    result = asyncio.run(
+        run_image_benchmark(
+            covers=args.covers,
+            pages=args.pages,
+            concurrency=args.concurrency,
+            repeat_ratio=args.repeat_ratio,
+            output_dir=args.output_dir,
+            seed=args.seed,
+        )
+    )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
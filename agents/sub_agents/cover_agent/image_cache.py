@@ -0,0 +1,165 @@
+"""Content-addressed on-disk cache for generated images.
+
+Images are stored under the full SHA-256 of the request parameters
+(model, size, quality, prompt) so a prompt that has already been rendered
+is served from disk instead of paying for another image generation.
+A JSON index tracks entry sizes and access times; once the cache grows past
+its byte budget the least recently used entries are evicted. Hits only
+update recency in memory; the index is written on every put (which is when
+eviction runs), by ``flush()``, and at most every INDEX_FLUSH_SECONDS from
+``get()``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+INDEX_FILENAME = "index.json"
+INDEX_FLUSH_SECONDS = 30.0
+
+
+class ImageCache:
+    """LRU image cache backed by a directory and a JSON index."""
+
+    def __init__(self, cache_dir: str | Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index: "OrderedDict[str, dict]" = self._load_index()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    @staticmethod
+    def make_key(model: str, size: str, quality: Optional[str], prompt: str) -> str:
+        """Return the cache key for an image request."""
+        payload = json.dumps([model, size, quality, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Path]:
+        """Return the cached file for ``key``, or None on a miss."""
+        with self._lock:
+            entry = self._index.get(key)
+            path = self.cache_dir / entry["file"] if entry else None
+            if path is None or not path.exists():
+                if entry is not None:
+                    del self._index[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["last_access"] = time.time()
+            self._index.move_to_end(key)
+            self._dirty = True
+            self.hits += 1
+            if time.monotonic() - self._saved_at >= INDEX_FLUSH_SECONDS:
+                self._save_index()
+            return path
+
+    def put(self, key: str, source: str | Path) -> Path:
+        """Copy ``source`` into the cache under ``key`` and evict if over budget."""
+        filename = f"{key}{Path(source).suffix or '.png'}"
+        target = self.cache_dir / filename
+        # Unique per call: puts of the same key can run in parallel threads
+        tmp = target.with_name(f"{filename}.{uuid.uuid4().hex}.tmp")
+        shutil.copyfile(source, tmp)
+        os.replace(tmp, target)
+        with self._lock:
+            self._index[key] = {
+                "file": filename,
+                "size": target.stat().st_size,
+                "last_access": time.time(),
+            }
+            self._index.move_to_end(key)
+            self._evict(keep=key)
+            self._save_index()
+        return target
+
+    def flush(self) -> None:
+        """Write the index if hits changed it since the last write."""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def total_bytes(self) -> int:
+        """Return the combined size of all cached files."""
+        with self._lock:
+            return sum(entry["size"] for entry in self._index.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss/eviction counters and current cache usage."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._index),
+                "bytes": sum(entry["size"] for entry in self._index.values()),
+            }
+
+    def _evict(self, keep: str) -> None:
+        total = sum(entry["size"] for entry in self._index.values())
+        for key in list(self._index):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            entry = self._index.pop(key)
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            total -= entry["size"]
+            self.evictions += 1
+
+    def _load_index(self) -> "OrderedDict[str, dict]":
+        index_path = self.cache_dir / INDEX_FILENAME
+        try:
+            entries = json.loads(index_path.read_text())
+        except (OSError, ValueError):
+            return OrderedDict()
+        ordered = sorted(entries.items(), key=lambda item: item[1].get("last_access", 0))
+        return OrderedDict(ordered)
+
+    def _save_index(self) -> None:
+        index_path = self.cache_dir / INDEX_FILENAME
+        tmp = index_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self._index))
+        os.replace(tmp, index_path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+
+_CACHES: Dict[Path, ImageCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_image_cache(cache_dir: str | Path, max_bytes: int) -> ImageCache:
+    """Return the shared ImageCache for ``cache_dir``."""
+    cache_path = Path(cache_dir).resolve()
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_path)
+        if cache is None:
+            cache = ImageCache(cache_path, max_bytes)
+            _CACHES[cache_path] = cache
+        return cache
+
+
+def flush_image_caches() -> None:
+    """Write the index of every shared ImageCache that hits have changed."""
+    with _CACHES_LOCK:
+        caches = list(_CACHES.values())
+    for cache in caches:
+        cache.flush()
+
+
+atexit.register(flush_image_caches)
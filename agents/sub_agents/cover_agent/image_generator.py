@@ -1,92 +1,274 @@
 """Image generation utility for cover and page illustrations."""
 
+import asyncio
 import hashlib
+import os
+import shutil
+import time
+import uuid
 from pathlib import Path
-from typing import Optional
-
-import requests
-from openai import OpenAI
+from typing import Any, Dict, List, Optional, Sequence
 
 from config.settings import get_config
+from .image_backends import aclose_image_clients, get_image_backend
+from .image_cache import ImageCache, get_image_cache
+from .image_store import ImageStore, get_image_store
+from .image_variants import aget_image_variants
+from .prompt_index import get_prompt_index
 
+CACHE_DIRNAME = ".cache"
 
-def generate_image(prompt: str, output_dir: Optional[str] = None, prefix: str = "image") -> str:
+
+def cache_key_namespace(model_name: str, params: Dict[str, Any]) -> str:
+    """Return the model settings part of a cache namespace."""
+    return f"{model_name}|{params['size']}|{params.get('quality')}"
+
+
+async def agenerate_image(
+    prompt: str,
+    output_dir: Optional[str] = None,
+    prefix: str = "image",
+    session_id: Optional[str] = None,
+    page_number: Optional[int] = None,
+) -> str:
     """
-    Generate an image using OpenAI's image generation API.
-    
+    Generate an image with the configured image backend without blocking the event loop.
+
+    Prompts that have already been rendered with the same model settings are
+    served from the on-disk image cache without calling the backend. Images are
+    written to a shard directory under the output directory and recorded in
+    its manifest. Cache, file and manifest work runs in worker threads.
+
     Args:
         prompt: Text prompt describing the image to generate
         output_dir: Optional directory to save the image. If None, uses config OUTPUT_DIR.
         prefix: Prefix for the filename (e.g., "cover" or "page")
-    
+        session_id: Story session the image belongs to (used for sharding and the manifest)
+        page_number: Story page the image illustrates, if any
+
     Returns:
         Path to the saved image file
     """
+    # Imported here: agents.accounting pulls in ADK's plugin stack
+    from agents.accounting import record_image
+
     config = get_config()
-    
-    # Initialize OpenAI client
-    client = OpenAI(api_key=config.openai_api_key)
-    
+
     # Use output_dir from config if not provided
     if output_dir is None:
         output_dir = config.output_dir
-    
+
     # Ensure output directory exists
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
+    store = get_image_store(output_dir)
+
+    # Generate filename
+    filename_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
+    filename = store.image_filename(f"{prefix}_{filename_hash}", session_id)
+    filepath = (await asyncio.to_thread(store.shard_dir, session_id)) / filename
+
+    backend = get_image_backend()
+    params = backend.request_params()
+    cache = get_image_cache(
+        Path(output_dir) / CACHE_DIRNAME,
+        max_bytes=config.image_cache_max_mb * 1024 * 1024,
+    )
+    cache_key = ImageCache.make_key(
+        backend.cache_model, params["size"], params.get("quality"), prompt
+    )
+    started = time.perf_counter()
+    if await asyncio.to_thread(_copy_cached, cache, cache_key, filepath):
+        record_image(session_id, prefix, cached=True, seconds=time.perf_counter() - started)
+        return await _stored(store, filepath, cache_key, session_id, page_number, prefix)
+
+    # Reuse the image of a near-identical earlier prompt of the same kind in
+    # the same story; images are never shared between sessions this way
+    threshold = config.image_similarity_threshold
+    prompt_index = get_prompt_index(Path(output_dir) / CACHE_DIRNAME)
+    namespace = f"{prefix}|{session_id}|{cache_key_namespace(backend.cache_model, params)}"
+    if threshold > 0 and session_id:
+        match = await asyncio.to_thread(prompt_index.find_similar, prompt, namespace, threshold)
+        if match is not None:
+            if await asyncio.to_thread(_copy_cached, cache, match[0], filepath):
+                record_image(session_id, prefix, cached=True, seconds=time.perf_counter() - started)
+                return await _stored(store, filepath, cache_key, session_id, page_number, prefix)
+            await asyncio.to_thread(prompt_index.forget, match[0])
+
+    # Write to a temporary file first so a failed transfer never leaves a
+    # truncated image at the final path
+    tmp_path = filepath.with_name(f"{filepath.name}.{uuid.uuid4().hex}.part")
     try:
-        # Generate image using OpenAI API
-        # OpenAI image generation uses the images.generate endpoint
-        # Supported models: dall-e-2, dall-e-3
-        # For gpt-image-1 models, they may use a different endpoint
-        model = config.image_model_name.lower()
-        
-        # Handle different model types
-        if "dall-e" in model or "dalle" in model:
-            # Use DALL-E models
-            dalle_model = "dall-e-3" if "3" in model else "dall-e-2"
-            response = client.images.generate(
-                model=dalle_model,
-                prompt=prompt,
-                n=1,
-                size="1024x1024",
-                quality="standard" if "3" in model else None
-            )
-            image_url = response.data[0].url
-        elif "gpt-image" in model:
-            # gpt-image models may need different handling
-            # Try using the images.generate endpoint without model specification
-            # or use a compatible model
-            response = client.images.generate(
-                prompt=prompt,
-                n=1,
-                size="1024x1024"
-            )
-            image_url = response.data[0].url
-        else:
-            # Default: try standard image generation
-            response = client.images.generate(
-                prompt=prompt,
-                n=1,
-                size="1024x1024"
-            )
-            image_url = response.data[0].url
-        
-        # Download and save the image
-        image_response = requests.get(image_url)
-        image_response.raise_for_status()
-        
-        # Generate filename
-        filename_hash = hashlib.md5(prompt.encode()).hexdigest()[:8]
-        filename = f"{prefix}_{filename_hash}.png"
-        filepath = Path(output_dir) / filename
-        
-        # Save image
-        with open(filepath, 'wb') as f:
-            f.write(image_response.content)
-        
-        return str(filepath)
-        
+        await backend.render(prompt, tmp_path)
+        os.replace(tmp_path, filepath)
     except Exception as e:
+        record_image(
+            session_id, prefix, cached=False, seconds=time.perf_counter() - started, error=str(e)
+        )
         raise RuntimeError(f"Failed to generate image: {e}") from e
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    record_image(session_id, prefix, cached=False, seconds=time.perf_counter() - started)
+
+    await asyncio.to_thread(cache.put, cache_key, filepath)
+    if session_id:
+        await asyncio.to_thread(prompt_index.add, prompt, namespace, cache_key)
+    return await _stored(store, filepath, cache_key, session_id, page_number, prefix)
+
+
+def _copy_cached(cache: ImageCache, key: str, target: Path) -> bool:
+    """Copy the cached image of ``key`` to ``target``; False on a cache miss."""
+    cached_path = cache.get(key)
+    if cached_path is None:
+        return False
+    shutil.copyfile(cached_path, target)
+    return True
+
+
+async def _stored(
+    store: ImageStore,
+    filepath: Path,
+    cache_key: str,
+    session_id: Optional[str],
+    page_number: Optional[int],
+    kind: str,
+) -> str:
+    """Record a finished image in the output manifest and run GC if it is due."""
+    await asyncio.to_thread(
+        store.record,
+        filepath,
+        session_id=session_id,
+        page_number=page_number,
+        kind=kind,
+        prompt_hash=cache_key,
+    )
+    await asyncio.to_thread(store.maybe_collect_garbage)
+    return str(filepath)
+
+
+async def agenerate_image_manifest(
+    prompt: str,
+    output_dir: Optional[str] = None,
+    prefix: str = "image",
+    session_id: Optional[str] = None,
+    page_number: Optional[int] = None,
+) -> Dict[str, str]:
+    """
+    Generate an image and return it together with its preview derivatives.
+
+    Returns:
+        {"image_path", "webp_path", "thumbnail_path"} (see get_image_variants)
+    """
+    path = await agenerate_image(
+        prompt, output_dir=output_dir, prefix=prefix, session_id=session_id, page_number=page_number
+    )
+    return (await aget_image_variants([path]))[0]
+
+
+async def agenerate_images_batch(
+    prompts: Sequence[str],
+    output_dir: Optional[str] = None,
+    prefix: str = "page",
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+    page_numbers: Optional[Sequence[Optional[int]]] = None,
+) -> List[str]:
+    """
+    Generate several images in parallel with a bounded number of in-flight requests.
+
+    Args:
+        prompts: Text prompts, one per image (e.g. one per story page)
+        output_dir: Optional directory to save the images. If None, uses config OUTPUT_DIR.
+        prefix: Prefix for the filenames
+        concurrency: Maximum number of simultaneous generations. If None, uses
+            config IMAGE_BATCH_CONCURRENCY.
+        session_id: Story session the images belong to
+        page_numbers: Story page of each prompt, in the same order
+
+    Returns:
+        Paths to the saved images, in the same order as ``prompts``
+
+    Raises:
+        RuntimeError: If any image fails. Images that did succeed are cached,
+            so retrying the batch only pays for the failed ones.
+    """
+    if concurrency is None:
+        concurrency = get_config().image_batch_concurrency
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    if page_numbers is None or len(page_numbers) != len(prompts):
+        page_numbers = [None] * len(prompts)
+
+    async def _generate(prompt: str, page_number: Optional[int]) -> str:
+        async with semaphore:
+            return await agenerate_image(
+                prompt,
+                output_dir=output_dir,
+                prefix=prefix,
+                session_id=session_id,
+                page_number=page_number,
+            )
+
+    results = await asyncio.gather(
+        *(_generate(p, n) for p, n in zip(prompts, page_numbers)), return_exceptions=True
+    )
+    failures = [(i, r) for i, r in enumerate(results) if isinstance(r, BaseException)]
+    if failures:
+        details = "; ".join(f"image {i + 1}: {error}" for i, error in failures)
+        raise RuntimeError(f"Failed to generate {len(failures)} of {len(prompts)} images: {details}")
+    return list(results)
+
+
+async def agenerate_image_manifests_batch(
+    prompts: Sequence[str],
+    output_dir: Optional[str] = None,
+    prefix: str = "page",
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+    page_numbers: Optional[Sequence[Optional[int]]] = None,
+) -> List[Dict[str, str]]:
+    """Batch counterpart of agenerate_image_manifest, in the same order as ``prompts``."""
+    paths = await agenerate_images_batch(
+        prompts,
+        output_dir=output_dir,
+        prefix=prefix,
+        concurrency=concurrency,
+        session_id=session_id,
+        page_numbers=page_numbers,
+    )
+    return await aget_image_variants(paths)
+
+
+def generate_image(prompt: str, output_dir: Optional[str] = None, prefix: str = "image") -> str:
+    """
+    Synchronous wrapper around agenerate_image for scripts and tests.
+
+    Must not be called from inside a running event loop; async code (including
+    ADK tools) should await agenerate_image instead.
+    """
+
+    async def _run() -> str:
+        try:
+            return await agenerate_image(prompt, output_dir=output_dir, prefix=prefix)
+        finally:
+            await aclose_image_clients()
+
+    return asyncio.run(_run())
+
+
+def generate_images_batch(
+    prompts: Sequence[str],
+    output_dir: Optional[str] = None,
+    prefix: str = "page",
+    concurrency: Optional[int] = None,
+) -> List[str]:
+    """Synchronous wrapper around agenerate_images_batch for scripts and tests."""
+
+    async def _run() -> List[str]:
+        try:
+            return await agenerate_images_batch(
+                prompts, output_dir=output_dir, prefix=prefix, concurrency=concurrency
+            )
+        finally:
+            await aclose_image_clients()
 
+    return asyncio.run(_run())
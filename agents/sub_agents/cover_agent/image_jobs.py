@@ -0,0 +1,218 @@
+"""Background job queue for cover and page illustrations.
+
+Image tools submit work here and return a job id straight away instead of
+holding the child's turn open for the full image latency. Jobs run on a
+dedicated event loop thread (so they outlive the tool call that created them)
+with at most ``workers`` generations in flight; the coach, or a preview panel,
+polls for finished images on later turns.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from google.adk.tools.tool_context import ToolContext
+
+from config.settings import get_config
+
+# Session state key under which tools record the jobs they started.
+STATE_KEY = "image_jobs"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs are kept for polling, oldest dropped first beyond this count.
+MAX_FINISHED_JOBS = 1000
+
+
+@dataclass
+class ImageJob:
+    """One unit of background image work and its outcome."""
+
+    job_id: str
+    kind: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-friendly view of the job for tools and UIs."""
+        data: Dict[str, Any] = {"job_id": self.job_id, "kind": self.kind, "status": self.status}
+        data.update(self.metadata)
+        if self.status == DONE:
+            data["result"] = self.result
+        if self.status == FAILED:
+            data["error"] = self.error
+        return data
+
+
+class ImageJobQueue:
+    """Runs image jobs on a background event loop with a bounded worker pool."""
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._jobs: "OrderedDict[str, ImageJob]" = OrderedDict()
+        self._futures: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        kind: str,
+        work: Callable[[], Awaitable[Any]],
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> ImageJob:
+        """Queue ``work`` (a coroutine factory) and return its job immediately.
+
+        ``work`` runs in a copy of the caller's context, so context variables
+        (e.g. the usage accounting of the tool call) carry over to the job.
+        """
+        loop = self._ensure_started()
+        context = contextvars.copy_context()
+        job = ImageJob(job_id=uuid.uuid4().hex[:12], kind=kind, metadata=dict(metadata or {}))
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._prune()
+            self._futures[job.job_id] = asyncio.run_coroutine_threadsafe(
+                self._run(job, work, context), loop
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[ImageJob]:
+        """Return the job with ``job_id``, or None if unknown or pruned."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def statuses(self, job_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return a status dict per job id (unknown ids are reported as such)."""
+        statuses = []
+        with self._lock:
+            for job_id in job_ids:
+                job = self._jobs.get(job_id)
+                statuses.append(job.to_dict() if job else {"job_id": job_id, "status": "unknown"})
+        return statuses
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> ImageJob:
+        """Block until ``job_id`` finishes (for scripts and tests)."""
+        with self._lock:
+            future = self._futures.get(job_id)
+            job = self._jobs[job_id]
+        if future is not None:
+            done, _ = concurrent.futures.wait([future], timeout=timeout)
+            if not done:
+                raise TimeoutError(f"Image job {job_id} did not finish within {timeout}s")
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of jobs in each state."""
+        counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """Stop the background loop; queued and running jobs are abandoned."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+
+    async def _run(
+        self, job: ImageJob, work: Callable[[], Awaitable[Any]], context: contextvars.Context
+    ) -> None:
+        async with self._slots:
+            job.status = RUNNING
+            try:
+                job.result = await asyncio.get_running_loop().create_task(work(), context=context)
+                job.status = DONE
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+            finally:
+                job.finished_at = time.time()
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+            ready = threading.Event()
+
+            def _serve() -> None:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                self._slots = asyncio.Semaphore(self.workers)
+                self._loop = loop
+                ready.set()
+                loop.run_forever()
+
+            self._thread = threading.Thread(target=_serve, name="image-jobs", daemon=True)
+            self._thread.start()
+            ready.wait()
+            return self._loop
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None]
+        for job_id in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+
+
+_QUEUE: ImageJobQueue | None = None
+_QUEUE_LOCK = threading.Lock()
+
+
+def get_image_job_queue() -> ImageJobQueue:
+    """Return the process-wide image job queue."""
+    global _QUEUE
+    with _QUEUE_LOCK:
+        if _QUEUE is None:
+            _QUEUE = ImageJobQueue(workers=get_config().image_job_workers)
+        return _QUEUE
+
+
+def start_image_job(
+    kind: str,
+    work: Callable[[], Awaitable[Any]],
+    tool_context: ToolContext,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Submit ``work`` to the job queue and record the job in session state.
+
+    Args:
+        kind: Job kind, e.g. "cover", "page" or "pages"
+        work: Coroutine factory that produces the job result
+        tool_context: The calling tool's context; the job id is stored under
+            ``image_jobs`` so later turns can poll it with check_image_jobs
+        metadata: Extra fields reported with the job status (e.g. page_number)
+
+    Returns:
+        The job id and its initial status
+    """
+    metadata = dict(metadata or {})
+    job = get_image_job_queue().submit(kind, work, metadata)
+    # Reassign rather than mutate so the change is captured as a state delta
+    # and forwarded from the sub-agent session to the StoryCoach session.
+    jobs = dict(tool_context.state.get(STATE_KEY) or {})
+    jobs[job.job_id] = {"kind": kind, **metadata}
+    tool_context.state[STATE_KEY] = jobs
+    return {"job_id": job.job_id, "status": QUEUED}
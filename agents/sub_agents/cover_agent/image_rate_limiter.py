@@ -0,0 +1,201 @@
+"""Shared rate limiting and retry policy for the image generation API.
+
+All image requests in the process draw from two token buckets (requests per
+minute and images per minute) before they are sent. Rate-limit (429),
+timeout, connection and 5xx errors are retried with exponential backoff and
+full jitter, honouring the server's Retry-After header when one is sent.
+Counters record how often requests were throttled locally or retried, which
+is what quota sizing needs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import datetime
+import email.utils
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import openai
+
+from config.settings import get_config
+
+T = TypeVar("T")
+
+BASE_RETRY_DELAY_SECONDS = 1.0
+MAX_RETRY_DELAY_SECONDS = 30.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` tokens a minute."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Take ``tokens`` from the bucket and return how long to wait before using them.
+
+        The bucket may go into debt, so concurrent callers queue up behind one
+        another instead of racing for the same refill.
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+def is_retryable(error: Exception) -> bool:
+    """Return True for errors worth retrying: 429s, 5xx, timeouts and connection failures."""
+    if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError, openai.RateLimitError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Return the delay requested by the server's Retry-After headers, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return max(0.0, float(retry_after_ms) / 1000.0)
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    # An HTTP date; anything unparseable falls back to backoff
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class ImageRateLimiter:
+    """Applies the rate limits and retry policy around image API calls."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        images_per_minute: int,
+        max_retries: int,
+        base_delay: float = BASE_RETRY_DELAY_SECONDS,
+        max_delay: float = MAX_RETRY_DELAY_SECONDS,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute, clock) if requests_per_minute > 0 else None
+        self.image_bucket = TokenBucket(images_per_minute, clock) if images_per_minute > 0 else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "throttled": 0,
+            "throttled_seconds": 0.0,
+            "retried": 0,
+            "rate_limited": 0,
+            "failed": 0,
+        }
+
+    async def call(self, request: Callable[[], Awaitable[T]], images: int = 1) -> T:
+        """
+        Run ``request`` under the rate limits, retrying transient failures.
+
+        Args:
+            request: Coroutine factory that performs one API call
+            images: Number of images the call produces (counted against images/min)
+
+        Returns:
+            Whatever ``request`` returns
+
+        Raises:
+            The last error once it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            await self._acquire(images)
+            self._count("requests")
+            try:
+                return await request()
+            except Exception as e:
+                if isinstance(e, openai.RateLimitError):
+                    self._count("rate_limited")
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    self._count("failed")
+                    raise
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = self.backoff_delay(attempt)
+                attempt += 1
+                self._count("retried")
+                await self._sleep(min(delay, self.max_delay))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given zero-based attempt."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def stats(self) -> Dict[str, float]:
+        """Return request, throttling and retry counters."""
+        with self._lock:
+            return dict(self._counters)
+
+    async def _acquire(self, images: int) -> None:
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.image_bucket is not None:
+            wait = max(wait, self.image_bucket.reserve(images))
+        if wait > 0:
+            self._count("throttled")
+            self._count("throttled_seconds", wait)
+            await self._sleep(wait)
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+
+_LIMITER: ImageRateLimiter | None = None
+_LIMITER_LOCK = threading.Lock()
+
+
+def get_image_rate_limiter() -> ImageRateLimiter:
+    """Return the process-wide image rate limiter."""
+    global _LIMITER
+    with _LIMITER_LOCK:
+        if _LIMITER is None:
+            config = get_config()
+            _LIMITER = ImageRateLimiter(
+                requests_per_minute=config.image_requests_per_minute,
+                images_per_minute=config.image_images_per_minute,
+                max_retries=config.image_max_retries,
+            )
+        return _LIMITER
@@ -0,0 +1,233 @@
+"""Sharded output storage with a SQLite manifest and garbage collection.
+
+Generated images are spread over per-day (``YYYY/MM/DD``) or per-session
+directories instead of one flat folder, and every file is recorded in a
+SQLite manifest (session id, page number, kind, prompt hash, size,
+created_at). Listings, exports and cleanup query the manifest rather than
+walking the directory tree. The garbage collector deletes images past their
+TTL and then the oldest images until the disk quota is met; it runs
+opportunistically at most once per configured interval.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config.settings import get_config
+from .image_variants import variant_paths
+
+MANIFEST_FILENAME = "manifest.sqlite3"
+
+# Session state key holding the StoryCoach session id. AgentTool runs each
+# sub-agent in a fresh session, so tools read the story's id from here.
+SESSION_STATE_KEY = "story_session_id"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    session_id TEXT,
+    page_number INTEGER,
+    kind TEXT,
+    prompt_hash TEXT,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS images_by_session ON images (session_id, page_number);
+CREATE INDEX IF NOT EXISTS images_by_created_at ON images (created_at);
+"""
+
+
+def story_session_id(tool_context: Any) -> Optional[str]:
+    """Return the StoryCoach session id visible from a tool call, if any."""
+    session_id = tool_context.state.get(SESSION_STATE_KEY)
+    if session_id:
+        return session_id
+    session = getattr(tool_context, "session", None)
+    return getattr(session, "id", None)
+
+
+class ImageStore:
+    """Places generated images in shard directories and tracks them in SQLite."""
+
+    def __init__(self, root_dir: str | Path, shard_by: str = "date"):
+        self.root_dir = Path(root_dir).resolve()
+        self.shard_by = shard_by
+        self.db_path = self.root_dir / MANIFEST_FILENAME
+        self._lock = threading.Lock()
+        self._last_gc = 0.0
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as db:
+            db.executescript(_SCHEMA)
+
+    def shard_dir(self, session_id: Optional[str] = None, now: Optional[float] = None) -> Path:
+        """Return (and create) the directory a new image should be written to."""
+        if self.shard_by == "none":
+            directory = self.root_dir
+        elif self.shard_by == "session" and session_id:
+            safe_id = "".join(c for c in session_id if c.isalnum() or c in "-_") or "unknown"
+            directory = self.root_dir / "sessions" / safe_id[:2] / safe_id
+        else:
+            day = datetime.fromtimestamp(now or time.time(), tz=timezone.utc)
+            directory = self.root_dir / f"{day:%Y}" / f"{day:%m}" / f"{day:%d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def image_filename(self, stem: str, session_id: Optional[str] = None) -> str:
+        """
+        Return the PNG filename for ``stem`` (e.g. "page_1a2b3c4d").
+
+        Unless images are sharded by session, one directory holds images of
+        many sessions, so the session is part of the name: otherwise the same
+        prompt in two stories would share one file and one manifest row.
+        """
+        if session_id and self.shard_by != "session":
+            stem = f"{stem}_{hashlib.md5(session_id.encode()).hexdigest()[:8]}"
+        return f"{stem}.png"
+
+    def record(
+        self,
+        path: str | Path,
+        *,
+        session_id: Optional[str] = None,
+        page_number: Optional[int] = None,
+        kind: Optional[str] = None,
+        prompt_hash: Optional[str] = None,
+    ) -> None:
+        """Add (or refresh) a manifest row for an image written under the root."""
+        path = Path(path)
+        with self._lock, closing(self._connect()) as db, db:
+            db.execute(
+                "INSERT OR REPLACE INTO images"
+                " (path, session_id, page_number, kind, prompt_hash, size, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self._relative(path),
+                    session_id,
+                    page_number,
+                    kind,
+                    prompt_hash,
+                    path.stat().st_size,
+                    time.time(),
+                ),
+            )
+
+    def session_images(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return the manifest rows of one session, ordered by page number."""
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT * FROM images WHERE session_id = ? ORDER BY page_number, created_at",
+                (session_id,),
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def total_bytes(self) -> int:
+        """Return the combined size of all images in the manifest."""
+        with closing(self._connect()) as db:
+            return db.execute("SELECT COALESCE(SUM(size), 0) FROM images").fetchone()[0]
+
+    def collect_garbage(
+        self, ttl_seconds: float = 0, max_bytes: int = 0, now: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Delete expired images, then the oldest images until under the quota.
+
+        Args:
+            ttl_seconds: Maximum image age; 0 keeps images regardless of age
+            max_bytes: Disk quota for all images; 0 means unlimited
+            now: Current time (for tests)
+
+        Returns:
+            Number of images deleted and bytes freed
+        """
+        now = now or time.time()
+        deleted = freed = 0
+        with self._lock, closing(self._connect()) as db, db:
+            victims = []
+            if ttl_seconds > 0:
+                victims = db.execute(
+                    "SELECT path, size FROM images WHERE created_at < ? ORDER BY created_at",
+                    (now - ttl_seconds,),
+                ).fetchall()
+            if max_bytes > 0:
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM images").fetchone()[0]
+                total -= sum(row["size"] for row in victims)
+                expired = {row["path"] for row in victims}
+                for row in db.execute("SELECT path, size FROM images ORDER BY created_at").fetchall():
+                    if total <= max_bytes:
+                        break
+                    if row["path"] not in expired:
+                        victims.append(row)
+                        total -= row["size"]
+            for row in victims:
+                self._delete_file(self.root_dir / row["path"])
+                db.execute("DELETE FROM images WHERE path = ?", (row["path"],))
+                deleted += 1
+                freed += row["size"]
+        return {"deleted": deleted, "freed_bytes": freed}
+
+    def maybe_collect_garbage(self) -> Optional[Dict[str, int]]:
+        """Run the configured GC policy if the GC interval has elapsed."""
+        config = get_config()
+        if config.output_ttl_days <= 0 and config.output_max_mb <= 0:
+            return None
+        now = time.time()
+        with self._lock:
+            if now - self._last_gc < config.output_gc_interval_seconds:
+                return None
+            self._last_gc = now
+        return self.collect_garbage(
+            ttl_seconds=config.output_ttl_days * 86400,
+            max_bytes=config.output_max_mb * 1024 * 1024,
+            now=now,
+        )
+
+    def _delete_file(self, path: Path) -> None:
+        for target in [path, *variant_paths(path).values()]:
+            target.unlink(missing_ok=True)
+        # Drop shard directories that became empty, up to the root
+        directory = path.parent
+        while directory != self.root_dir and self.root_dir in directory.parents:
+            try:
+                directory.rmdir()
+            except OSError:
+                break
+            directory = directory.parent
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.root_dir.resolve()).as_posix()
+        except ValueError:
+            return str(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def _row(self, row: sqlite3.Row) -> Dict[str, Any]:
+        data = dict(row)
+        data["path"] = str(self.root_dir / data["path"])
+        return data
+
+
+_STORES: Dict[Path, ImageStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_image_store(root_dir: str | Path) -> ImageStore:
+    """Return the shared ImageStore for ``root_dir`` using the configured sharding."""
+    root_path = Path(root_dir).resolve()
+    with _STORES_LOCK:
+        store = _STORES.get(root_path)
+        if store is None:
+            store = ImageStore(root_path, shard_by=get_config().output_shard_by)
+            _STORES[root_path] = store
+        return store
@@ -0,0 +1,93 @@
+"""Right-sized derivatives of generated images for previews and exports.
+
+Every generated image is a full-size PNG. Preview panels and exports rarely
+need that, so a compressed WebP copy and a small WebP thumbnail are written
+next to the original the first time they are asked for, and reused afterwards
+until the original changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from config.settings import get_config
+
+if TYPE_CHECKING:
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+WEBP_SUFFIX = ".webp"
+THUMBNAIL_SUFFIX = ".thumb.webp"
+
+
+def variant_paths(image_path: str | Path) -> Dict[str, Path]:
+    """Return where the derivatives of ``image_path`` live (whether or not they exist)."""
+    path = Path(image_path)
+    return {
+        "webp_path": path.with_suffix(WEBP_SUFFIX),
+        "thumbnail_path": path.with_suffix(THUMBNAIL_SUFFIX),
+    }
+
+
+def get_image_variants(image_path: str | Path) -> Dict[str, str]:
+    """
+    Build (if needed) and return the manifest of an image and its derivatives.
+
+    Args:
+        image_path: Path to the original generated image
+
+    Returns:
+        {"image_path", "webp_path", "thumbnail_path"}. Derivatives that could
+        not be produced are left out, so callers can always fall back to
+        "image_path".
+    """
+    config = get_config()
+    original = Path(image_path)
+    manifest = {"image_path": str(original)}
+    targets = variant_paths(original)
+    stale = {
+        name: target
+        for name, target in targets.items()
+        if not target.exists() or target.stat().st_mtime < original.stat().st_mtime
+    }
+    if stale:
+        from PIL import Image  # Imported on first use to keep agent start-up light
+
+        try:
+            with Image.open(original) as image:
+                image.load()
+                if "webp_path" in stale:
+                    _save_webp(image, stale["webp_path"], config.image_webp_quality)
+                if "thumbnail_path" in stale:
+                    thumbnail = image.copy()
+                    size = config.image_thumbnail_size
+                    thumbnail.thumbnail((size, size))
+                    _save_webp(thumbnail, stale["thumbnail_path"], config.image_webp_quality)
+        except OSError as e:
+            logger.warning("Could not build image variants for %s: %s", original, e)
+    for name, target in targets.items():
+        if target.exists():
+            manifest[name] = str(target)
+    return manifest
+
+
+async def aget_image_variants(image_paths: Iterable[str | Path]) -> List[Dict[str, str]]:
+    """Build the manifests of several images concurrently, off the event loop."""
+    return list(
+        await asyncio.gather(*(asyncio.to_thread(get_image_variants, p) for p in image_paths))
+    )
+
+
+def _save_webp(image: Image.Image, target: Path, quality: int) -> None:
+    tmp = target.with_name(f"{target.name}.{uuid.uuid4().hex}.part")
+    try:
+        image.save(tmp, format="WEBP", quality=quality, method=4)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
@@ -0,0 +1,170 @@
+"""Near-duplicate prompt lookup for reusing existing illustrations.
+
+Illustration prompts within a story are often almost identical (same
+character, same setting, one verb changed). Each prompt is turned into a
+hashed character n-gram vector and compared against every earlier prompt in
+the same namespace with a NumPy cosine search; a match above the configured
+threshold lets the caller reuse that prompt's cached image instead of paying
+for a new one. Everything runs locally, with no embedding service.
+
+Prompts are persisted as JSON lines next to the image cache and re-vectorised
+when the index is loaded.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+INDEX_FILENAME = "prompt_index.jsonl"
+NGRAM_SIZE = 3
+VECTOR_DIMENSIONS = 2048
+MAX_ENTRIES = 5000
+
+
+def vectorize(prompt: str) -> np.ndarray:
+    """Return the L2-normalised hashed character n-gram vector of ``prompt``."""
+    text = " " + re.sub(r"\s+", " ", prompt.lower()).strip() + " "
+    vector = np.zeros(VECTOR_DIMENSIONS, dtype=np.float32)
+    for start in range(max(1, len(text) - NGRAM_SIZE + 1)):
+        gram = text[start:start + NGRAM_SIZE]
+        vector[zlib.crc32(gram.encode("utf-8")) % VECTOR_DIMENSIONS] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class PromptIndex:
+    """Cosine-similarity index over previously generated prompts.
+
+    Vectors live in a ring buffer of at most ``max_entries`` rows; once it is
+    full the oldest prompt is overwritten.
+    """
+
+    def __init__(self, index_dir: str | Path, max_entries: int = MAX_ENTRIES):
+        self.index_path = Path(index_dir) / INDEX_FILENAME
+        self.max_entries = max_entries
+        self.lookups = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((min(64, max_entries), VECTOR_DIMENSIONS), dtype=np.float32)
+        self._entries: List[Optional[Tuple[str, str, str]]] = []  # (namespace, cache key, prompt)
+        self._next = 0
+        self._lines = 0
+        self._load()
+
+    def find_similar(self, prompt: str, namespace: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """
+        Return the cache key and similarity of the closest earlier prompt.
+
+        Args:
+            prompt: The prompt about to be generated
+            namespace: Only prompts from the same namespace (model settings and
+                image kind) are considered
+            threshold: Minimum cosine similarity for a match
+
+        Returns:
+            (cache_key, similarity), or None when nothing is close enough
+        """
+        query = vectorize(prompt)
+        with self._lock:
+            self.lookups += 1
+            if not self._entries:
+                return None
+            scores = self._vectors[:len(self._entries)] @ query
+            mask = np.array([entry is not None and entry[0] == namespace for entry in self._entries])
+            scores = np.where(mask, scores, -1.0)
+            best = int(np.argmax(scores))
+            if scores[best] < threshold:
+                return None
+            self.hits += 1
+            return self._entries[best][1], float(scores[best])
+
+    def add(self, prompt: str, namespace: str, cache_key: str) -> None:
+        """Index ``prompt`` as the source of the image stored under ``cache_key``."""
+        with self._lock:
+            self._append(vectorize(prompt), (namespace, cache_key, prompt))
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            if self._lines >= 2 * self.max_entries:
+                self._rewrite()
+            else:
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(_record(namespace, cache_key, prompt) + "\n")
+                self._lines += 1
+
+    def forget(self, cache_key: str) -> None:
+        """Drop entries whose image is no longer cached."""
+        with self._lock:
+            for i, entry in enumerate(self._entries):
+                if entry is not None and entry[1] == cache_key:
+                    self._entries[i] = None
+                    self._vectors[i] = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Return lookup/hit counters and the hit rate."""
+        with self._lock:
+            return {
+                "entries": sum(entry is not None for entry in self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            }
+
+    def _append(self, vector: np.ndarray, entry: Tuple[str, str, str]) -> None:
+        slot = self._next % self.max_entries
+        if slot >= len(self._vectors):
+            grown = np.zeros((min(2 * len(self._vectors), self.max_entries), VECTOR_DIMENSIONS), dtype=np.float32)
+            grown[:len(self._vectors)] = self._vectors
+            self._vectors = grown
+        self._vectors[slot] = vector
+        if slot < len(self._entries):
+            self._entries[slot] = entry
+        else:
+            self._entries.append(entry)
+        self._next += 1
+
+    def _rewrite(self) -> None:
+        # Compact the log down to the live entries, oldest first
+        order = [(self._next + i) % len(self._entries) for i in range(len(self._entries))]
+        live = [self._entries[i] for i in order if self._entries[i] is not None]
+        tmp = self.index_path.with_suffix(".jsonl.tmp")
+        tmp.write_text("".join(_record(*entry) + "\n" for entry in live), encoding="utf-8")
+        tmp.replace(self.index_path)
+        self._lines = len(live)
+
+    def _load(self) -> None:
+        try:
+            lines = self.index_path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return
+        self._lines = len(lines)
+        for line in lines[-self.max_entries:]:
+            try:
+                record = json.loads(line)
+                self._append(vectorize(record["prompt"]), (record["namespace"], record["key"], record["prompt"]))
+            except (ValueError, KeyError):
+                continue
+
+
+def _record(namespace: str, cache_key: str, prompt: str) -> str:
+    return json.dumps({"prompt": prompt, "namespace": namespace, "key": cache_key})
+
+
+_INDEXES: Dict[Path, PromptIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_prompt_index(index_dir: str | Path) -> PromptIndex:
+    """Return the shared PromptIndex stored in ``index_dir``."""
+    index_path = Path(index_dir).resolve()
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(index_path)
+        if index is None:
+            index = PromptIndex(index_path)
+            _INDEXES[index_path] = index
+        return index
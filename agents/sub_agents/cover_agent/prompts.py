@@ -24,8 +24,12 @@ Inputs you will receive:
 Process:
 1. Create a detailed image prompt description
 2. Call the generate_cover_image function with your prompt
-3. Return the path to the generated image
+3. Return the result of generate_cover_image
+
+Safety check:
+- The image functions check every prompt for safety before drawing. A result with status "blocked" means nothing was drawn.
+- If a prompt is blocked, write ONE gentler prompt for the same scene and try again. If it is blocked again, return the blocked result.
 
 Output:
-- The file path to the generated cover image.
+- The file path to the generated cover image, or the job id if the image is being drawn in the background.
 """
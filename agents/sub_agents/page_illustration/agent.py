@@ -4,42 +4,138 @@ This agent generates kid-friendly illustration images for story pages.
 It maintains consistent art style and colour palette across all pages.
 """
 
+from typing import List, Optional
+
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 from google.adk.tools.function_tool import FunctionTool
-from google.genai import types
+from google.adk.tools.tool_context import ToolContext
 from .prompts import instruction_page_illustration_agent
-from agents.sub_agents.cover_agent.image_generator import generate_image
+from agents.sub_agents.content_moderation.image_gate import get_image_prompt_gate
+from agents.sub_agents.cover_agent.image_jobs import start_image_job
+from agents.sub_agents.cover_agent.image_store import story_session_id
+from agents.story_coach.state import record_story_images
 
 from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from agents.models import get_model
+from agents.routing import get_model_route
+from agents.prompt_cache import prompt_cache_args, record_prompt_cache_usage
 
 
-def generate_page_image(prompt: str) -> str:
+async def generate_page_image(
+    prompt: str, tool_context: ToolContext, page_number: Optional[int] = None
+) -> dict:
     """
     Generate a page illustration image from a text prompt. Use this after creating the image prompt description.
     
     Args:
         prompt: Text description of the page illustration to generate
+        page_number: The story page this illustration belongs to
     
     Returns:
-        Path to the generated image file
+        {"status": "done", "image_path": ..., "webp_path": ..., "thumbnail_path": ...}
+        when the image is ready (it is saved to the story's page), {"status":
+        "queued", "job_id": ...} when it is being drawn in the background, or
+        {"status": "blocked", "reason": ..., "kid_friendly_message": ...} when
+        the prompt failed the safety check and nothing was drawn
+    """
+    # Moderate before paying for the image
+    blocked = await get_image_prompt_gate().check(prompt, "page", tool_context)
+    if blocked is not None:
+        return blocked
+    # The image stack (openai, numpy, PIL) is imported on first use, not at start-up
+    from agents.sub_agents.cover_agent.image_generator import agenerate_image_manifest
+
+    session_id = story_session_id(tool_context)
+
+    def work():
+        return agenerate_image_manifest(
+            prompt, prefix="page", session_id=session_id, page_number=page_number
+        )
+
+    if get_config().image_background_jobs:
+        return start_image_job("page", work, tool_context, metadata={"page_number": page_number})
+    manifest = await work()
+    if page_number is not None:
+        record_story_images(tool_context.state, [(page_number, manifest)])
+    return {"status": "done", **manifest}
+
+
+async def generate_page_images(
+    prompts: List[str], tool_context: ToolContext, page_numbers: Optional[List[int]] = None
+) -> dict:
     """
-    return generate_image(prompt, prefix="page")
+    Generate illustration images for several pages at once, in parallel.
+    Use this instead of generate_page_image when more than one page needs an illustration.
+    
+    Args:
+        prompts: Text descriptions of the page illustrations, one per page, in page order
+        page_numbers: The story page numbers the prompts belong to, in the same order
+    
+    Returns:
+        {"status": "done", "images": [...]} with one {"image_path", "webp_path",
+        "thumbnail_path"} entry per prompt in the same order, or
+        {"status": "queued", "job_id": ...} when drawn in the background.
+        Prompts that failed the safety check are not drawn: their entry is
+        {"status": "blocked", "reason": ..., "kid_friendly_message": ...}, and
+        they are also listed under "blocked" with their page_number.
+    """
+    # Moderate every prompt (one batched check) before paying for any image
+    outcomes = await get_image_prompt_gate().check_many(prompts, "page", tool_context)
+    if page_numbers is None or len(page_numbers) != len(prompts):
+        page_numbers = [None] * len(prompts)
+    approved = [i for i, blocked in enumerate(outcomes) if blocked is None]
+    blocked_pages = [
+        {"page_number": page_numbers[i], **blocked}
+        for i, blocked in enumerate(outcomes)
+        if blocked is not None
+    ]
+    from agents.sub_agents.cover_agent.image_generator import agenerate_image_manifests_batch
+
+    session_id = story_session_id(tool_context)
+
+    async def work():
+        manifests = await agenerate_image_manifests_batch(
+            [prompts[i] for i in approved],
+            prefix="page",
+            session_id=session_id,
+            page_numbers=[page_numbers[i] for i in approved],
+        )
+        images = list(outcomes)
+        for i, manifest in zip(approved, manifests):
+            images[i] = manifest
+        return images
+
+    response = {"blocked": blocked_pages} if blocked_pages else {}
+    if not approved:
+        return {"status": "blocked", "images": list(outcomes), **response}
+    if get_config().image_background_jobs:
+        job = start_image_job(
+            "pages", work, tool_context, metadata={"page_numbers": [page_numbers[i] for i in approved]}
+        )
+        return {**job, **response}
+    images = await work()
+    record_story_images(
+        tool_context.state,
+        [(page_numbers[i], images[i]) for i in approved if page_numbers[i] is not None],
+    )
+    return {"status": "done", "images": images, **response}
 
 
-# Create function tool for image generation
+# Create function tools for image generation
 generate_image_tool = FunctionTool(func=generate_page_image)
+generate_images_batch_tool = FunctionTool(func=generate_page_images)
 
-config = get_config()
-model = LiteLlm(model=config.text_model_name)
+route = get_model_route("page_illustration", temperature=0.7)
+model = get_model(route.model_name, **prompt_cache_args())
 
 page_illustration_agent = Agent(
     model=model,
     name="page_illustration_agent",
-    instruction=instruction_page_illustration_agent(),
-    tools=[generate_image_tool],
-    generate_content_config=types.GenerateContentConfig(temperature=0.7),
+    static_instruction=instruction_page_illustration_agent(),
+    tools=[generate_image_tool, generate_images_batch_tool],
+    generate_content_config=route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
     description="Generates child-friendly illustration images for story pages with consistent style.",
 )
 
@@ -31,10 +31,19 @@ Inputs you will receive:
 Process:
 1. Create a detailed image prompt description that reflects the page content
 2. Include style consistency hints if provided
-3. Call the generate_page_image function with your prompt
-4. Return the path to the generated image
+3. Call the generate_page_image function with your prompt and the page_number
+4. Return the result of generate_page_image
+
+Multiple pages:
+- If you receive several pages to illustrate at once, create one prompt per page.
+- Call the generate_page_images function ONCE with all the prompts and their page_numbers, in page order.
+- Return the result of generate_page_images.
+
+Safety check:
+- The image functions check every prompt for safety before drawing. A result with status "blocked" means nothing was drawn.
+- If a prompt is blocked, write ONE gentler prompt for the same scene and try again. If it is blocked again, return the blocked result.
 
 Output:
-- The file path to the generated page illustration image.
+- The file path to the generated page illustration image (or one path per page for multiple pages), or the job id if the images are being drawn in the background.
 """
 
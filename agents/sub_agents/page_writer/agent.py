@@ -2,26 +2,42 @@
 
 This agent helps children write story pages while preserving their voice and ideas.
 It provides light grammar correction and optional story starters without taking over the writing.
+The story digest agent keeps a short "story so far" summary, so the page writer
+sees that summary plus the last few pages instead of every earlier page.
 """
 
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
-from google.genai import types
-from .prompts import instruction_page_writer_agent
+from .prompts import instruction_page_writer_agent, instruction_story_digest_agent
 
 from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from agents.models import get_model
+from agents.routing import get_model_route
+from agents.prompt_cache import prompt_cache_args, record_prompt_cache_usage
 
 config = get_config()
-model = LiteLlm(model=config.text_model_name)
 
+page_writer_route = get_model_route("page_writer", temperature=0.7)
 page_writer_agent = Agent(
-    model=model,
+    model=get_model(page_writer_route.model_name, **prompt_cache_args()),
     name="page_writer_agent",
-    instruction=instruction_page_writer_agent(),
-    generate_content_config=types.GenerateContentConfig(temperature=0.7),
+    static_instruction=instruction_page_writer_agent(),
+    generate_content_config=page_writer_route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
     description="Helps children write story pages while preserving their voice and providing light grammar correction.",
 )
 
 page_writer_tool = AgentTool(agent=page_writer_agent)
 
+
+story_digest_route = get_model_route("story_digest", temperature=0.2)
+story_digest_agent = Agent(
+    model=get_model(story_digest_route.model_name, **prompt_cache_args()),
+    name="story_digest_agent",
+    static_instruction=instruction_story_digest_agent(config.story_digest_max_words),
+    generate_content_config=story_digest_route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
+    description="Folds a new page into the short running summary of the story so far.",
+)
+
+story_digest_tool = AgentTool(agent=story_digest_agent)
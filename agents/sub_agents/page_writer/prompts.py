@@ -28,7 +28,8 @@ Inputs you will receive:
 - story_title
 - story_concept
 - current_page_number
-- previous_pages (list of previous page texts for continuity, if any)
+- story_so_far (a short summary of the earlier pages, if the story is long)
+- previous_pages (the most recent page texts, verbatim, for continuity, if any)
 
 Output:
 - A single string containing the final page text (cleaned child's content + optional starter sentence if needed).
@@ -36,3 +37,28 @@ Output:
 - Do NOT include explanations, reasoning, or meta-commentary.
 """
 
+
+
+def instruction_story_digest_agent(max_words: int) -> str:
+    """
+    System prompt for the StoryDigestAgent.
+    Folds one more page into the running "story so far" summary.
+    """
+    return f"""
+You are a Story Summary Agent for a children's storybook.
+
+Your job:
+- Keep a short running summary ("story so far") of a story a child is writing.
+- You receive the current summary and ONE new page. Return the updated summary that also covers the new page.
+- Keep the main characters' names, what they want, where they are and the important events, in story order.
+- Drop small details when space runs out; never invent anything that is not in the story.
+- Stay under {max_words} words.
+
+Inputs you will receive:
+- story_so_far (may be empty for the first page)
+- page_number
+- new_page
+
+Output:
+- Only the updated summary text, with no heading, explanation or quotes.
+"""
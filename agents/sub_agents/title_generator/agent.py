@@ -5,21 +5,22 @@ This agent generates engaging, age-appropriate story titles based on the child's
 
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
-from google.genai import types
 from .prompts import instruction_title_agent
 
-from config.settings import get_config
-from google.adk.models.lite_llm import LiteLlm
+from agents.models import get_model
+from agents.routing import get_model_route
+from agents.prompt_cache import prompt_cache_args, record_prompt_cache_usage
 
-config = get_config()
 
-model = LiteLlm(model=config.text_model_name)
+route = get_model_route("title", temperature=0.7)
+model = get_model(route.model_name, **prompt_cache_args())
 
 title_generator_agent = Agent(
     model=model,
     name="title_agent",
-    instruction=instruction_title_agent(),
-    generate_content_config=types.GenerateContentConfig(temperature=0.7),
+    static_instruction=instruction_title_agent(),
+    generate_content_config=route.content_config(),
+    after_model_callback=record_prompt_cache_usage,
     description="Generates creative story titles for children's stories.",
 )
 
@@ -3,10 +3,34 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 
 from utils.env import get_env, load_env
 
 
+# Agents with their own model settings, and the prefix of their environment
+# variables ({PREFIX}_MODEL_NAME, {PREFIX}_TEMPERATURE, {PREFIX}_MAX_TOKENS)
+AGENT_MODEL_ENV_PREFIXES = {
+    "story_coach": "STORY_COACH",
+    "title": "TITLE",
+    "moderation": "MODERATION",
+    "cover": "COVER",
+    "page_writer": "PAGE_WRITER",
+    "story_digest": "STORY_DIGEST",
+    "page_illustration": "PAGE_ILLUSTRATION",
+    "judge": "JUDGE",
+}
+
+
+@dataclass(frozen=True)
+class AgentModelSettings:
+    """One agent's model settings; None falls back to the default."""
+
+    model_name: Optional[str] = None
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+
+
 @dataclass(frozen=True)
 class Config:
     openai_api_key: str
@@ -15,6 +39,43 @@ class Config:
     image_model_name: str
     max_story_pages: int
     output_dir: str
+    image_cache_max_mb: int = 500
+    image_http_max_connections: int = 10
+    image_response_format: str = "b64_json"
+    image_batch_concurrency: int = 10
+    image_background_jobs: bool = True
+    image_job_workers: int = 4
+    image_webp_quality: int = 80
+    image_thumbnail_size: int = 256
+    image_requests_per_minute: int = 50
+    image_images_per_minute: int = 50
+    image_max_retries: int = 3
+    image_similarity_threshold: float = 0.0
+    image_backend: str = "auto"
+    image_local_latency_ms: int = 0
+    image_local_error_rate: float = 0.0
+    output_shard_by: str = "date"
+    output_ttl_days: int = 0
+    output_max_mb: int = 0
+    output_gc_interval_seconds: int = 3600
+    moderation_fast_path: bool = True
+    moderation_cache_max_entries: int = 10000
+    moderation_cache_ttl_seconds: int = 86400
+    moderation_batch_max_tokens: int = 2000
+    speculative_page_writing: bool = True
+    image_prompt_moderation: bool = True
+    page_writer_recent_pages: int = 3
+    story_digest_max_words: int = 120
+    root_history_compaction: bool = True
+    root_history_max_tokens: int = 4000
+    root_history_keep_turns: int = 2
+    prompt_caching: bool = True
+    model_http_max_connections: int = 20
+    model_warmup_connections: int = 2
+    agent_models: tuple[tuple[str, AgentModelSettings], ...] = ()
+    model_routes_file: str = ""
+    usage_accounting: bool = True
+    usage_db_path: str = ""
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -32,7 +93,113 @@ class Config:
             image_model_name=get_env("IMAGE_MODEL_NAME", required=True),
             max_story_pages=max_pages,
             output_dir=get_env("OUTPUT_DIR", required=True),
+            image_cache_max_mb=_get_int_env("IMAGE_CACHE_MAX_MB", 500),
+            image_http_max_connections=_get_int_env("IMAGE_HTTP_MAX_CONNECTIONS", 10),
+            image_response_format=_get_choice_env(
+                "IMAGE_RESPONSE_FORMAT", "b64_json", ("b64_json", "url")
+            ),
+            image_batch_concurrency=_get_int_env("IMAGE_BATCH_CONCURRENCY", 10),
+            image_background_jobs=_get_bool_env("IMAGE_BACKGROUND_JOBS", True),
+            image_job_workers=_get_int_env("IMAGE_JOB_WORKERS", 4),
+            image_webp_quality=_get_int_env("IMAGE_WEBP_QUALITY", 80),
+            image_thumbnail_size=_get_int_env("IMAGE_THUMBNAIL_SIZE", 256),
+            image_requests_per_minute=_get_int_env("IMAGE_REQUESTS_PER_MINUTE", 50),
+            image_images_per_minute=_get_int_env("IMAGE_IMAGES_PER_MINUTE", 50),
+            image_max_retries=_get_int_env("IMAGE_MAX_RETRIES", 3),
+            image_similarity_threshold=_get_float_env("IMAGE_SIMILARITY_THRESHOLD", 0.0),
+            image_backend=get_env("IMAGE_BACKEND", "auto").strip().lower(),
+            image_local_latency_ms=_get_int_env("IMAGE_LOCAL_LATENCY_MS", 0),
+            image_local_error_rate=_get_float_env("IMAGE_LOCAL_ERROR_RATE", 0.0),
+            output_shard_by=_get_choice_env(
+                "OUTPUT_SHARD_BY", "date", ("date", "session", "none")
+            ),
+            output_ttl_days=_get_int_env("OUTPUT_TTL_DAYS", 0),
+            output_max_mb=_get_int_env("OUTPUT_MAX_MB", 0),
+            output_gc_interval_seconds=_get_int_env("OUTPUT_GC_INTERVAL_SECONDS", 3600),
+            moderation_fast_path=_get_bool_env("MODERATION_FAST_PATH", True),
+            moderation_cache_max_entries=_get_int_env("MODERATION_CACHE_MAX_ENTRIES", 10000),
+            moderation_cache_ttl_seconds=_get_int_env("MODERATION_CACHE_TTL_SECONDS", 86400),
+            moderation_batch_max_tokens=_get_int_env("MODERATION_BATCH_MAX_TOKENS", 2000),
+            speculative_page_writing=_get_bool_env("SPECULATIVE_PAGE_WRITING", True),
+            image_prompt_moderation=_get_bool_env("IMAGE_PROMPT_MODERATION", True),
+            page_writer_recent_pages=_get_int_env("PAGE_WRITER_RECENT_PAGES", 3),
+            story_digest_max_words=_get_int_env("STORY_DIGEST_MAX_WORDS", 120),
+            root_history_compaction=_get_bool_env("ROOT_HISTORY_COMPACTION", True),
+            root_history_max_tokens=_get_int_env("ROOT_HISTORY_MAX_TOKENS", 4000),
+            root_history_keep_turns=_get_int_env("ROOT_HISTORY_KEEP_TURNS", 2),
+            prompt_caching=_get_bool_env("PROMPT_CACHING", True),
+            model_http_max_connections=_get_int_env("MODEL_HTTP_MAX_CONNECTIONS", 20),
+            model_warmup_connections=_get_int_env("MODEL_WARMUP_CONNECTIONS", 2),
+            agent_models=_get_agent_models(),
+            model_routes_file=get_env("MODEL_ROUTES_FILE", "").strip(),
+            usage_accounting=_get_bool_env("USAGE_ACCOUNTING", True),
+            usage_db_path=get_env("USAGE_DB_PATH", "").strip(),
+        )
+
+    def agent_model(self, agent: str) -> AgentModelSettings:
+        """Return the model settings configured for ``agent`` (all None if none are set)."""
+        return dict(self.agent_models).get(agent, AgentModelSettings())
+
+
+def _get_int_env(key: str, default: int) -> int:
+    """Read an optional integer environment variable."""
+    raw = get_env(key, str(default))
+    try:
+        return int(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{key} must be an integer") from exc
+
+
+def _get_float_env(key: str, default: float) -> float:
+    """Read an optional float environment variable."""
+    raw = get_env(key, str(default))
+    try:
+        return float(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{key} must be a number") from exc
+
+
+def _get_bool_env(key: str, default: bool) -> bool:
+    """Read an optional boolean environment variable (true/false, 1/0, yes/no)."""
+    value = get_env(key, "true" if default else "false").strip().lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise RuntimeError(f"{key} must be a boolean (true/false)")
+
+
+def _get_choice_env(key: str, default: str, choices: tuple[str, ...]) -> str:
+    """Read an optional environment variable restricted to ``choices``."""
+    value = get_env(key, default).strip().lower()
+    if value not in choices:
+        raise RuntimeError(f"{key} must be one of: {', '.join(choices)}")
+    return value
+
+
+def _get_optional_env(key: str, parse: type, kind: str):
+    """Read an optional environment variable that has no default (None when unset or empty)."""
+    raw = get_env(key, "").strip()
+    if not raw:
+        return None
+    try:
+        return parse(raw)
+    except ValueError as exc:
+        raise RuntimeError(f"{key} must be {kind}") from exc
+
+
+def _get_agent_models() -> tuple[tuple[str, AgentModelSettings], ...]:
+    """Read the per-agent model settings of every agent that has any set."""
+    agent_models = []
+    for agent, prefix in AGENT_MODEL_ENV_PREFIXES.items():
+        settings = AgentModelSettings(
+            model_name=get_env(f"{prefix}_MODEL_NAME", "").strip() or None,
+            temperature=_get_optional_env(f"{prefix}_TEMPERATURE", float, "a number"),
+            max_tokens=_get_optional_env(f"{prefix}_MAX_TOKENS", int, "an integer"),
         )
+        if settings != AgentModelSettings():
+            agent_models.append((agent, settings))
+    return tuple(agent_models)
 
 
 # Singleton-style accessor
@@ -0,0 +1,4 @@
+"""Unit tests package.
+
+Unit tests mirror the source tree and never call external model or image APIs.
+"""
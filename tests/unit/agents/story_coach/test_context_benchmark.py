@@ -0,0 +1,13 @@
+"""Unit tests for the page writer prompt-size benchmark."""
+
+from agents.story_coach.context_benchmark import run_context_benchmark
+
+
+async def test_rolling_prompt_tokens_flatten_while_full_history_grows(test_config):
+    result = await run_context_benchmark(pages=60, recent_pages=3, max_words=120)
+    full, rolling = result["full"], result["rolling"]
+
+    assert full[59] > 2.5 * full[19]
+    # After the digest fills up, later pages cost about the same as page 20
+    assert rolling[59] <= 1.05 * rolling[19]
+    assert result["total_tokens"]["rolling"] < result["total_tokens"]["full"] / 2
@@ -0,0 +1,88 @@
+"""Unit tests for the rolling story digest."""
+
+from types import SimpleNamespace
+
+from agents.story_coach import digest, tools
+from agents.story_coach.digest import (
+    StoryDigester,
+    fold_page_extractive,
+    limit_words,
+    page_context,
+    pages_to_fold,
+)
+from agents.story_coach.state import StoryPage, StoryState, load_story_state, save_story_state
+
+
+def _story(pages, story_so_far=None, summarized_pages=0):
+    story = StoryState(story_title="T", story_concept="C")
+    for n in range(1, pages + 1):
+        story.set_page(n, f"Page {n} text.")
+    story.story_so_far, story.summarized_pages = story_so_far, summarized_pages
+    return story
+
+
+def test_limit_words_keeps_the_most_recent_words():
+    assert limit_words("a b c", 5) == "a b c"
+    assert limit_words("a b c d e", 2) == "... d e"
+
+
+def test_extractive_fold_appends_first_sentence():
+    page = StoryPage(page_number=2, text="Ava found a key. It was gold.")
+    assert fold_page_extractive("Ava lives by the sea.", page, 50) == "Ava lives by the sea. Ava found a key."
+
+
+def test_page_context_sends_digest_plus_unsummarized_pages():
+    story = _story(6, story_so_far="Summary.", summarized_pages=3)
+    story_so_far, recent = page_context(story, 7, recent_pages=3)
+    assert story_so_far == "Summary." and [p.page_number for p in recent] == [4, 5, 6]
+    # Rewriting a summarized page, or no digest: every earlier page verbatim
+    assert page_context(story, 2, recent_pages=3) == (None, story.pages[:1])
+    assert page_context(_story(6), 7, recent_pages=3)[0] is None
+
+
+def test_pages_to_fold_moves_window_by_one_page():
+    story = _story(6, story_so_far="Summary.", summarized_pages=2)
+    assert [p.page_number for p in pages_to_fold(story, 7, recent_pages=3)] == [3]
+    assert pages_to_fold(story, 7, recent_pages=0) == []
+
+
+async def test_fold_falls_back_offline_when_agent_fails():
+    digester = StoryDigester(max_words=50)
+    story = _story(2)
+
+    async def broken(story_so_far, page):
+        raise RuntimeError("model unavailable")
+
+    story_so_far, summarized = await digester.fold(story, story.pages, broken)
+    assert story_so_far == "Page 1 text. Page 2 text." and summarized == 2
+    assert digester.stats() == {"folds": 2, "fallbacks": 2}
+
+
+class FakeTool:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    async def run_async(self, *, args, tool_context):
+        self.calls.append(args)
+        return self.result
+
+
+async def test_write_page_uses_digest_and_folds_leaving_page(monkeypatch, test_config):
+    writer = FakeTool("Page 6 text.")
+    digest_tool = FakeTool("Pages one to three happened.")
+    monkeypatch.setattr(tools, "content_moderation_tool", FakeTool({"status": "APPROVED"}))
+    monkeypatch.setattr(tools, "page_writer_tool", writer)
+    monkeypatch.setattr(digest, "story_digest_tool", digest_tool)
+    context = SimpleNamespace(state={})
+    save_story_state(context.state, _story(5, story_so_far="Pages one and two.", summarized_pages=2))
+
+    result = await tools.write_page("page six", context)
+
+    request = writer.calls[0]["request"]
+    assert "story_so_far: Pages one and two." in request
+    assert "1. Page 1 text." not in request and "3. Page 3 text." in request
+    assert "page_number: 3" in digest_tool.calls[0]["request"]
+    saved = load_story_state(context.state)
+    assert result["page_number"] == 6
+    assert (saved.story_so_far, saved.summarized_pages) == ("Pages one to three happened.", 3)
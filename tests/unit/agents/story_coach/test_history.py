@@ -0,0 +1,109 @@
+"""Unit tests for root-agent history compaction."""
+
+import dataclasses
+from types import SimpleNamespace
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+import config.settings as settings
+from agents.story_coach import callbacks, history
+from agents.story_coach.history import HistoryCompactor, content_tokens, split_turns
+from agents.story_coach.state import StoryState, save_story_state
+
+
+def _user(text):
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def _model(text):
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _tool_exchange(n):
+    call = types.Content(
+        role="model",
+        parts=[
+            types.Part(
+                function_call=types.FunctionCall(
+                    id=f"c{n}", name="write_page", args={"child_page_description": "x" * 400}
+                )
+            )
+        ],
+    )
+    response = types.Content(
+        role="user",
+        parts=[
+            types.Part(
+                function_response=types.FunctionResponse(
+                    id=f"c{n}",
+                    name="write_page",
+                    response={"status": "APPROVED", "page_number": n, "page_text": "y" * 800},
+                )
+            )
+        ],
+    )
+    return [call, response]
+
+
+def _conversation(turns):
+    contents = []
+    for n in range(1, turns + 1):
+        contents += [_user(f"page {n} idea"), *_tool_exchange(n), _model(f"Great page {n}!")]
+    return contents
+
+
+def test_split_turns_starts_at_user_text_not_tool_results():
+    turns = split_turns(_conversation(3))
+    assert len(turns) == 3 and all(len(turn) == 4 for turn in turns)
+
+
+def test_old_tool_exchanges_collapse_and_recent_turns_stay_intact():
+    contents = _conversation(4)
+    compactor = HistoryCompactor(max_tokens=100_000, keep_turns=2)
+
+    compacted = compactor.compact(contents, StoryState())
+
+    old_texts = [part.text for content in compacted[:6] for part in content.parts]
+    assert (
+        'For context: [StoryCoach] called write_page, which returned '
+        '{"status": "APPROVED", "page_number": 1}'
+    ) in old_texts
+    assert not any(part.function_call or part.function_response for c in compacted[:6] for part in c.parts)
+    assert compacted[6:] == contents[8:]
+    record = compactor.records()[-1]
+    assert record["tokens_after"] < record["tokens_before"] and record["dropped_turns"] == 0
+
+
+def test_budget_drops_oldest_turns_and_keeps_story_facts():
+    contents = _conversation(8)
+    recent_tokens = sum(content_tokens(c) for c in contents[-8:])
+    compactor = HistoryCompactor(max_tokens=recent_tokens + 40, keep_turns=2)
+    story = StoryState(author_name="Milo", story_title="Milo's Moon")
+
+    compacted = compactor.compact(contents, story, fixed_tokens=100)
+
+    note = compacted[0].parts[0].text
+    assert "earlier turn(s) were left out" in note and '"story_title": "Milo\'s Moon"' in note
+    assert compacted[-8:] == contents[-8:]
+    record = compactor.records()[-1]
+    assert record["dropped_turns"] >= 5
+    assert record["tokens_after"] - 100 <= recent_tokens + 40 + content_tokens(compacted[0])
+    assert compactor.stats()["saved_ratio"] > 0.5
+
+
+def test_callback_rewrites_request_and_can_be_disabled(monkeypatch, test_config):
+    monkeypatch.setattr(history, "_COMPACTOR", HistoryCompactor(max_tokens=100_000, keep_turns=1))
+    context = SimpleNamespace(state={}, invocation_id="inv-1")
+    save_story_state(context.state, StoryState())
+    contents = _conversation(3)
+
+    request = LlmRequest(contents=list(contents))
+    assert callbacks.compact_history(context, request) is None
+    assert len(request.contents) < len(contents)
+    assert history.get_history_compactor().records()[-1]["invocation_id"] == "inv-1"
+
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, root_history_compaction=False))
+    request = LlmRequest(contents=list(contents))
+    callbacks.compact_history(context, request)
+    assert request.contents == contents
@@ -0,0 +1,29 @@
+"""Unit tests for the typed story state."""
+
+from agents.story_coach.state import STATE_KEY, StoryState, load_story_state, save_story_state
+
+
+def test_empty_state_loads_as_new_story():
+    story = load_story_state({})
+    assert story.current_page_number == 1 and story.pages == [] and not story.story_complete
+
+
+def test_set_page_appends_rewrites_and_advances():
+    story = StoryState()
+    story.set_page(2, "Two.")
+    story.set_page(1, "One.")
+    story.set_page(2, "Two again.")
+
+    assert [(page.page_number, page.text) for page in story.pages] == [(1, "One."), (2, "Two again.")]
+    assert story.current_page_number == 3
+
+
+def test_round_trip_through_plain_session_state():
+    state = {}
+    story = StoryState(author_name="Ava", story_title="Ava's Garden")
+    story.set_page(1, "Ava planted a seed.")
+    story.style_references.art_style = "watercolour"
+    save_story_state(state, story)
+
+    assert isinstance(state[STATE_KEY], dict)
+    assert load_story_state(state) == story
@@ -0,0 +1,183 @@
+"""Unit tests for the StoryCoach function tools."""
+
+import asyncio
+from types import SimpleNamespace
+
+from agents.story_coach import tools
+from agents.story_coach.state import StoryState, load_story_state, save_story_state
+
+
+class FakeTool:
+    def __init__(self, result, delay=0.0):
+        self.result = result
+        self.delay = delay
+        self.calls = []
+
+    async def run_async(self, *, args, tool_context):
+        self.calls.append(args)
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+async def test_write_page_returns_page_when_approved(monkeypatch, test_config):
+    moderation = FakeTool({"status": "APPROVED"}, delay=0.05)
+    writer = FakeTool("Milo flew to the moon.", delay=0.05)
+    monkeypatch.setattr(tools, "content_moderation_tool", moderation)
+    monkeypatch.setattr(tools, "page_writer_tool", writer)
+
+    story = StoryState(story_title="Milo's Trip", story_concept="a boy who flies")
+    story.set_page(1, "Milo found a rocket.")
+    context = SimpleNamespace(state={})
+    save_story_state(context.state, story)
+
+    result = await tools.write_page("milo flys to moon", context)
+
+    assert result == {"status": "APPROVED", "page_number": 2, "page_text": "Milo flew to the moon."}
+    assert moderation.calls == [
+        {"content": "milo flys to moon", "content_type": "page_description"},
+        {"content": "Milo flew to the moon.", "content_type": "page_text"},
+    ]
+    request = writer.calls[0]["request"]
+    assert "child_page_description: milo flys to moon" in request
+    assert "story_title: Milo's Trip" in request
+    assert "current_page_number: 2" in request and "1. Milo found a rocket." in request
+    saved = load_story_state(context.state)
+    assert [page.text for page in saved.pages] == ["Milo found a rocket.", "Milo flew to the moon."]
+    assert saved.current_page_number == 3
+
+
+async def test_write_page_discards_page_when_rejected(monkeypatch, test_config):
+    verdict = {"status": "REJECTED", "reason": "violence", "kid_friendly_message": "Let's be kind!"}
+    monkeypatch.setattr(tools, "content_moderation_tool", FakeTool(verdict))
+    monkeypatch.setattr(tools, "page_writer_tool", FakeTool("unsafe page", delay=0.05))
+
+    context = SimpleNamespace(state={})
+    result = await tools.write_page("...", context)
+    assert result == {"status": "REJECTED", "moderation": verdict}
+    assert load_story_state(context.state).pages == []
+
+
+async def test_write_page_checks_the_written_page(monkeypatch, test_config):
+    verdict = {"status": "REJECTED", "reason": "violence", "kid_friendly_message": "Let's be kind!"}
+
+    class PageModeration(FakeTool):
+        async def run_async(self, *, args, tool_context):
+            self.calls.append(args)
+            return verdict if args["content_type"] == "page_text" else {"status": "APPROVED"}
+
+    moderation = PageModeration(None)
+    monkeypatch.setattr(tools, "content_moderation_tool", moderation)
+    monkeypatch.setattr(tools, "page_writer_tool", FakeTool("Then Milo hurt everyone."))
+
+    context = SimpleNamespace(state={})
+    result = await tools.write_page("milo goes home", context)
+
+    assert result == {"status": "REJECTED", "moderation": verdict}
+    assert moderation.calls[-1] == {"content": "Then Milo hurt everyone.", "content_type": "page_text"}
+    assert load_story_state(context.state).pages == []
+
+
+async def test_start_story_generates_title_moderates_and_starts_cover(monkeypatch, test_config):
+    title = FakeTool('"Milo and the Moon Rocket"\n')
+    moderation = FakeTool({"status": "APPROVED"})
+    covers = []
+
+    async def fake_cover(prompt, tool_context):
+        covers.append(prompt)
+        return {"job_id": "abc123", "status": "queued"}
+
+    monkeypatch.setattr(tools, "title_generator_tool", title)
+    monkeypatch.setattr(tools, "content_moderation_tool", moderation)
+    monkeypatch.setattr(tools, "generate_cover_image", fake_cover)
+
+    context = SimpleNamespace(state={})
+    result = await tools.start_story("Milo", "a boy who flies to the moon", context)
+
+    assert result == {
+        "status": "APPROVED",
+        "story_title": "Milo and the Moon Rocket",
+        "cover": {"job_id": "abc123", "status": "queued"},
+    }
+    assert title.calls == [{"request": "author_name: Milo\nstory_concept: a boy who flies to the moon"}]
+    assert moderation.calls == [{"content": "Milo and the Moon Rocket", "content_type": "title"}]
+    assert '"Milo and the Moon Rocket"' in covers[0] and "a boy who flies to the moon" in covers[0]
+    story = load_story_state(context.state)
+    assert (story.author_name, story.story_title) == ("Milo", "Milo and the Moon Rocket")
+
+
+async def test_start_story_uses_the_childs_own_title(monkeypatch, test_config):
+    title = FakeTool("Generated Title")
+    moderation = FakeTool({"status": "APPROVED"})
+    covers = []
+
+    async def fake_cover(prompt, tool_context):
+        covers.append(prompt)
+        return {"job_id": "def456", "status": "queued"}
+
+    monkeypatch.setattr(tools, "title_generator_tool", title)
+    monkeypatch.setattr(tools, "content_moderation_tool", moderation)
+    monkeypatch.setattr(tools, "generate_cover_image", fake_cover)
+
+    context = SimpleNamespace(state={})
+    result = await tools.start_story("Milo", "a rocket", context, story_title="Milo Goes Up")
+
+    assert result["story_title"] == "Milo Goes Up" and title.calls == []
+    assert moderation.calls == [{"content": "Milo Goes Up", "content_type": "title"}]
+    assert '"Milo Goes Up"' in covers[0]
+    assert load_story_state(context.state).story_title == "Milo Goes Up"
+
+
+async def test_start_story_skips_cover_when_title_rejected(monkeypatch, test_config):
+    verdict = {"status": "REJECTED", "reason": "scary", "kid_friendly_message": "Let's pick a happier title!"}
+    covers = []
+
+    async def fake_cover(prompt, tool_context):
+        covers.append(prompt)
+
+    monkeypatch.setattr(tools, "title_generator_tool", FakeTool("The Haunted Night"))
+    monkeypatch.setattr(tools, "content_moderation_tool", FakeTool(verdict))
+    monkeypatch.setattr(tools, "generate_cover_image", fake_cover)
+
+    result = await tools.start_story("Ava", "ghosts", SimpleNamespace(state={}))
+    assert result == {"status": "REJECTED", "story_title": "The Haunted Night", "moderation": verdict}
+    assert covers == []
+
+
+async def test_moderate_story_checks_saved_title_and_pages(monkeypatch, test_config):
+    batch = FakeTool({"verdicts": [], "all_approved": True})
+    monkeypatch.setattr(tools, "content_moderation_batch_tool", batch)
+    story = StoryState(story_title="Milo's Trip")
+    story.set_page(1, "Milo found a rocket.")
+    story.set_page(2, "Milo flew to the moon.")
+    context = SimpleNamespace(state={})
+    save_story_state(context.state, story)
+
+    await tools.moderate_story(context)
+
+    assert [item["id"] for item in batch.calls[0]["items"]] == ["title", "page_1", "page_2"]
+
+
+def test_check_image_jobs_records_finished_images(monkeypatch):
+    story = StoryState()
+    story.set_page(1, "One.")
+    story.set_page(2, "Two.")
+    context = SimpleNamespace(state={"image_jobs": {"c": {}, "p": {}}})
+    save_story_state(context.state, story)
+    jobs = [
+        {"job_id": "c", "kind": "cover", "status": "done", "result": {"image_path": "/cover.png"}},
+        {
+            "job_id": "p",
+            "kind": "pages",
+            "status": "done",
+            "page_numbers": [2],
+            "result": [{"status": "blocked"}, {"image_path": "/page2.png"}],
+        },
+    ]
+    monkeypatch.setattr(
+        tools, "get_image_job_queue", lambda: SimpleNamespace(statuses=lambda job_ids: jobs)
+    )
+
+    assert tools.check_image_jobs(context) == {"jobs": jobs}
+    saved = load_story_state(context.state)
+    assert saved.cover_image == "/cover.png"
+    assert [page.image_url for page in saved.pages] == [None, "/page2.png"]
@@ -0,0 +1,11 @@
+"""Fixtures for the content moderation tests."""
+
+import pytest
+
+from agents.sub_agents.content_moderation import verdict_cache
+
+
+@pytest.fixture(autouse=True)
+def fresh_verdict_cache(test_config, monkeypatch):
+    """Give every test its own empty moderation verdict cache."""
+    monkeypatch.setattr(verdict_cache, "_CACHE", None)
@@ -0,0 +1,114 @@
+"""Unit tests for batched moderation."""
+
+import dataclasses
+from types import SimpleNamespace
+
+import pytest
+from google.adk.tools.agent_tool import AgentTool
+from pydantic import ValidationError
+
+import config.settings as settings
+from agents.sub_agents.content_moderation import agent as moderation_agent
+from agents.sub_agents.content_moderation.batching import split_by_token_budget
+from agents.sub_agents.content_moderation.verdict_cache import get_moderation_verdict_cache
+
+
+def test_split_by_token_budget_keeps_order_and_isolates_large_items():
+    items = ["a" * 40, "b" * 40, "c" * 400, "d" * 40]
+    batches = split_by_token_budget(items, max_tokens=50, content=lambda item: item)
+    assert batches == [["a" * 40, "b" * 40], ["c" * 400], ["d" * 40]]
+    assert split_by_token_budget([], 50, content=str) == []
+
+
+class FakeModerationAgents:
+    """Answers batch requests (leaving out ``skip`` ids) and single requests."""
+
+    def __init__(self, skip=()):
+        self.batches = []
+        self.singles = []
+        self.skip = set(skip)
+
+    async def run_async(self, tool, args, tool_context):
+        if tool.agent.name == "batch_content_moderation_agent":
+            self.batches.append([item["id"] for item in args["items"]])
+            return {
+                "verdicts": [
+                    {"id": item["id"], **self.verdict(item["content"])}
+                    for item in args["items"]
+                    if item["id"] not in self.skip
+                ]
+            }
+        self.singles.append(args["content"])
+        return '{"status": "APPROVED", "message": "ok"}'
+
+    @staticmethod
+    def verdict(content):
+        if "volcano" in content:
+            return {"status": "REJECTED", "reason": "dangerous", "kid_friendly_message": "Let's stay safe!"}
+        return {"status": "APPROVED"}
+
+
+def _patch(monkeypatch, fake):
+    async def run_async(self, *, args, tool_context):
+        return await fake.run_async(self, args, tool_context)
+
+    monkeypatch.setattr(AgentTool, "run_async", run_async)
+
+
+async def test_batch_returns_one_verdict_per_id(monkeypatch, test_config):
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, moderation_batch_max_tokens=50))
+    fake = FakeModerationAgents()
+    _patch(monkeypatch, fake)
+    items = [
+        {"id": "title", "content": "A Sh1tty Cat", "content_type": "title"},  # fast path
+        {"id": "page_1", "content": "Milo and the knight sailed to Zorbania.", "content_type": "page_text"},
+        {"id": "prompt_1", "content": "Milo swings a sword at a volcano monster", "content_type": "illustration_prompt"},
+        {"id": "page_2", "content": "Zorbania had purple mountains and a talking toaster.", "content_type": "page_text"},
+    ]
+    result = await moderation_agent.content_moderation_batch_tool.run_async(
+        args={"items": items}, tool_context=SimpleNamespace(state={})
+    )
+
+    assert [v["id"] for v in result["verdicts"]] == ["title", "page_1", "prompt_1", "page_2"]
+    assert [v["status"] for v in result["verdicts"]] == ["REJECTED", "APPROVED", "REJECTED", "APPROVED"]
+    assert result["all_approved"] is False
+    # Three items need the LLM and the budget fits two of them per call
+    assert fake.batches == [["page_1", "prompt_1"], ["page_2"]]
+    assert fake.singles == []
+
+    # Batch verdicts are cached for both tools
+    single = await moderation_agent.content_moderation_tool.run_async(
+        args={"content": "Milo and the knight sailed to Zorbania.", "content_type": "page_text"},
+        tool_context=SimpleNamespace(state={}),
+    )
+    assert single["status"] == "APPROVED" and fake.singles == []
+    assert get_moderation_verdict_cache().stats()["hits"] == 1
+
+
+async def test_missing_batch_verdicts_fall_back_to_single_checks(monkeypatch):
+    fake = FakeModerationAgents(skip={"b"})
+    _patch(monkeypatch, fake)
+    items = [
+        {"id": "a", "content": "Zorbania is far away"},
+        {"id": "b", "content": "Quibbles the quokka"},
+    ]
+    result = await moderation_agent.content_moderation_batch_tool.run_async(
+        args={"items": items}, tool_context=SimpleNamespace(state={})
+    )
+    assert fake.batches == [["a", "b"]]
+    assert fake.singles == ["Quibbles the quokka"]
+    assert result["all_approved"] is True
+
+
+async def test_batch_with_repeated_ids_is_rejected(monkeypatch):
+    fake = FakeModerationAgents()
+    _patch(monkeypatch, fake)
+    items = [
+        {"id": "page_1", "content": "Zorbania is far away"},
+        {"id": "page_1", "content": "Milo swings a sword at a volcano monster"},
+    ]
+    with pytest.raises(ValidationError, match="repeated: page_1"):
+        await moderation_agent.content_moderation_batch_tool.run_async(
+            args={"items": items}, tool_context=SimpleNamespace(state={})
+        )
+    assert fake.batches == [] and fake.singles == []
@@ -0,0 +1,102 @@
+"""Unit tests for the rule-based moderation fast path."""
+
+import dataclasses
+from types import SimpleNamespace
+
+import pytest
+from google.adk.tools.agent_tool import AgentTool
+
+import config.settings as settings
+from agents.sub_agents.content_moderation import agent as moderation_agent
+from agents.sub_agents.content_moderation.fast_path import REJECTED, AhoCorasick, ModerationFastPath
+
+
+def test_aho_corasick_finds_overlapping_matches():
+    matcher = AhoCorasick([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+    assert sorted(matcher.search("ushers")) == [(1, 4, 2), (2, 4, 1), (2, 6, 4)]
+    assert list(matcher.search("xyz")) == []
+
+
+@pytest.mark.parametrize(
+    "content, category",
+    [
+        ("This is sh1t", "profanity"),
+        ("The pirates were FUCKING mean", "profanity"),
+        ("I want to kill myself", "dangerous content"),
+        ("a story about a nazi", "hate speech"),
+        ("Adolf Hitler", "hate speech"),
+        ("he is so retarded", "hate speech"),
+        # Trailing punctuation is not a lookalike
+        ("Oh shit!", "profanity"),
+        ("What the fuck!", "profanity"),
+        ("sex!", "adult content"),
+        ("Damn!", "profanity"),
+        ("He was a nazi!", "hate speech"),
+        ("sh!t happens", "profanity"),
+        ("$ex", "adult content"),
+    ],
+)
+def test_blocked_terms_are_rejected(content, category):
+    verdict = ModerationFastPath().check(content)
+    assert verdict["status"] == REJECTED
+    assert verdict["reason"] == f"contains {category}"
+    assert verdict["kid_friendly_message"]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "The knight fought the dragon with his sword",
+        "Assemble the class",  # contains "ass" but is not blocked
+        # Harmless words can add up to unsafe text: never approved locally
+        "push her into the river and hold her under the water",
+        "I will hang him from the tree",
+        "touch me there",
+        "Do you want some candy? Get in my car",
+        "hide from mom and never come home",
+        "A happy puppy flying a kite",
+        "Ass Hat",
+        "Kill Bill",
+        # Context decides; no false rejections
+        "the fire retardant foam",
+        "the emperor was naked",
+        "I fell and cut myself on a rock",
+        "the grapes and the rapeseed field",
+    ],
+)
+def test_everything_else_escalates(content):
+    assert ModerationFastPath().check(content) is None
+
+
+def test_stats_report_absorbed_traffic():
+    fast_path = ModerationFastPath()
+    fast_path.check("A happy cat")
+    fast_path.check("shit")
+    fast_path.check("A cat with a sword")
+    fast_path.check("A sleepy owl")
+    stats = fast_path.stats()
+    assert (stats["rejected"], stats["escalated"]) == (1, 3)
+    assert stats["absorbed_rate"] == 0.25
+
+
+async def test_tool_escalates_all_but_blocked_text(monkeypatch, test_config):
+    escalated = []
+
+    async def fake_agent(self, *, args, tool_context):
+        escalated.append(args["content"])
+        return '{"status": "APPROVED"}'
+
+    monkeypatch.setattr(AgentTool, "run_async", fake_agent)
+    tool = moderation_agent.content_moderation_tool
+    context = SimpleNamespace(state={})
+
+    verdict = await tool.run_async(args={"content": "Sh1t Face", "content_type": "name"}, tool_context=context)
+    assert verdict["status"] == REJECTED
+    # Names are never approved locally
+    await tool.run_async(args={"content": "Milo", "content_type": "name"}, tool_context=context)
+    await tool.run_async(args={"content": "A sword fight", "content_type": "page_text"}, tool_context=context)
+    assert escalated == ["Milo", "A sword fight"]
+
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, moderation_fast_path=False))
+    await tool.run_async(args={"content": "Sh1t Face", "content_type": "name"}, tool_context=context)
+    assert escalated == ["Milo", "A sword fight", "Sh1t Face"]
@@ -0,0 +1,70 @@
+"""Unit tests for the moderation gate in front of image generation."""
+
+import dataclasses
+from types import SimpleNamespace
+
+import config.settings as settings
+from agents.sub_agents.content_moderation import image_gate
+from agents.sub_agents.content_moderation.image_gate import ImagePromptGate
+
+REJECTED = {"status": "REJECTED", "reason": "violence", "kid_friendly_message": "Let's draw something kind!"}
+
+
+class FakeModeration:
+    def __init__(self):
+        self.calls = []
+
+    async def run_async(self, *, args, tool_context):
+        self.calls.append(args)
+        if "items" in args:
+            return {
+                "verdicts": [
+                    {"id": item["id"], **(REJECTED if "battle" in item["content"] else {"status": "APPROVED"})}
+                    for item in args["items"]
+                ]
+            }
+        return REJECTED if "battle" in args["content"] else {"status": "APPROVED"}
+
+
+async def test_check_blocks_rejected_prompts_and_counts(monkeypatch):
+    fake = FakeModeration()
+    monkeypatch.setattr(image_gate, "content_moderation_tool", fake)
+    gate = ImagePromptGate()
+    context = SimpleNamespace(state={})
+
+    assert await gate.check("a bunny in a meadow", "cover", context) is None
+    blocked = await gate.check("a bloody battle", "page", context)
+    assert blocked == {"status": "blocked", **{k: REJECTED[k] for k in ("reason", "kid_friendly_message")}}
+    assert fake.calls[0] == {"content": "a bunny in a meadow", "content_type": "illustration_prompt"}
+    stats = gate.stats()
+    assert stats["cover"] == {"checked": 1, "blocked": 0}
+    assert stats["page"] == {"checked": 1, "blocked": 1}
+    assert stats["total"] == {"checked": 2, "blocked": 1}
+
+
+async def test_unparseable_verdicts_fail_closed(monkeypatch):
+    class Confused:
+        async def run_async(self, *, args, tool_context):
+            return "I am not sure"
+
+    monkeypatch.setattr(image_gate, "content_moderation_tool", Confused())
+    blocked = await ImagePromptGate().check("a kite", "page", SimpleNamespace(state={}))
+    assert blocked["status"] == "blocked"
+
+
+async def test_check_many_uses_one_batch_call(monkeypatch):
+    fake = FakeModeration()
+    monkeypatch.setattr(image_gate, "content_moderation_batch_tool", fake)
+    outcomes = await ImagePromptGate().check_many(
+        ["a kite", "a battle", "a picnic"], "page", SimpleNamespace(state={})
+    )
+    assert len(fake.calls) == 1
+    assert [o is None for o in outcomes] == [True, False, True]
+
+
+async def test_gate_can_be_disabled(monkeypatch, test_config):
+    fake = FakeModeration()
+    monkeypatch.setattr(image_gate, "content_moderation_tool", fake)
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, image_prompt_moderation=False))
+    assert await ImagePromptGate().check("a battle", "cover", SimpleNamespace(state={})) is None
+    assert fake.calls == []
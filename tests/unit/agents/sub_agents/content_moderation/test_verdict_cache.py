@@ -0,0 +1,77 @@
+"""Unit tests for the moderation verdict cache."""
+
+from types import SimpleNamespace
+
+from google.adk.tools.agent_tool import AgentTool
+
+from agents.sub_agents.content_moderation import agent as moderation_agent
+from agents.sub_agents.content_moderation.verdict_cache import (
+    ModerationVerdictCache,
+    get_moderation_verdict_cache,
+    parse_verdict,
+    prompt_version,
+)
+
+REJECTED = {"status": "REJECTED", "reason": "too scary", "kid_friendly_message": "Let's try a kinder idea!"}
+
+
+def test_keys_normalize_content_and_type():
+    key = ModerationVerdictCache.make_key("  The  Brave\nKnight ", "Title", "v1")
+    assert key == ModerationVerdictCache.make_key("the brave knight", "title", "v1")
+    assert key != ModerationVerdictCache.make_key("the brave knight", "page_text", "v1")
+    assert key != ModerationVerdictCache.make_key("the brave knight", "title", "v2")
+
+
+def test_lru_eviction_and_ttl():
+    now = [0.0]
+    cache = ModerationVerdictCache(max_entries=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.put(("a", "", "v"), REJECTED)
+    cache.put(("b", "", "v"), REJECTED)
+    assert cache.get(("a", "", "v")) == REJECTED
+    cache.put(("c", "", "v"), REJECTED)  # evicts "b", the least recently used
+    assert cache.get(("b", "", "v")) is None
+
+    now[0] = 11
+    assert cache.get(("a", "", "v")) is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"], stats["evictions"]) == (1, 2, 1, 1)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_parse_verdict_accepts_fenced_json_only():
+    assert parse_verdict('```json\n{"status": "APPROVED", "message": "ok"}\n```')["status"] == "APPROVED"
+    assert parse_verdict("Looks fine to me!") is None
+    assert parse_verdict('{"status": "MAYBE"}') is None
+
+
+def test_prompt_version_tracks_instruction():
+    assert prompt_version("rules") == prompt_version("rules") != prompt_version("new rules")
+
+
+async def test_tool_serves_repeats_from_cache(monkeypatch):
+    calls = []
+
+    async def fake_agent(self, *, args, tool_context):
+        calls.append(args["content"])
+        return '{"status": "REJECTED", "reason": "too scary", "kid_friendly_message": "Let\'s try a kinder idea!"}'
+
+    monkeypatch.setattr(AgentTool, "run_async", fake_agent)
+    tool = moderation_agent.content_moderation_tool
+    context = SimpleNamespace(state={})
+    args = {"content": "The knight fought a scary monster", "content_type": "page_text"}
+
+    first = await tool.run_async(args=args, tool_context=context)
+    second = await tool.run_async(
+        args={"content": "the knight  fought a scary monster", "content_type": "page_text"},
+        tool_context=context,
+    )
+    assert first == second == REJECTED
+    assert len(calls) == 1
+    assert get_moderation_verdict_cache().stats()["hits"] == 1
+
+    # Editing the moderation prompt changes the version and misses the cache
+    monkeypatch.setattr(
+        tool.agent, "static_instruction", tool.agent.static_instruction + "\nBe extra careful."
+    )
+    await tool.run_async(args=args, tool_context=context)
+    assert len(calls) == 2
@@ -0,0 +1,53 @@
+"""Fixtures that replace the image API with in-process fakes."""
+
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+
+from agents.sub_agents.cover_agent import image_backends
+from agents.sub_agents.cover_agent.image_rate_limiter import ImageRateLimiter
+
+
+class FakeImageAPI:
+    """Stands in for the pooled OpenAI and HTTP clients."""
+
+    def __init__(self, content: bytes = b"png-bytes", delay: float = 0.0):
+        self.content = content
+        self.delay = delay
+        self.calls = []
+        self.downloads = []
+        self.images = self
+        self.openai = self
+        self.http = self
+
+    async def generate(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        if kwargs.get("response_format") == "url":
+            item = SimpleNamespace(b64_json=None, url=f"http://images.invalid/{len(self.calls)}.png")
+        else:
+            item = SimpleNamespace(b64_json=base64.b64encode(self.content).decode(), url=None)
+        return SimpleNamespace(data=[item])
+
+    @asynccontextmanager
+    async def stream(self, method, url):
+        self.downloads.append(url)
+
+        async def aiter_bytes(chunk_size):
+            for start in range(0, len(self.content), chunk_size):
+                yield self.content[start:start + chunk_size]
+
+        yield SimpleNamespace(raise_for_status=lambda: None, aiter_bytes=aiter_bytes)
+
+
+@pytest.fixture
+def fake_image_api(test_config, monkeypatch):
+    """Route image generation through a FakeImageAPI instead of the network."""
+    api = FakeImageAPI()
+    limiter = ImageRateLimiter(requests_per_minute=0, images_per_minute=0, max_retries=0)
+    monkeypatch.setattr(image_backends, "get_image_clients", lambda: api)
+    monkeypatch.setattr(image_backends, "get_image_rate_limiter", lambda: limiter)
+    return api
@@ -0,0 +1,33 @@
+"""Unit tests for the cover image tool."""
+
+import dataclasses
+from types import SimpleNamespace
+
+import config.settings as settings
+from agents.sub_agents.content_moderation import image_gate
+from agents.story_coach.state import load_story_state
+from agents.sub_agents.cover_agent.agent import generate_cover_image
+
+
+class FakeModeration:
+    async def run_async(self, *, args, tool_context):
+        if "battle" in args["content"]:
+            return {"status": "REJECTED", "reason": "violence", "kid_friendly_message": "Try a kinder idea!"}
+        return {"status": "APPROVED"}
+
+
+async def test_blocked_cover_prompt_costs_no_image(fake_image_api, monkeypatch, test_config):
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, image_background_jobs=False))
+    monkeypatch.setattr(image_gate, "content_moderation_tool", FakeModeration())
+    context = SimpleNamespace(state={}, session=SimpleNamespace(id="story-1"))
+
+    blocked = await generate_cover_image("an epic battle", context)
+    assert blocked["status"] == "blocked" and blocked["kid_friendly_message"] == "Try a kinder idea!"
+    assert fake_image_api.calls == []
+
+    assert load_story_state(context.state).cover_image is None
+
+    done = await generate_cover_image("a rainbow castle", context)
+    assert done["status"] == "done" and len(fake_image_api.calls) == 1
+    # Without background jobs the cover is saved to the story right away
+    assert load_story_state(context.state).cover_image == done["image_path"]
@@ -0,0 +1,90 @@
+"""Unit tests for the pluggable image backends."""
+
+import asyncio
+import base64
+import dataclasses
+import os
+import random
+
+import pytest
+from PIL import Image
+
+import config.settings as settings
+
+from agents.sub_agents.cover_agent import image_backends, image_generator
+
+
+def test_image_request_params_by_model():
+    assert image_backends.image_request_params("dall-e-3") == {
+        "size": "1024x1024",
+        "model": "dall-e-3",
+        "quality": "standard",
+        "response_format": "b64_json",
+    }
+    assert image_backends.image_request_params("DALL-E-2", "url") == {
+        "size": "1024x1024",
+        "model": "dall-e-2",
+        "response_format": "url",
+    }
+    assert image_backends.image_request_params("gpt-image-1") == {"size": "1024x1024"}
+
+
+def test_write_b64_image_decodes_in_slices(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_backends, "B64_CHUNK_CHARS", 8)
+    data = os.urandom(1001)
+    target = tmp_path / "img.png"
+    image_backends.write_b64_image(base64.b64encode(data).decode(), target)
+    assert target.read_bytes() == data
+
+
+async def test_clients_are_reused_within_a_loop(test_config):
+    try:
+        assert image_backends.get_image_clients() is image_backends.get_image_clients()
+    finally:
+        await image_backends.aclose_image_clients()
+
+
+def test_backend_selection(monkeypatch, test_config):
+    def backend_for(**changes):
+        monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, **changes))
+        return image_backends.get_image_backend()
+
+    assert isinstance(backend_for(), image_backends.OpenAIImageBackend)
+    assert isinstance(backend_for(image_model_name="local-sd"), image_backends.LocalImageBackend)
+    assert isinstance(backend_for(image_backend="local"), image_backends.LocalImageBackend)
+    with pytest.raises(RuntimeError, match="Unknown image backend"):
+        backend_for(image_backend="nope")
+
+
+async def test_local_backend_is_deterministic(tmp_path):
+    backend = image_backends.LocalImageBackend("local")
+    first, second, other = tmp_path / "a.png", tmp_path / "b.png", tmp_path / "c.png"
+    await backend.render("a purple whale", first)
+    await backend.render("a purple whale", second)
+    await backend.render("a green whale", other)
+
+    assert first.read_bytes() == second.read_bytes() != other.read_bytes()
+    with Image.open(first) as image:
+        assert image.format == "PNG" and image.size == (1024, 1024)
+
+
+async def test_local_backend_injects_latency_and_errors(tmp_path):
+    backend = image_backends.LocalImageBackend(
+        "local", latency_seconds=0.05, error_rate=0.5, rng=random.Random(7)
+    )
+    outcomes = await asyncio.gather(
+        *(backend.render(f"page {n}", tmp_path / f"{n}.png") for n in range(20)),
+        return_exceptions=True,
+    )
+    failures = [o for o in outcomes if isinstance(o, image_backends.LocalImageBackendError)]
+    assert 0 < len(failures) < 20
+    assert len(os.listdir(tmp_path)) == 20 - len(failures)
+
+
+async def test_generator_uses_local_backend(monkeypatch, test_config):
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, image_backend="local"))
+    path = await image_generator.agenerate_image("a lighthouse at dusk", prefix="cover", session_id="s1")
+    with Image.open(path) as image:
+        assert image.format == "PNG"
+    index = image_generator.get_prompt_index(os.path.join(test_config.output_dir, ".cache"))
+    assert index.stats()["entries"] == 1
@@ -0,0 +1,41 @@
+"""Unit tests for the offline image benchmark."""
+
+import dataclasses
+
+import config.settings as settings
+
+from agents.sub_agents.cover_agent.image_benchmark import benchmark_prompts, run_image_benchmark
+
+
+def test_workload_is_reproducible_and_has_repeats():
+    work = benchmark_prompts(covers=2, pages=40, repeat_ratio=0.5, seed=3)
+    assert work == benchmark_prompts(covers=2, pages=40, repeat_ratio=0.5, seed=3)
+    assert [prefix for _, prefix, _ in work[:2]] == ["cover", "cover"]
+    pages = [(session_id, prompt) for session_id, prefix, prompt in work if prefix == "page"]
+    assert len(pages) == 40 and len(set(pages)) < 40
+    # Pages are spread over the two stories, and repeats stay within a story
+    assert {session_id for session_id, _ in pages} == {"benchmark-story-0", "benchmark-story-1"}
+    for session_id, prompt in pages:
+        if prompt.endswith("!"):
+            assert (session_id, prompt[:-1]) in pages
+
+
+async def test_benchmark_runs_on_local_backend(monkeypatch, test_config, tmp_path):
+    monkeypatch.setattr(
+        settings,
+        "_CONFIG",
+        dataclasses.replace(
+            test_config,
+            image_backend="local",
+            image_local_error_rate=0.0,
+            image_similarity_threshold=0.97,
+        ),
+    )
+    result = await run_image_benchmark(
+        covers=2, pages=30, concurrency=1, repeat_ratio=0.5, output_dir=str(tmp_path), seed=1
+    )
+    assert result["images"] == 32 and result["failures"] == 0
+    assert result["cache"]["hits"] > 0
+    # Re-typed page prompts reuse the earlier image of their own story
+    assert result["near_duplicates"]["hits"] > 0
+    assert result["latency_p50"] is not None
@@ -0,0 +1,60 @@
+"""Unit tests for the content-addressed image cache."""
+
+from agents.sub_agents.cover_agent.image_cache import ImageCache
+
+
+def _write(path, size):
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_make_key_depends_on_every_parameter():
+    base = ImageCache.make_key("dall-e-3", "1024x1024", "standard", "a red fox")
+    assert len(base) == 64
+    assert base == ImageCache.make_key("dall-e-3", "1024x1024", "standard", "a red fox")
+    assert base != ImageCache.make_key("dall-e-2", "1024x1024", "standard", "a red fox")
+    assert base != ImageCache.make_key("dall-e-3", "512x512", "standard", "a red fox")
+    assert base != ImageCache.make_key("dall-e-3", "1024x1024", None, "a red fox")
+    assert base != ImageCache.make_key("dall-e-3", "1024x1024", "standard", "a blue fox")
+
+
+def test_get_counts_hits_and_misses(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_bytes=1000)
+    assert cache.get("missing") is None
+    cache.put("abc", _write(tmp_path / "img.png", 10))
+    assert cache.get("abc").read_bytes() == b"x" * 10
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_by_size(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_bytes=25)
+    cache.put("a", _write(tmp_path / "a.png", 10))
+    cache.put("b", _write(tmp_path / "b.png", 10))
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", _write(tmp_path / "c.png", 10))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.total_bytes() == 20
+
+
+def test_index_survives_reload(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_bytes=1000)
+    cache.put("a", _write(tmp_path / "a.png", 10))
+    reloaded = ImageCache(tmp_path / "cache", max_bytes=1000)
+    assert reloaded.get("a") is not None
+
+
+
+def test_hits_update_recency_in_memory_until_flush(tmp_path):
+    cache = ImageCache(tmp_path / "cache", max_bytes=1000)
+    cache.put("a", _write(tmp_path / "a.png", 10))
+    cache.put("b", _write(tmp_path / "b.png", 10))
+
+    cache.get("a")
+    # The hit did not rewrite the index on disk
+    assert list(ImageCache(tmp_path / "cache", max_bytes=1000)._index) == ["a", "b"]
+    cache.flush()
+    assert list(ImageCache(tmp_path / "cache", max_bytes=1000)._index) == ["b", "a"]
@@ -0,0 +1,118 @@
+"""Unit tests for the image generation utility."""
+
+import asyncio
+import dataclasses
+import hashlib
+import os
+import time
+
+import pytest
+
+import config.settings as settings
+
+from agents.sub_agents.cover_agent import image_generator
+
+
+def test_generate_image_serves_repeat_prompts_from_cache(fake_image_api):
+    first = image_generator.generate_image("a friendly dragon", prefix="page")
+    second = image_generator.generate_image("a friendly dragon", prefix="cover")
+
+    assert len(fake_image_api.calls) == 1
+    assert fake_image_api.calls[0]["model"] == "dall-e-3"
+    assert open(first, "rb").read() == open(second, "rb").read() == b"png-bytes"
+    assert fake_image_api.downloads == []
+
+
+def test_url_mode_streams_download(fake_image_api, monkeypatch, test_config):
+    monkeypatch.setattr(
+        settings, "_CONFIG", dataclasses.replace(test_config, image_response_format="url")
+    )
+    fake_image_api.content = os.urandom(200_000)
+    path = image_generator.generate_image("a windmill")
+    assert len(fake_image_api.downloads) == 1
+    assert open(path, "rb").read() == fake_image_api.content
+    assert not [
+        name for _, _, names in os.walk(test_config.output_dir) for name in names if name.endswith(".part")
+    ]
+
+
+def test_generate_image_wraps_api_errors(fake_image_api):
+    async def broken(**kwargs):
+        raise ValueError("boom")
+
+    fake_image_api.generate = broken
+    with pytest.raises(RuntimeError, match="Failed to generate image"):
+        image_generator.generate_image("a quiet pond")
+
+
+async def test_concurrent_generations_overlap(fake_image_api):
+    fake_image_api.delay = 0.2
+    start = time.perf_counter()
+    paths = await asyncio.gather(
+        image_generator.agenerate_image("a castle", prefix="page"),
+        image_generator.agenerate_image("a meadow", prefix="page"),
+        image_generator.agenerate_image("a lighthouse", prefix="page"),
+    )
+    assert len(set(paths)) == 3
+    assert time.perf_counter() - start < 0.5
+
+
+async def test_batch_preserves_order_and_caps_concurrency(fake_image_api):
+    fake_image_api.delay = 0.05
+    in_flight = peak = 0
+    original = fake_image_api.generate
+
+    async def tracking_generate(**kwargs):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        try:
+            return await original(**kwargs)
+        finally:
+            in_flight -= 1
+
+    fake_image_api.generate = tracking_generate
+    prompts = [f"page {n} of the story" for n in range(1, 8)]
+    paths = await image_generator.agenerate_images_batch(prompts, prefix="page", concurrency=3)
+
+    assert sorted(c["prompt"] for c in fake_image_api.calls) == sorted(prompts)
+    expected = [f"page_{hashlib.md5(p.encode()).hexdigest()[:8]}.png" for p in prompts]
+    assert [os.path.basename(path) for path in paths] == expected
+    assert peak == 3
+
+
+async def test_batch_reports_failed_pages(fake_image_api):
+    original = fake_image_api.generate
+
+    async def flaky_generate(**kwargs):
+        if "page 2" in kwargs["prompt"]:
+            raise ValueError("rate limited")
+        return await original(**kwargs)
+
+    fake_image_api.generate = flaky_generate
+    with pytest.raises(RuntimeError, match="1 of 3 images: image 2"):
+        await image_generator.agenerate_images_batch(["page 1", "page 2", "page 3"])
+
+
+async def test_near_matches_stay_within_one_session(fake_image_api, monkeypatch, test_config):
+    monkeypatch.setattr(
+        settings, "_CONFIG", dataclasses.replace(test_config, image_similarity_threshold=0.97)
+    )
+    style = (
+        " Soft watercolor children's picture book illustration, warm friendly colours,"
+        " gentle lighting, rounded shapes, no text, no lettering."
+    )
+    riding = "Milo rides a green dragon over the village." + style
+    sleeping = "Milo falls asleep next to a green dragon in a cave at night." + style
+
+    # Distinct pages of one story each get their own image despite the shared style
+    await image_generator.agenerate_image(riding, prefix="page", session_id="story-a")
+    await image_generator.agenerate_image(sleeping, prefix="page", session_id="story-a")
+    assert len(fake_image_api.calls) == 2
+
+    # A near-identical prompt reuses the image only within the same story
+    again = riding.replace("village.", "village!")
+    await image_generator.agenerate_image(again, prefix="page", session_id="story-a")
+    assert len(fake_image_api.calls) == 2
+    await image_generator.agenerate_image(again, prefix="page", session_id="story-b")
+    assert len(fake_image_api.calls) == 3
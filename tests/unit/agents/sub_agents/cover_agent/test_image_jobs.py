@@ -0,0 +1,89 @@
+"""Unit tests for the background image job queue."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from agents.sub_agents.cover_agent.image_jobs import (
+    DONE,
+    FAILED,
+    STATE_KEY,
+    ImageJobQueue,
+    start_image_job,
+)
+from agents.sub_agents.cover_agent import image_jobs
+
+
+@pytest.fixture
+def queue():
+    job_queue = ImageJobQueue(workers=2)
+    yield job_queue
+    job_queue.shutdown()
+
+
+def test_submit_returns_before_work_finishes(queue):
+    release = threading.Event()
+
+    async def work():
+        while not release.is_set():
+            await asyncio.sleep(0.01)
+        return "outputs/cover_1234.png"
+
+    job = queue.submit("cover", work)
+    assert queue.get(job.job_id).status in ("queued", "running")
+    release.set()
+    assert queue.wait(job.job_id, timeout=5).status == DONE
+    assert queue.statuses([job.job_id]) == [
+        {"job_id": job.job_id, "kind": "cover", "status": DONE, "result": "outputs/cover_1234.png"}
+    ]
+
+
+def test_failed_jobs_report_their_error(queue):
+    async def work():
+        raise RuntimeError("Failed to generate image: quota")
+
+    job = queue.submit("page", work, metadata={"page_number": 3})
+    queue.wait(job.job_id, timeout=5)
+    status = queue.statuses([job.job_id])[0]
+    assert status["status"] == FAILED
+    assert status["page_number"] == 3
+    assert "quota" in status["error"]
+    assert queue.statuses(["nope"]) == [{"job_id": "nope", "status": "unknown"}]
+
+
+def test_worker_pool_caps_running_jobs(queue):
+    lock = threading.Lock()
+    running = peak = 0
+
+    async def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        with lock:
+            running -= 1
+
+    jobs = [queue.submit("page", work) for _ in range(6)]
+    for job in jobs:
+        queue.wait(job.job_id, timeout=5)
+    assert peak == 2
+    assert queue.stats()[DONE] == 6
+
+
+def test_start_image_job_records_job_in_state(queue, monkeypatch):
+    monkeypatch.setattr(image_jobs, "get_image_job_queue", lambda: queue)
+    tool_context = SimpleNamespace(state={})
+
+    async def work():
+        return "outputs/page_1.png"
+
+    first = start_image_job("page", work, tool_context, metadata={"page_number": 1})
+    second = start_image_job("cover", work, tool_context)
+    assert first["status"] == "queued"
+    assert tool_context.state[STATE_KEY] == {
+        first["job_id"]: {"kind": "page", "page_number": 1},
+        second["job_id"]: {"kind": "cover"},
+    }
@@ -0,0 +1,135 @@
+"""Unit tests for the image API rate limiter and retry policy."""
+
+import httpx
+import openai
+import pytest
+
+from agents.sub_agents.cover_agent.image_rate_limiter import (
+    ImageRateLimiter,
+    TokenBucket,
+    retry_after_seconds,
+)
+
+
+def _status_error(cls, status, headers=None):
+    request = httpx.Request("POST", "https://api.openai.invalid/v1/images/generations")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("error", response=response, body=None)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def sleeps():
+    return []
+
+
+@pytest.fixture
+def limiter(sleeps):
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    return ImageRateLimiter(
+        requests_per_minute=0, images_per_minute=0, max_retries=2, sleep=fake_sleep
+    )
+
+
+def test_token_bucket_schedules_debt():
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=60, clock=clock)
+    assert [bucket.reserve() for _ in range(60)] == [0.0] * 60
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)
+    clock.now += 10
+    assert bucket.reserve() == 0.0
+
+
+def test_retry_after_headers():
+    assert retry_after_seconds(_status_error(openai.RateLimitError, 429, {"retry-after": "7"})) == 7
+    assert retry_after_seconds(_status_error(openai.RateLimitError, 429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after_seconds(_status_error(openai.RateLimitError, 429)) is None
+    assert retry_after_seconds(ValueError("no response")) is None
+
+
+def test_bad_retry_after_headers_fall_back_to_backoff():
+    def delay(headers):
+        return retry_after_seconds(_status_error(openai.RateLimitError, 429, headers))
+
+    assert delay({"retry-after": "soon"}) is None
+    assert delay({"retry-after-ms": "-500"}) == 0.0
+    # A date without a timezone is read as UTC
+    assert 0 < delay({"retry-after": "Fri, 01 Jan 2100 00:00:00"}) == pytest.approx(
+        delay({"retry-after": "Fri, 01 Jan 2100 00:00:00 GMT"}), abs=1
+    )
+
+
+async def test_malformed_retry_after_is_still_retried(limiter, sleeps):
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _status_error(openai.RateLimitError, 429, {"retry-after": "soon"})
+        return "image"
+
+    assert await limiter.call(request) == "image"
+    assert len(sleeps) == 1 and 0 <= sleeps[0] <= limiter.max_delay
+
+
+async def test_retries_429_honouring_retry_after(limiter, sleeps):
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _status_error(openai.RateLimitError, 429, {"retry-after": "3"})
+        return "image"
+
+    assert await limiter.call(request) == "image"
+    assert sleeps == [3.0]
+    stats = limiter.stats()
+    assert (stats["requests"], stats["retried"], stats["rate_limited"]) == (2, 1, 1)
+
+
+async def test_gives_up_after_max_retries(limiter, sleeps):
+    async def request():
+        raise _status_error(openai.InternalServerError, 503)
+
+    with pytest.raises(openai.InternalServerError):
+        await limiter.call(request)
+    assert len(sleeps) == 2
+    assert all(0 <= delay <= limiter.max_delay for delay in sleeps)
+    assert limiter.stats()["failed"] == 1
+
+
+async def test_client_errors_are_not_retried(limiter, sleeps):
+    async def request():
+        raise _status_error(openai.BadRequestError, 400)
+
+    with pytest.raises(openai.BadRequestError):
+        await limiter.call(request)
+    assert sleeps == []
+
+
+async def test_buckets_throttle_bursts(sleeps):
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+
+    clock = FakeClock()
+    limiter = ImageRateLimiter(
+        requests_per_minute=120, images_per_minute=2, max_retries=0, sleep=fake_sleep, clock=clock
+    )
+
+    async def request():
+        return "image"
+
+    for _ in range(3):
+        await limiter.call(request)
+    assert sleeps == [pytest.approx(30.0)]
+    assert limiter.stats()["throttled"] == 1
@@ -0,0 +1,99 @@
+"""Unit tests for sharded output storage, its manifest and garbage collection."""
+
+import dataclasses
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import config.settings as settings
+from agents.sub_agents.cover_agent import image_generator
+from agents.sub_agents.cover_agent.image_store import (
+    SESSION_STATE_KEY,
+    ImageStore,
+    story_session_id,
+)
+
+
+def _image(store, name, size, session_id=None, page_number=None):
+    path = store.shard_dir(session_id) / name
+    path.write_bytes(b"x" * size)
+    store.record(path, session_id=session_id, page_number=page_number, kind="page")
+    return path
+
+
+def test_shard_directories(tmp_path):
+    now = datetime(2026, 3, 7, tzinfo=timezone.utc).timestamp()
+    by_date = ImageStore(tmp_path / "a", shard_by="date")
+    assert by_date.shard_dir("abc", now=now) == by_date.root_dir / "2026" / "03" / "07"
+
+    by_session = ImageStore(tmp_path / "b", shard_by="session")
+    assert by_session.shard_dir("f1e2/../d3") == by_session.root_dir / "sessions" / "f1" / "f1e2d3"
+    assert by_session.shard_dir(None, now=now) == by_session.root_dir / "2026" / "03" / "07"
+
+    flat = ImageStore(tmp_path / "c", shard_by="none")
+    assert flat.shard_dir("abc") == flat.root_dir
+
+
+def test_manifest_lists_session_images_by_page(tmp_path):
+    store = ImageStore(tmp_path, shard_by="session")
+    _image(store, "page_2.png", 20, "story-1", 2)
+    _image(store, "page_1.png", 10, "story-1", 1)
+    _image(store, "page_9.png", 10, "story-2", 1)
+
+    rows = store.session_images("story-1")
+    assert [(row["page_number"], row["size"]) for row in rows] == [(1, 10), (2, 20)]
+    assert rows[0]["path"].endswith("sessions/st/story-1/page_1.png")
+    assert store.total_bytes() == 40
+
+
+def test_gc_quota_deletes_oldest_first(tmp_path):
+    store = ImageStore(tmp_path, shard_by="session")
+    old = _image(store, "old.png", 10, "story-1")
+    old.with_suffix(".webp").write_bytes(b"variant")
+    time.sleep(0.01)
+    middle = _image(store, "middle.png", 10, "story-2")
+    time.sleep(0.01)
+    newest = _image(store, "newest.png", 10, "story-3")
+
+    result = store.collect_garbage(ttl_seconds=3600, max_bytes=15)
+    assert result == {"deleted": 2, "freed_bytes": 20}
+    assert not old.exists() and not old.with_suffix(".webp").exists()
+    assert not old.parent.exists()
+    assert not middle.exists()
+    assert newest.exists()
+    assert store.total_bytes() == 10
+
+
+def test_gc_ttl_only_removes_expired(tmp_path):
+    store = ImageStore(tmp_path)
+    path = _image(store, "page.png", 10)
+    assert store.collect_garbage(ttl_seconds=60) == {"deleted": 0, "freed_bytes": 0}
+    assert store.collect_garbage(ttl_seconds=60, now=time.time() + 120) == {"deleted": 1, "freed_bytes": 10}
+    assert not path.exists()
+
+
+def test_story_session_id_prefers_state():
+    context = SimpleNamespace(state={SESSION_STATE_KEY: "root-session"}, session=SimpleNamespace(id="child"))
+    assert story_session_id(context) == "root-session"
+    assert story_session_id(SimpleNamespace(state={}, session=SimpleNamespace(id="child"))) == "child"
+
+
+async def test_generator_shards_and_records(fake_image_api, monkeypatch, test_config):
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, output_shard_by="session"))
+    path = await image_generator.agenerate_image(
+        "a rocket to the moon", prefix="page", session_id="story-42", page_number=3
+    )
+    assert "/sessions/st/story-42/page_" in path
+    rows = image_generator.get_image_store(test_config.output_dir).session_images("story-42")
+    assert [(row["page_number"], row["kind"], row["path"]) for row in rows] == [(3, "page", path)]
+    assert len(rows[0]["prompt_hash"]) == 64
+
+
+async def test_same_prompt_in_two_sessions_keeps_both_images(fake_image_api, test_config):
+    # Date sharding puts both stories' images in one directory
+    first = await image_generator.agenerate_image("a paper boat", prefix="page", session_id="story-a")
+    second = await image_generator.agenerate_image("a paper boat", prefix="page", session_id="story-b")
+    assert first != second and len(fake_image_api.calls) == 1
+    store = image_generator.get_image_store(test_config.output_dir)
+    assert [row["path"] for row in store.session_images("story-a")] == [first]
+    assert [row["path"] for row in store.session_images("story-b")] == [second]
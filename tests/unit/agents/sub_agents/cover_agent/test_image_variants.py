@@ -0,0 +1,51 @@
+"""Unit tests for preview image derivatives."""
+
+import os
+
+from PIL import Image
+
+from agents.sub_agents.cover_agent import image_generator
+from agents.sub_agents.cover_agent.image_variants import get_image_variants
+
+
+def _png(path, size=(1024, 1024)):
+    Image.new("RGB", size, (250, 180, 40)).save(path, format="PNG")
+    return path
+
+
+def test_variants_are_built_once_and_reused(test_config, tmp_path):
+    original = _png(tmp_path / "page_abcd1234.png")
+    manifest = get_image_variants(original)
+
+    assert manifest["image_path"] == str(original)
+    with Image.open(manifest["webp_path"]) as webp:
+        assert webp.format == "WEBP" and webp.size == (1024, 1024)
+    with Image.open(manifest["thumbnail_path"]) as thumbnail:
+        assert thumbnail.size == (256, 256)
+
+    built_at = os.stat(manifest["thumbnail_path"]).st_mtime_ns
+    assert get_image_variants(original) == manifest
+    assert os.stat(manifest["thumbnail_path"]).st_mtime_ns == built_at
+
+
+def test_variants_are_rebuilt_when_original_changes(test_config, tmp_path):
+    original = _png(tmp_path / "cover_abcd1234.png")
+    manifest = get_image_variants(original)
+    _png(original, size=(512, 256))
+    os.utime(original, ns=(os.stat(manifest["webp_path"]).st_mtime_ns + 10**9,) * 2)
+    with Image.open(get_image_variants(original)["webp_path"]) as webp:
+        assert webp.size == (512, 256)
+
+
+def test_undecodable_image_falls_back_to_original(test_config, tmp_path):
+    original = tmp_path / "page_broken.png"
+    original.write_bytes(b"not an image")
+    assert get_image_variants(original) == {"image_path": str(original)}
+    assert [p.name for p in tmp_path.iterdir()] == ["page_broken.png"]
+
+
+async def test_manifest_from_generator(fake_image_api, tmp_path):
+    fake_image_api.content = _png(tmp_path / "src.png").read_bytes()
+    manifest = await image_generator.agenerate_image_manifest("a kite in the sky", prefix="cover")
+    assert set(manifest) == {"image_path", "webp_path", "thumbnail_path"}
+    assert os.path.getsize(manifest["thumbnail_path"]) < os.path.getsize(manifest["image_path"])
@@ -0,0 +1,63 @@
+"""Unit tests for the near-duplicate prompt index."""
+
+import numpy as np
+
+from agents.sub_agents.cover_agent import image_generator
+from agents.sub_agents.cover_agent.prompt_index import PromptIndex, vectorize
+
+DRAGON_FLYING = (
+    "A friendly green dragon with big purple wings flying over a sunny meadow "
+    "full of daisies, bright watercolor storybook style"
+)
+DRAGON_SLEEPING = DRAGON_FLYING.replace("flying over", "sleeping in")
+GIRL_IN_RAIN = "A little girl in a red raincoat jumping in puddles on a rainy street, bright watercolor storybook style"
+
+
+def test_vectors_are_normalised_and_case_insensitive():
+    vector = vectorize(DRAGON_FLYING)
+    assert abs(np.linalg.norm(vector) - 1) < 1e-5
+    assert float(vector @ vectorize(DRAGON_FLYING.upper())) > 0.999
+
+
+def test_find_similar_respects_threshold_and_namespace(tmp_path):
+    index = PromptIndex(tmp_path)
+    index.add(DRAGON_FLYING, "page|dall-e-3", "key-dragon")
+    index.add(GIRL_IN_RAIN, "page|dall-e-3", "key-girl")
+
+    key, score = index.find_similar(DRAGON_SLEEPING, "page|dall-e-3", threshold=0.9)
+    assert key == "key-dragon" and score > 0.9
+    assert index.find_similar(DRAGON_SLEEPING, "cover|dall-e-3", threshold=0.9) is None
+    assert index.find_similar(DRAGON_SLEEPING, "page|dall-e-3", threshold=0.99) is None
+    assert index.stats()["hit_rate"] == 1 / 3
+
+
+def test_forget_and_reload(tmp_path):
+    index = PromptIndex(tmp_path)
+    index.add(DRAGON_FLYING, "page", "key-dragon")
+    index.add(GIRL_IN_RAIN, "page", "key-girl")
+    index.forget("key-dragon")
+    assert index.find_similar(DRAGON_SLEEPING, "page", threshold=0.9) is None
+
+    reloaded = PromptIndex(tmp_path)
+    assert reloaded.find_similar(DRAGON_SLEEPING, "page", threshold=0.9)[0] == "key-dragon"
+
+
+def test_ring_buffer_keeps_newest_entries(tmp_path):
+    index = PromptIndex(tmp_path, max_entries=3)
+    for n in range(5):
+        index.add(f"prompt number {n} " * 5, "page", f"key-{n}")
+    assert index.stats()["entries"] == 3
+    assert index.find_similar("prompt number 0 " * 5, "page", threshold=0.999) is None
+    assert index.find_similar("prompt number 4 " * 5, "page", threshold=0.999)[0] == "key-4"
+    assert len(PromptIndex(tmp_path, max_entries=3).index_path.read_text().splitlines()) <= 6
+
+
+def test_generator_reuses_near_duplicate_images(fake_image_api):
+    first = image_generator.generate_image(DRAGON_FLYING, prefix="page")
+    second = image_generator.generate_image(DRAGON_SLEEPING, prefix="page")
+    third = image_generator.generate_image(DRAGON_SLEEPING, prefix="cover")
+
+    assert [call["prompt"] for call in fake_image_api.calls] == [DRAGON_FLYING, DRAGON_SLEEPING]
+    assert first != second
+    assert open(second, "rb").read() == open(first, "rb").read()
+    assert third.endswith(".png")
@@ -0,0 +1,58 @@
+"""Unit tests for the page illustration tools."""
+
+import dataclasses
+from types import SimpleNamespace
+
+import config.settings as settings
+from agents.story_coach.state import StoryState, load_story_state, save_story_state
+from agents.sub_agents.content_moderation import image_gate
+from agents.sub_agents.cover_agent import image_generator
+from agents.sub_agents.page_illustration import agent as page_agent
+
+
+class FakeBatchModeration:
+    async def run_async(self, *, args, tool_context):
+        return {
+            "verdicts": [
+                {"id": item["id"], "status": "REJECTED", "reason": "violence"}
+                if "battle" in item["content"]
+                else {"id": item["id"], "status": "APPROVED"}
+                for item in args["items"]
+            ]
+        }
+
+
+async def test_batch_skips_blocked_prompts(monkeypatch, test_config):
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, image_background_jobs=False))
+    monkeypatch.setattr(image_gate, "content_moderation_batch_tool", FakeBatchModeration())
+    generated = []
+
+    async def fake_batch(prompts, prefix, session_id, page_numbers):
+        generated.append((list(prompts), list(page_numbers)))
+        return [{"image_path": f"/img/{n}.png"} for n in page_numbers]
+
+    monkeypatch.setattr(image_generator, "agenerate_image_manifests_batch", fake_batch)
+    context = SimpleNamespace(state={}, session=SimpleNamespace(id="story-1"))
+    story = StoryState()
+    for n in (1, 2, 3):
+        story.set_page(n, f"Page {n}.")
+    save_story_state(context.state, story)
+
+    result = await page_agent.generate_page_images(
+        ["a picnic", "a battle", "a kite"], context, page_numbers=[1, 2, 3]
+    )
+
+    assert generated == [(["a picnic", "a kite"], [1, 3])]
+    assert result["status"] == "done"
+    assert [image.get("image_path", image.get("status")) for image in result["images"]] == [
+        "/img/1.png",
+        "blocked",
+        "/img/3.png",
+    ]
+    assert [entry["page_number"] for entry in result["blocked"]] == [2]
+    # Without background jobs the drawn images are saved to their pages right away
+    assert [page.image_url for page in load_story_state(context.state).pages] == [
+        "/img/1.png",
+        None,
+        "/img/3.png",
+    ]
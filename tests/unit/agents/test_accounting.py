@@ -0,0 +1,200 @@
+"""Usage accounting per (session, agent, tool) through the runner plugin."""
+
+import dataclasses
+import threading
+from types import SimpleNamespace
+from typing import Any, AsyncGenerator, List
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import FunctionTool
+from google.adk.tools.agent_tool import AgentTool
+from google.adk.tools.tool_context import ToolContext
+from google.genai import types
+
+import config.settings as settings
+from agents import accounting
+from agents.accounting import (
+    IMAGE,
+    MODEL,
+    RUN,
+    STATE_KEY,
+    TOOL,
+    UsageAccountingPlugin,
+    UsageLedger,
+    UsageRecord,
+    UsageSink,
+    model_call_cost,
+    record_image,
+)
+from agents.sub_agents.cover_agent.image_jobs import ImageJobQueue
+
+
+class ScriptedLlm(BaseLlm):
+    """Replies with the next scripted response, reporting fixed token usage."""
+
+    script: List[Any]
+
+    async def generate_content_async(self, llm_request, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        part = self.script.pop(0)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=100, candidates_token_count=10, cached_content_token_count=40
+            ),
+        )
+
+
+def _text(text):
+    return types.Part(text=text)
+
+
+def _call(name, **args):
+    return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+
+async def draw_picture(prompt: str, tool_context: ToolContext) -> dict:
+    """Draw a picture."""
+    record_image(tool_context.session.id, "cover", cached=False, seconds=0.5)
+    return {"status": "done"}
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch, test_config):
+    ledger = UsageLedger(UsageSink(tmp_path / "usage.sqlite3"))
+    monkeypatch.setattr(accounting, "_LEDGER", ledger)
+    return ledger
+
+
+async def test_usage_is_attributed_per_session_agent_and_tool(ledger):
+    helper = LlmAgent(
+        name="helper_agent",
+        model=ScriptedLlm(model="openai/gpt-4o-mini", script=[_text("A dragon.")]),
+        instruction="Help.",
+    )
+    root = LlmAgent(
+        name="StoryCoach",
+        model=ScriptedLlm(
+            model="openai/gpt-4o-mini",
+            script=[_call("helper_agent", request="idea"), _call("draw_picture", prompt="a dragon"), _text("Done!")],
+        ),
+        instruction="Coach.",
+        tools=[AgentTool(agent=helper), FunctionTool(func=draw_picture)],
+    )
+    session_service = InMemorySessionService()
+    runner = Runner(
+        app_name="usage_test",
+        agent=root,
+        session_service=session_service,
+        plugins=[UsageAccountingPlugin()],
+    )
+    session = await session_service.create_session(app_name="usage_test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text="Hi")])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+
+    rows = {(row["agent"], row["tool"], row["kind"]): row for row in ledger.sink.breakdown(session.id)}
+    # The sub-agent's model call runs in its own session but counts for the story
+    assert set(rows) == {
+        ("StoryCoach", "", MODEL),
+        ("StoryCoach", "", RUN),
+        ("StoryCoach", "helper_agent", TOOL),
+        ("StoryCoach", "draw_picture", TOOL),
+        ("StoryCoach", "draw_picture", IMAGE),
+        ("helper_agent", "helper_agent", MODEL),
+        ("helper_agent", "helper_agent", RUN),
+    }
+    assert rows[("StoryCoach", "", MODEL)]["calls"] == 3
+    assert rows[("helper_agent", "helper_agent", MODEL)]["prompt_tokens"] == 100
+    assert rows[("helper_agent", "helper_agent", MODEL)]["cached_tokens"] == 40
+
+    totals = ledger.session_totals(session.id)
+    assert totals["model_calls"] == 4
+    assert (totals["prompt_tokens"], totals["completion_tokens"], totals["cached_tokens"]) == (400, 40, 160)
+    assert totals["tool_calls"] == 2 and totals["run_calls"] == 2
+    assert totals["cost_usd"] == pytest.approx(4 * model_call_cost("openai/gpt-4o-mini", 100, 40, 10))
+    assert totals["cost_usd"] > 0
+
+    stored = (await session_service.get_session(app_name="usage_test", user_id="u", session_id=session.id)).state
+    usage = stored[STATE_KEY]
+    # The turn's own run record is written after its last event
+    assert usage["run_calls"] == 1
+    assert {k: v for k, v in usage.items() if not k.startswith("run_")} == {
+        k: v for k, v in totals.items() if not k.startswith("run_")
+    }
+
+
+async def test_image_jobs_keep_the_tool_attribution(ledger):
+    queue = ImageJobQueue(workers=1)
+    token = accounting._CURRENT_TOOL.set(("cover_agent", "generate_cover_image"))
+    try:
+
+        async def work():
+            record_image("story-1", "cover", cached=True, seconds=0.0)
+            return "ok"
+
+        job = queue.submit("cover", work)
+    finally:
+        accounting._CURRENT_TOOL.reset(token)
+    assert queue.wait(job.job_id, timeout=5).result == "ok"
+    queue.shutdown()
+
+    (row,) = ledger.sink.breakdown("story-1")
+    assert (row["agent"], row["tool"], row["kind"]) == ("cover_agent", "generate_cover_image", IMAGE)
+    assert (row["images"], row["cached_images"]) == (1, 1)
+
+
+def test_ledger_totals_and_switch_off(ledger, monkeypatch, test_config):
+    ledger.record(UsageRecord("s1", "a", "", MODEL, prompt_tokens=5, seconds=1.0))
+    ledger.record(UsageRecord("s2", "a", "t", TOOL, seconds=2.0))
+    assert ledger.session_totals("s1")["prompt_tokens"] == 5
+    assert ledger.stats()["sessions"] == 2 and ledger.stats()["tool_seconds"] == 2.0
+
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, usage_accounting=False))
+    record_image("s1", "cover", cached=False, seconds=1.0)
+    assert ledger.session_totals("s1")["images"] == 0
+    assert accounting.story_coach_plugins() == []
+    assert model_call_cost("no-such-model", 10, 0, 10) == 0.0
+
+
+def test_sink_writes_batches_from_many_threads(tmp_path):
+    sink = UsageSink(tmp_path / "usage.sqlite3")
+
+    def write_many(session_id):
+        for _ in range(200):
+            sink.write(UsageRecord(session_id, "a", "t", TOOL, seconds=0.5))
+
+    threads = [threading.Thread(target=write_many, args=(f"s{n}",)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    rows = sink.breakdown()
+    assert [(row["session_id"], row["calls"]) for row in rows] == [(f"s{n}", 200) for n in range(4)]
+    sink.close()
+    assert UsageSink(tmp_path / "usage.sqlite3").breakdown("s0")[0]["seconds"] == 100.0
+
+
+async def test_cancelled_calls_do_not_leak(ledger, monkeypatch):
+    plugin = UsageAccountingPlugin(ledger=ledger)
+    context = SimpleNamespace(
+        invocation_id="inv-1",
+        session=SimpleNamespace(id="s1", state={}),
+        agent=SimpleNamespace(name="StoryCoach"),
+    )
+    await plugin.before_run_callback(invocation_context=context)
+    # A speculative page writer cancelled mid-call never reaches its after callback
+    plugin._start((TOOL, "inv-1", "call-1"), None)
+    plugin._start((TOOL, "inv-2", "call-2"), None)
+    await plugin.after_run_callback(invocation_context=context)
+    assert list(plugin._started) == [(TOOL, "inv-2", "call-2")]
+
+    monkeypatch.setattr(accounting, "MAX_STARTED_CALLS", 3)
+    for n in range(5):
+        plugin._start((TOOL, "inv-3", f"call-{n}"), None)
+    assert list(plugin._started) == [(TOOL, "inv-3", f"call-{n}") for n in (2, 3, 4)]
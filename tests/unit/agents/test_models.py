@@ -0,0 +1,131 @@
+"""Shared model factory and pooled model connections against a local server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from agents.models import ModelClientPool, ModelEndpoint, ModelFactory, endpoint_for
+
+
+class KeepAliveServer(ThreadingHTTPServer):
+    """Chat completions endpoint that keeps connections open and counts them."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), KeepAliveHandler)
+        self.completions = 0
+        self.connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.completions += 1
+        reply = {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "Hi."}}
+            ],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+        }
+        data = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = KeepAliveServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def _ask(runner, session_service, text):
+    session = await session_service.create_session(app_name="pool_test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+
+
+def test_models_are_shared_per_name_and_settings(test_config):
+    factory = ModelFactory(ModelClientPool(max_connections=4))
+
+    first = factory.get("openai/gpt-4o-mini", temperature=0.2)
+    assert factory.get("openai/gpt-4o-mini", temperature=0.2) is first
+    assert factory.get("openai/gpt-4o-mini", temperature=0.7) is not first
+    assert factory.get("openai/gpt-4o") is not first
+
+    stats = factory.stats()
+    assert stats["models"] == 3 and stats["requests"] == 4 and stats["reused"] == 1
+    # Models talking to the same endpoint share one connection pool
+    assert first.llm_client.endpoint == factory.get("openai/gpt-4o").llm_client.endpoint
+    assert first.llm_client.endpoint == ModelEndpoint(base_url=None, api_key="test-openai-key")
+    assert endpoint_for({"api_base": "http://local/v1", "api_key": "k"}).base_url == "http://local/v1"
+
+
+async def test_agents_reuse_warm_connections(keep_alive_server, test_config):
+    port = keep_alive_server.server_address[1]
+    factory = ModelFactory(ModelClientPool(max_connections=2))
+    settings = {"api_base": f"http://127.0.0.1:{port}/v1", "api_key": "test-key"}
+    agents = [
+        LlmAgent(model=factory.get("openai/stand-in", **settings), name=name, instruction="Say hi.")
+        for name in ("title_agent", "page_agent")
+    ]
+    assert agents[0].model is agents[1].model
+
+    assert await factory.warm_up(connections=2) == 2
+    assert keep_alive_server.connections == 2
+
+    session_service = InMemorySessionService()
+    for agent in agents:
+        runner = Runner(app_name="pool_test", agent=agent, session_service=session_service)
+        for text in ("hello", "again"):
+            await _ask(runner, session_service, text)
+
+    assert keep_alive_server.completions == 4
+    # Every call went over a connection opened by the warm-up
+    assert keep_alive_server.connections == 2
+    stats = factory.pool.stats()
+    assert stats["clients"] == 1
+    assert stats["warmed_connections"] == 2
+    assert stats["requests"] == 4
+    assert stats["connections_opened"] == 0
+    assert stats["connections_reused"] == 4 and stats["reuse_ratio"] == 1.0
+    await factory.pool.aclose()
+
+
+async def test_warm_up_is_skipped_for_zero_connections(test_config):
+    factory = ModelFactory(ModelClientPool(max_connections=2))
+    factory.get("openai/gpt-4o-mini")
+    assert await factory.warm_up(connections=0) == 0
+    assert factory.pool.stats()["clients"] == 0
@@ -0,0 +1,127 @@
+"""Prompt caching against a local stand-in for an OpenAI-compatible server."""
+
+import dataclasses
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.lite_llm import LiteLlm
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+import config.settings as settings
+from agents import prompt_cache
+from agents.prompt_cache import PromptCacheMetrics, prompt_cache_args, record_prompt_cache_usage
+from agents.sub_agents.page_writer.prompts import instruction_page_writer_agent
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Chat completions endpoint that caches system prompts it has seen before."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.requests = []
+        self.seen_prefixes = set()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append(body)
+        messages = body["messages"]
+        prefix = messages[0]["content"] if messages[0]["role"] == "system" else ""
+        if isinstance(prefix, list):
+            prefix = "".join(part.get("text", "") for part in prefix)
+        prompt_tokens = len(json.dumps(messages)) // 4
+        cached_tokens = len(prefix) // 4 if prefix in self.server.seen_prefixes else 0
+        self.server.seen_prefixes.add(prefix)
+        reply = {
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": body["model"],
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "A page."},
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": 3,
+                "total_tokens": prompt_tokens + 3,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+        data = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def _ask(runner, session_service, text):
+    session = await session_service.create_session(app_name="cache_test", user_id="u")
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    async for _ in runner.run_async(user_id="u", session_id=session.id, new_message=message):
+        pass
+
+
+async def test_static_prefix_is_stable_and_cache_hits_are_reported(
+    stand_in_server, monkeypatch, test_config
+):
+    monkeypatch.setattr(prompt_cache, "_METRICS", PromptCacheMetrics())
+    port = stand_in_server.server_address[1]
+    agent = LlmAgent(
+        model=LiteLlm(
+            model="openai/stand-in",
+            api_base=f"http://127.0.0.1:{port}/v1",
+            api_key="test-key",
+            **prompt_cache_args(),
+        ),
+        name="page_writer_agent",
+        static_instruction=instruction_page_writer_agent(),
+        after_model_callback=record_prompt_cache_usage,
+    )
+    session_service = InMemorySessionService()
+    runner = Runner(app_name="cache_test", agent=agent, session_service=session_service)
+
+    await _ask(runner, session_service, "child_page_description: milo finds a dragon")
+    await _ask(runner, session_service, "child_page_description: the dragon sneezes")
+
+    first, second = stand_in_server.requests
+    # The static prompt leads the request and is byte-identical across calls
+    assert first["messages"][0]["role"] == "system"
+    assert first["messages"][0] == second["messages"][0]
+    assert first["messages"][0]["content"].lstrip().startswith("You are a Page Writer Helper Agent")
+
+    stats = prompt_cache.get_prompt_cache_metrics().stats()["page_writer_agent"]
+    assert stats["calls"] == 2 and stats["cache_hits"] == 1
+    assert 0 < stats["cached_tokens"] < stats["prompt_tokens"]
+    assert stats["uncached_tokens"] == stats["prompt_tokens"] - stats["cached_tokens"]
+
+
+def test_prompt_caching_can_be_disabled(monkeypatch, test_config):
+    assert prompt_cache_args() == {
+        "cache_control_injection_points": prompt_cache.CACHE_CONTROL_INJECTION_POINTS
+    }
+    monkeypatch.setattr(settings, "_CONFIG", dataclasses.replace(test_config, prompt_caching=False))
+    assert prompt_cache_args() == {}
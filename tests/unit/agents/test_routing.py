@@ -0,0 +1,86 @@
+"""Per-agent model settings and routing to the cheapest passing model."""
+
+import dataclasses
+import json
+
+import pytest
+
+import config.settings as settings
+from agents.routing import (
+    get_model_route,
+    load_model_routes,
+    rank_by_cost,
+    save_model_route,
+    select_model,
+)
+from config.settings import AgentModelSettings, Config
+
+
+def test_agent_settings_are_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("TITLE_MODEL_NAME", "openai/gpt-4o-mini")
+    monkeypatch.setenv("TITLE_TEMPERATURE", "0.9")
+    monkeypatch.setenv("MODERATION_MAX_TOKENS", "200")
+    config = Config.from_env()
+
+    assert config.agent_model("title") == AgentModelSettings("openai/gpt-4o-mini", 0.9, None)
+    assert config.agent_model("moderation") == AgentModelSettings(max_tokens=200)
+    assert config.agent_model("story_coach") == AgentModelSettings()
+
+    monkeypatch.setenv("MODERATION_MAX_TOKENS", "lots")
+    with pytest.raises(RuntimeError, match="MODERATION_MAX_TOKENS must be an integer"):
+        Config.from_env()
+
+
+def test_routes_fall_back_to_the_default_model(monkeypatch, test_config, tmp_path):
+    route = get_model_route("title", temperature=0.7)
+    assert (route.model_name, route.temperature, route.max_tokens) == ("openai/gpt-4o-mini", 0.7, None)
+    assert route.content_config().temperature == 0.7
+
+    routes_file = tmp_path / "routes.json"
+    save_model_route(routes_file, "title", "openai/gpt-4.1-nano")
+    config = dataclasses.replace(
+        test_config,
+        model_routes_file=str(routes_file),
+        agent_models=(("moderation", AgentModelSettings("openai/gpt-4.1-mini", 0.0, 150)),),
+    )
+    monkeypatch.setattr(settings, "_CONFIG", config)
+
+    # The calibrated route beats the default; an explicit setting beats both
+    assert get_model_route("title", temperature=0.7).model_name == "openai/gpt-4.1-nano"
+    moderation = get_model_route("moderation", temperature=0.3)
+    assert (moderation.model_name, moderation.temperature) == ("openai/gpt-4.1-mini", 0.0)
+    assert moderation.content_config().max_output_tokens == 150
+    assert get_model_route("story_coach", temperature=0.8).model_name == "openai/gpt-4o-mini"
+
+    with pytest.raises(KeyError):
+        get_model_route("nobody", temperature=0.5)
+
+
+def test_routes_file_round_trip(tmp_path):
+    path = tmp_path / "routes.json"
+    assert load_model_routes(path) == {}
+    save_model_route(path, "title", "openai/gpt-4o-mini")
+    save_model_route(path, "page_writer", "openai/gpt-4o")
+    assert json.loads(path.read_text()) == {"page_writer": "openai/gpt-4o", "title": "openai/gpt-4o-mini"}
+
+    path.write_text("not json")
+    with pytest.raises(RuntimeError):
+        load_model_routes(path)
+
+
+def test_cheapest_passing_model_is_selected():
+    assert rank_by_cost(["openai/gpt-4o", "no-such-model", "openai/gpt-4o-mini"]) == [
+        "openai/gpt-4o-mini",
+        "openai/gpt-4o",
+        "no-such-model",
+    ]
+
+    tried = []
+
+    def evaluate(agent, model_name):
+        tried.append(model_name)
+        return model_name != "openai/gpt-4o-mini"
+
+    assert select_model("title", ["openai/gpt-4o", "openai/gpt-4o-mini"], evaluate) == "openai/gpt-4o"
+    assert tried == ["openai/gpt-4o-mini", "openai/gpt-4o"]
+    assert select_model("title", ["openai/gpt-4o-mini"], evaluate) is None
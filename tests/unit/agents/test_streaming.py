@@ -0,0 +1,75 @@
+"""Unit tests for streamed StoryCoach turns."""
+
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event
+from google.genai import types
+
+from agents import streaming
+from agents.streaming import StreamMetrics, call_agent_streaming
+
+
+def _event(text=None, partial=None, call=None):
+    parts = []
+    if text is not None:
+        parts.append(types.Part(text=text))
+    if call is not None:
+        parts.append(types.Part(function_call=types.FunctionCall(name=call, args={})))
+    return Event(author="StoryCoach", content=types.Content(role="model", parts=parts), partial=partial)
+
+
+class FakeRunner:
+    def __init__(self, events):
+        self.events = events
+        self.kwargs = None
+
+    async def run_async(self, **kwargs):
+        self.kwargs = kwargs
+        for event in self.events:
+            yield event
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        self.now += 0.5
+        return self.now
+
+
+async def test_streams_partial_text_to_render_hook(monkeypatch):
+    monkeypatch.setattr(streaming, "_METRICS", StreamMetrics())
+    runner = FakeRunner(
+        [
+            _event("Let me make ", partial=True),
+            _event("your title!", partial=True),
+            _event("Let me make your title!"),
+            _event(call="start_story"),
+            _event("It's ready!", partial=True),
+            _event("It's ready!"),
+        ]
+    )
+    rendered = []
+
+    async def render(delta, text_so_far):
+        rendered.append((delta, text_so_far))
+
+    turn = await call_agent_streaming("Hi", runner, "u", "s", render=render, clock=FakeClock())
+
+    assert runner.kwargs["run_config"].streaming_mode == StreamingMode.SSE
+    assert [delta for delta, _ in rendered] == ["Let me make ", "your title!", "It's ready!"]
+    assert turn.text == rendered[-1][1] == "Let me make your title!It's ready!"
+    # clock: start 0.5, chunks at 1.0, 1.5, 2.0, end 2.5
+    assert (turn.ttft_seconds, turn.ttlt_seconds, turn.total_seconds) == (0.5, 1.5, 2.0)
+    assert turn.chunks == 3
+    assert streaming.get_stream_metrics().stats()["ttft_p50"] == 0.5
+
+
+async def test_non_streaming_model_still_renders_whole_reply(monkeypatch):
+    monkeypatch.setattr(streaming, "_METRICS", StreamMetrics())
+    rendered = []
+    turn = await call_agent_streaming(
+        "Hi", FakeRunner([_event("Hello there!")]), "u", "s", render=lambda d, t: rendered.append(d)
+    )
+    assert rendered == ["Hello there!"] and turn.text == "Hello there!"
+    assert streaming.get_stream_metrics().turns()[0]["chunks"] == 1
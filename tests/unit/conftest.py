@@ -0,0 +1,37 @@
+"""Shared fixtures for unit tests.
+
+Unit tests run without a .env file, so placeholder values are provided for the
+required settings before any agent module reads the configuration.
+"""
+
+import os
+
+import pytest
+
+import config.settings as settings
+from config.settings import Config
+
+for _key, _value in {
+    "OPENAI_API_KEY": "test-openai-key",
+    "GOOGLE_API_KEY": "test-google-key",
+    "TEXT_MODEL_NAME": "openai/gpt-4o-mini",
+    "IMAGE_MODEL_NAME": "dall-e-3",
+    "MAX_STORY_PAGES": "10",
+    "OUTPUT_DIR": "./outputs",
+}.items():
+    os.environ.setdefault(_key, _value)
+
+
+@pytest.fixture
+def test_config(tmp_path, monkeypatch):
+    """Install a Config pointing OUTPUT_DIR at a temporary directory."""
+    config = Config(
+        openai_api_key="test-openai-key",
+        google_api_key="test-google-key",
+        text_model_name="openai/gpt-4o-mini",
+        image_model_name="dall-e-3",
+        max_story_pages=10,
+        output_dir=str(tmp_path / "outputs"),
+    )
+    monkeypatch.setattr(settings, "_CONFIG", config)
+    return config
@@ -0,0 +1,39 @@
+"""Cold-start checks: what importing the app's entry points pulls in."""
+
+import importlib
+import os
+
+import utils.env
+from utils.import_time import measure_imports
+
+# PIL is left out: google.genai imports it itself
+IMAGE_STACK = ("openai", "numpy", "agents.sub_agents.cover_agent.image_generator")
+
+
+def test_package_import_builds_no_agents():
+    for module in ("agents.story_coach", "agents.main_agent"):
+        imported = measure_imports(module)["modules"]
+        assert "agents.story_coach.agent" not in imported
+        assert "google.adk.models.lite_llm" not in imported
+        assert "google.adk.runners" not in imported
+
+
+def test_root_agent_import_defers_image_stack():
+    agent = measure_imports("agents.story_coach.agent")
+    package = measure_imports("agents.story_coach")
+
+    for name in IMAGE_STACK:
+        assert name not in agent["modules"]
+    assert package["total_us"] < agent["total_us"]
+
+
+def test_env_file_is_not_loaded_at_import(tmp_path, monkeypatch):
+    (tmp_path / ".env").write_text("IMPORT_TIME_PROBE=loaded\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("IMPORT_TIME_PROBE", raising=False)
+
+    importlib.reload(utils.env)
+    assert "IMPORT_TIME_PROBE" not in os.environ
+
+    assert utils.env.load_env() is True
+    assert os.environ.pop("IMPORT_TIME_PROBE") == "loaded"
@@ -0,0 +1,80 @@
+"""Unit tests for the speculative execution primitive."""
+
+import asyncio
+import time
+
+import pytest
+
+from utils.speculation import Speculator
+
+
+def _after(seconds, value, log=None, name=None):
+    async def run():
+        try:
+            await asyncio.sleep(seconds)
+        except asyncio.CancelledError:
+            if log is not None:
+                log.append(f"{name} cancelled")
+            raise
+        if log is not None:
+            log.append(f"{name} done")
+        return value
+
+    return run
+
+
+async def test_accepted_run_overlaps_gate_and_work():
+    speculator = Speculator("test")
+    start = time.perf_counter()
+    result = await speculator.run(_after(0.1, "ok"), _after(0.15, "page"), accept=lambda g: g == "ok")
+    elapsed = time.perf_counter() - start
+
+    assert result.accepted and result.value == "page"
+    assert elapsed < 0.22
+    assert result.saved_seconds == pytest.approx(0.1, abs=0.04)
+    assert speculator.stats()["accepted"] == 1
+
+
+async def test_rejected_run_cancels_unfinished_work():
+    log = []
+    speculator = Speculator("test")
+    result = await speculator.run(
+        _after(0.05, "no"), _after(1.0, "page", log, "work"), accept=lambda g: g == "ok"
+    )
+
+    assert not result.accepted and result.value is None and result.gate == "no"
+    assert log == ["work cancelled"]
+    assert result.wasted_seconds == pytest.approx(0.05, abs=0.04)
+    stats = speculator.stats()
+    assert (stats["rejected"], stats["cancelled"]) == (1, 1)
+
+
+async def test_rejected_run_discards_finished_work():
+    speculator = Speculator("test")
+    result = await speculator.run(_after(0.1, "no"), _after(0.02, "page"), accept=lambda g: g == "ok")
+    assert result.value is None
+    assert result.wasted_seconds == pytest.approx(0.02, abs=0.02)
+    assert speculator.stats()["cancelled"] == 0
+
+
+async def test_gate_errors_cancel_work():
+    log = []
+
+    async def broken_gate():
+        await asyncio.sleep(0.01)
+        raise ValueError("moderation down")
+
+    with pytest.raises(ValueError):
+        await Speculator("test").run(broken_gate, _after(1.0, "page", log, "work"), accept=bool)
+    await asyncio.sleep(0)
+    assert log == ["work cancelled"]
+
+
+async def test_serial_mode_skips_work_on_rejection():
+    log = []
+    speculator = Speculator("test")
+    result = await speculator.run(
+        _after(0.01, "no"), _after(0.01, "page", log, "work"), accept=lambda g: g == "ok", speculate=False
+    )
+    assert not result.accepted and log == []
+    assert speculator.stats()["wasted_seconds"] == 0.0
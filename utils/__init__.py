@@ -1,3 +1,4 @@
 from .env import get_env, load_env
+from .speculation import SpeculationResult, Speculator, get_speculator
 
-__all__ = ["get_env", "load_env"]
+__all__ = ["get_env", "load_env", "SpeculationResult", "Speculator", "get_speculator"]
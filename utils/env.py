@@ -1,7 +1,8 @@
 """Lightweight helpers for loading and reading environment variables.
 
 Uses python-dotenv to populate os.environ from a local .env file without
-overwriting already-set environment variables.
+overwriting already-set environment variables. Nothing is loaded at import:
+get_config() calls load_env() the first time the configuration is read.
 """
 
 from __future__ import annotations
@@ -37,6 +38,3 @@ def get_env(
         raise RuntimeError(f"Missing required environment variable: {key}")
     return value
 
-
-# Load .env values once at import; does not override existing environment.
-load_env()
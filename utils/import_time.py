@@ -0,0 +1,85 @@
+"""Import-time measurement with ``python -X importtime``.
+
+Imports a module in a fresh interpreter and parses the interpreter's
+importtime report, so cold-start cost (e.g. of ``agents.story_coach`` for
+``adk web``, or of a spawned worker) can be checked in tests and compared
+between changes. Example:
+
+    python -m utils.import_time agents.story_coach.agent --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def measure_imports(module: str, env: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """
+    Import ``module`` in a fresh interpreter and return its import times.
+
+    Args:
+        module: Dotted module name to import
+        env: Environment of the interpreter (default: the current one);
+            the repository root is put on PYTHONPATH
+
+    Returns:
+        {"module", "total_us": cumulative microseconds of the import,
+        "modules": {name: cumulative microseconds} for every module imported}
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    env = dict(os.environ if env is None else env)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            modules[name.strip()] = int(cumulative)
+    return {"module": module, "total_us": modules.get(module, 0), "modules": modules}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Command-line entry point; prints the total and the slowest imports."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("module")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    result = measure_imports(args.module)
+    slowest = sorted(result["modules"].items(), key=lambda item: item[1], reverse=True)
+    print(
+        json.dumps(
+            {
+                "module": result["module"],
+                "total_ms": round(result["total_us"] / 1000, 1),
+                "modules_imported": len(result["modules"]),
+                "slowest_ms": {name: round(us / 1000, 1) for name, us in slowest[: args.top]},
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
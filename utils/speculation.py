@@ -0,0 +1,147 @@
+"""Speculative execution of work that normally waits for an approval step.
+
+A Speculator starts a gate (e.g. moderation) and the gated work (e.g. page
+writing) at the same time instead of one after the other. When the gate
+approves, the caller gets the work's result after max(gate, work) rather than
+gate + work; when it rejects, the work is cancelled (or its finished result
+discarded). Counters record the time saved on approved runs and the work
+time wasted on rejected ones, so the trade-off can be measured per use.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+G = TypeVar("G")
+T = TypeVar("T")
+
+
+@dataclass
+class SpeculationResult(Generic[G, T]):
+    """Outcome of one speculative run."""
+
+    accepted: bool
+    gate: G
+    value: Optional[T]
+    saved_seconds: float = 0.0
+    wasted_seconds: float = 0.0
+
+
+class Speculator:
+    """Runs gate and work concurrently and keeps speculation statistics."""
+
+    def __init__(self, name: str, clock: Callable[[], float] = time.perf_counter):
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters = {
+            "runs": 0,
+            "accepted": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "saved_seconds": 0.0,
+            "wasted_seconds": 0.0,
+        }
+
+    async def run(
+        self,
+        gate: Callable[[], Awaitable[G]],
+        work: Callable[[], Awaitable[T]],
+        accept: Callable[[G], bool],
+        speculate: bool = True,
+    ) -> SpeculationResult[G, T]:
+        """
+        Run ``work`` if ``gate`` approves, starting it before the gate answers.
+
+        Args:
+            gate: Coroutine factory for the approval step
+            work: Coroutine factory for the gated work
+            accept: Decides from the gate's result whether the work is kept
+            speculate: False runs gate then work serially (same statistics,
+                nothing saved or wasted), for comparison or as a kill switch
+
+        Returns:
+            The gate result, and the work result if it was accepted
+
+        Raises:
+            Whatever the gate raises (the work is cancelled), or whatever the
+            work raises once the gate has accepted
+        """
+        if not speculate:
+            gate_result = await gate()
+            if not accept(gate_result):
+                self._record(accepted=False)
+                return SpeculationResult(False, gate_result, None)
+            value = await work()
+            self._record(accepted=True)
+            return SpeculationResult(True, gate_result, value)
+
+        started = self._clock()
+        work_finished: list[float] = []
+
+        async def _timed_work() -> T:
+            try:
+                return await work()
+            finally:
+                work_finished.append(self._clock())
+
+        work_task = asyncio.ensure_future(_timed_work())
+        try:
+            gate_result = await gate()
+        except BaseException:
+            work_task.cancel()
+            raise
+        gate_seconds = self._clock() - started
+
+        if not accept(gate_result):
+            cancelled = work_task.cancel()
+            try:
+                await work_task
+            except BaseException:
+                # The work's own outcome (result, error or cancellation) is discarded
+                pass
+            # Work cancelled before it ever started wasted nothing
+            wasted = work_finished[0] - started if work_finished else 0.0
+            self._record(accepted=False, wasted=wasted, cancelled=cancelled)
+            return SpeculationResult(False, gate_result, None, wasted_seconds=wasted)
+
+        value = await work_task
+        work_seconds = work_finished[0] - started
+        # Serially the caller would have waited gate + work; concurrently it
+        # waits for the longer of the two.
+        saved = min(gate_seconds, work_seconds)
+        self._record(accepted=True, saved=saved)
+        return SpeculationResult(True, gate_result, value, saved_seconds=saved)
+
+    def stats(self) -> Dict[str, float]:
+        """Return run counts, total seconds saved and total work seconds wasted."""
+        with self._lock:
+            return dict(self._counters)
+
+    def _record(
+        self, accepted: bool, saved: float = 0.0, wasted: float = 0.0, cancelled: bool = False
+    ) -> None:
+        with self._lock:
+            self._counters["runs"] += 1
+            self._counters["accepted" if accepted else "rejected"] += 1
+            self._counters["cancelled"] += int(cancelled)
+            self._counters["saved_seconds"] += saved
+            self._counters["wasted_seconds"] += wasted
+
+
+_SPECULATORS: Dict[str, Speculator] = {}
+_SPECULATORS_LOCK = threading.Lock()
+
+
+def get_speculator(name: str) -> Speculator:
+    """Return the shared Speculator called ``name`` (one per use, e.g. "page_writer")."""
+    with _SPECULATORS_LOCK:
+        speculator = _SPECULATORS.get(name)
+        if speculator is None:
+            speculator = Speculator(name)
+            _SPECULATORS[name] = speculator
+        return speculator